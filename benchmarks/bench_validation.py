@@ -0,0 +1,41 @@
+"""
+Per-call overhead of the validation modes of registered methods.
+
+Run with:
+```shell
+uv run python benchmarks/bench_validation.py
+```
+"""
+
+import timeit
+
+from pydantic import validate_call
+
+from curry.methods import MethodManager, ValidationMode
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def main(number: int = 100_000) -> dict[str, float]:
+    """Time `number` calls of a trivial method, returning the cost of one call in microseconds."""
+    method_info = MethodManager.get_method_info("bench_add")
+    callables = {
+        "raw": add,
+        "rebuilt validator (previous behaviour)": lambda a, b: validate_call(add)(a, b),
+        **{f"validation={mode.value}": method_info.get_callable(mode) for mode in ValidationMode},
+    }
+    timings = {}
+    for label, func in callables.items():
+        # The rebuilt validator is too slow to be called as many times
+        calls = number // 100 if label.startswith("rebuilt") else number
+        timings[label] = timeit.timeit(lambda func=func: func(1, 2), number=calls) / calls * 1e6
+    return timings
+
+
+MethodManager.register(name="bench_add")(add)
+
+if __name__ == "__main__":
+    for label, duration in main().items():
+        print(f"{label:<42} {duration:8.3f} µs/call")
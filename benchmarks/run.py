@@ -0,0 +1,173 @@
+"""
+Benchmark suite of curry: bulk loading, graph construction, scheduling overhead and cached reruns, with and without
+the fusion of lightweight chains.
+
+Results are saved as JSON in `.benchmarks/`, named after the current commit, and compared with the previous run.
+
+Run with:
+```shell
+uv run python -m benchmarks.run --size 10000 --distributed
+```
+"""
+
+import argparse
+import datetime
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+import dask
+
+from benchmarks.workflows import SHAPES
+from curry.block import Block, load_blocks
+from curry.flow import (
+    CompiledWorkflow,
+    ResultCache,
+    WorkflowGraphBuilder,
+    build_workflow_graph,
+    compile_workflow,
+    submit_workflow,
+)
+from curry.utils.typing import AnyDict
+
+RESULTS_DIRECTORY = Path(".benchmarks")
+REGRESSION_THRESHOLD = 1.2
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int) -> dict[str, float]:
+    """Call `func` `repeat` times and return the min, mean and max durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {"min": min(durations), "mean": statistics.mean(durations), "max": max(durations)}
+
+
+def bench_shape(shape: str, size: int, repeat: int, schedulers: list[str]) -> dict[str, dict[str, float]]:
+    blocks_as_json = SHAPES[shape](size)
+    encoded_blocks = json.dumps(blocks_as_json)
+    blocks = load_blocks(blocks_as_json)
+    workflow = compile_workflow(blocks)
+
+    timings = {
+        "load": measure(lambda: [Block.model_validate(block) for block in blocks_as_json], repeat),
+        "load_bulk": measure(lambda: load_blocks(blocks_as_json), repeat),
+        "load_json": measure(lambda: CompiledWorkflow.from_json(encoded_blocks), repeat),
+        "compile": measure(lambda: compile_workflow(blocks), repeat),
+        "build_graph": measure(lambda: build_workflow_graph(workflow), repeat),
+        "build_graph_unfused": measure(lambda: build_workflow_graph(workflow, fuse=False), repeat),
+    }
+    for scheduler in schedulers:
+        with dask.config.set(scheduler=scheduler):
+            timings[f"run_{scheduler}"] = measure(lambda: submit_workflow(workflow), repeat)
+            timings[f"run_{scheduler}_unfused"] = measure(lambda: submit_workflow(workflow, fuse=False), repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(directory)
+        submit_workflow(workflow, cache=cache)
+        timings["run_cached"] = measure(lambda: submit_workflow(workflow, cache=cache), repeat)
+    return timings
+
+
+def bench_distributed(shape: str, size: int, repeat: int, unfused: bool) -> dict[str, dict[str, float]]:
+    from distributed import Client, LocalCluster
+
+    workflow = CompiledWorkflow.from_json(SHAPES[shape](size))
+    timings = {}
+    with LocalCluster(n_workers=2, threads_per_worker=2, dashboard_address=None) as cluster, Client(cluster):
+        timings["run_distributed"] = measure(lambda: submit_workflow(workflow), repeat)
+        if unfused:
+            timings["run_distributed_unfused"] = measure(lambda: submit_workflow(workflow, fuse=False), repeat)
+    return timings
+
+
+def count_tasks(shape: str, size: int) -> dict[str, int]:
+    """The number of Dask tasks of a workflow, with and without fusion."""
+    workflow = CompiledWorkflow.from_json(SHAPES[shape](size))
+    counts = {"blocks": len(workflow)}
+    for name, fuse in (("fused", True), ("unfused", False)):
+        builder = WorkflowGraphBuilder(workflow, available_resources=(), fuse=fuse)
+        builder.build()
+        counts[name] = builder.graph_size
+    return counts
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: AnyDict, current: AnyDict) -> list[str]:
+    """List the benchmarks whose mean duration grew by more than `REGRESSION_THRESHOLD`."""
+    regressions = []
+    for name, timings in current["benchmarks"].items():
+        previous_timings = previous["benchmarks"].get(name)
+        if previous_timings is None:
+            continue
+        for step, timing in timings.items():
+            previous_timing = previous_timings.get(step)
+            if previous_timing and timing["mean"] > previous_timing["mean"] * REGRESSION_THRESHOLD:
+                regressions.append(
+                    f"{name}/{step}: {previous_timing['mean'] * 1e3:.1f} ms -> {timing['mean'] * 1e3:.1f} ms"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0] if __doc__ else None)
+    parser.add_argument("--size", type=int, default=1000, help="number of blocks of the synthetic workflows")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--schedulers", nargs="+", default=["sync", "threads"], choices=["sync", "threads"])
+    parser.add_argument("--distributed", action="store_true", help="also run on a distributed LocalCluster")
+    parser.add_argument(
+        "--distributed-unfused", action="store_true", help="also run the unfused graphs on the LocalCluster (slow)"
+    )
+    parser.add_argument("--output-dir", type=Path, default=RESULTS_DIRECTORY)
+    args = parser.parse_args()
+
+    benchmarks: dict[str, typing.Any] = {}
+    task_counts: dict[str, dict[str, int]] = {}
+    for shape in args.shapes:
+        name = f"{shape}[{args.size}]"
+        print(f"Running {name}...")
+        task_counts[name] = count_tasks(shape, args.size)
+        benchmarks[name] = bench_shape(shape, args.size, args.repeat, args.schedulers)
+        if args.distributed:
+            benchmarks[name].update(bench_distributed(shape, args.size, args.repeat, args.distributed_unfused))
+        print("  tasks            " + ", ".join(f"{kind}={count}" for kind, count in task_counts[name].items()))
+        for step, timing in benchmarks[name].items():
+            print(f"  {step:<24} {timing['mean'] * 1e3:10.1f} ms")
+
+    commit = current_commit()
+    result = {
+        "commit": commit,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "size": args.size,
+        "benchmarks": benchmarks,
+        "task_counts": task_counts,
+    }
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    previous_files = sorted(args.output_dir.glob("*.json"))
+    output_file = args.output_dir / f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    output_file.write_text(json.dumps(result, indent=2))
+    print(f"Results saved to {output_file}")
+
+    if previous_files:
+        previous = json.loads(previous_files[-1].read_text())
+        regressions = compare(previous, result)
+        print(f"Compared with {previous_files[-1].name} ({previous['commit']}):")
+        for regression in regressions or ["no regression"]:
+            print(f"  {regression}")
+
+
+if __name__ == "__main__":
+    main()
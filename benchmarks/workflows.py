@@ -0,0 +1,102 @@
+"""
+Synthetic workflows of configurable shape, made of trivial registered methods so that only the overhead of curry
+and Dask is measured. The methods are lightweight: their linear chains are fused.
+"""
+
+import random
+import typing
+
+from curry.methods import MethodManager
+from curry.utils.typing import AnyDict
+
+
+@MethodManager.register(name="bench_source", lightweight=True)
+def bench_source(value: int) -> int:
+    """Returns its parameter."""
+    return value
+
+
+@MethodManager.register(name="bench_step", lightweight=True)
+def bench_step(data: int) -> int:
+    """Increments its input."""
+    return data + 1
+
+
+@MethodManager.register(name="bench_merge", lightweight=True)
+def bench_merge(left: int, right: int) -> int:
+    """Adds its two inputs."""
+    return left + right
+
+
+def _source(block_id: str, value: int = 1) -> AnyDict:
+    return {"id": block_id, "method_id": "bench_source", "parameters": {"value": value}, "connections": []}
+
+
+def _step(block_id: str, source_block_id: str) -> AnyDict:
+    return {
+        "id": block_id,
+        "method_id": "bench_step",
+        "parameters": {},
+        "connections": [{"source_block_id": source_block_id, "self_input_name": "data"}],
+    }
+
+
+def _merge(block_id: str, left_block_id: str, right_block_id: str) -> AnyDict:
+    return {
+        "id": block_id,
+        "method_id": "bench_merge",
+        "parameters": {},
+        "connections": [
+            {"source_block_id": left_block_id, "self_input_name": "left"},
+            {"source_block_id": right_block_id, "self_input_name": "right"},
+        ],
+    }
+
+
+def chain(size: int) -> list[AnyDict]:
+    """A single line of `size` blocks."""
+    blocks = [_source("block-0")]
+    blocks.extend(_step(f"block-{index}", f"block-{index - 1}") for index in range(1, size))
+    return blocks
+
+
+def fan_out(size: int) -> list[AnyDict]:
+    """One source feeding `size - 1` independent blocks."""
+    blocks = [_source("block-0")]
+    blocks.extend(_step(f"block-{index}", "block-0") for index in range(1, size))
+    return blocks
+
+
+def diamond(size: int, width: int = 10) -> list[AnyDict]:
+    """Layers of `width` blocks, each block merging two blocks of the previous layer."""
+    blocks = [_source(f"block-0-{column}", column) for column in range(width)]
+    for layer in range(1, max(size // width, 1)):
+        blocks.extend(
+            _merge(
+                f"block-{layer}-{column}", f"block-{layer - 1}-{column}", f"block-{layer - 1}-{(column + 1) % width}"
+            )
+            for column in range(width)
+        )
+    return blocks
+
+
+def random_dag(size: int, seed: int = 0, sources: int = 10) -> list[AnyDict]:
+    """A random DAG where each block is connected to one or two earlier blocks, shuffled."""
+    rng = random.Random(seed)  # noqa: S311 not used for security
+    blocks = [_source(f"block-{index}", index) for index in range(min(sources, size))]
+    for index in range(len(blocks), size):
+        left, right = rng.randrange(index), rng.randrange(index)
+        if left == right:
+            blocks.append(_step(f"block-{index}", f"block-{left}"))
+        else:
+            blocks.append(_merge(f"block-{index}", f"block-{left}", f"block-{right}"))
+    rng.shuffle(blocks)
+    return blocks
+
+
+SHAPES: dict[str, typing.Callable[[int], list[AnyDict]]] = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "diamond": diamond,
+    "random_dag": random_dag,
+}
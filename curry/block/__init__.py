@@ -1,3 +1,23 @@
-from .models import Block, BlockConnection, BlockProducer
+from .models import (
+    DEFAULT_PRODUCERS,
+    Block,
+    BlockConnection,
+    BlockMapping,
+    BlockProducer,
+    ProducerMapping,
+    dump_blocks,
+    load_blocks,
+    produce_many,
+)
 
-__all__ = ["Block", "BlockConnection", "BlockProducer"]
+__all__ = [
+    "DEFAULT_PRODUCERS",
+    "Block",
+    "BlockConnection",
+    "BlockMapping",
+    "BlockProducer",
+    "ProducerMapping",
+    "dump_blocks",
+    "load_blocks",
+    "produce_many",
+]
@@ -1,17 +1,39 @@
-import inspect
 import typing
 import uuid
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter
 
 from curry.utils.typing import AnyCallable, AnyDict
 
-BlockProducteurFunction = typing.Callable[["Block"], typing.Any]
+if typing.TYPE_CHECKING:
+    BlockProducteurFunction = typing.Callable[["Block"], typing.Any]
+    BlockBatchProducteurFunction = typing.Callable[[typing.Sequence["Block"]], list[typing.Any]]
+else:
+    # Default producers are instantiated in the body of `Block`, before pydantic can resolve the forward reference
+    BlockProducteurFunction = typing.Callable[..., typing.Any]
+    BlockBatchProducteurFunction = typing.Callable[..., list[typing.Any]]
 
 
 class BlockProducer(BaseModel):
+    """
+    Renders a block in a format (html, source code...).
+
+    Attributes:
+        format_name (str): The name of the format.
+        func (BlockProducteurFunction): Renders one block.
+        batch_func (typing.Optional[BlockBatchProducteurFunction]): Renders many blocks at once, in order (used by
+            `produce_many`, default to calling `func` on each block).
+        cache (bool): Whether the output only depends on the fields of the block and is kept until they change.
+            Producers reading other state (e.g. the results of a run) must disable it.
+        description (typing.Optional[str]): A description of the format.
+        tags (list[str]): Tags of the producer.
+        title (typing.Optional[str]): A human readable name of the format.
+    """
+
     format_name: str
     func: BlockProducteurFunction
+    batch_func: typing.Optional[BlockBatchProducteurFunction] = None
+    cache: bool = True
     description: typing.Optional[str] = None
     tags: list[str] = []
     title: typing.Optional[str] = None
@@ -20,19 +42,99 @@ class BlockProducer(BaseModel):
 
 
 class BlockConnection(BaseModel):
+    """
+    Feeds an input of a block with the output of another block.
+
+    Attributes:
+        source_block_id (str): The id of the upstream block.
+        source_output_name (str): The output of the upstream block.
+        self_input_name (str): The input of the block.
+        streaming (bool): The upstream method is a generator and the input gets an iterator over the chunks it
+            yields, while they are produced, instead of their full list.
+    """
+
     source_block_id: str
     source_output_name: str = "output"
     self_input_name: str
+    streaming: bool = False
+
+
+class BlockMapping(BaseModel):
+    """
+    Makes a block apply its method to each element of one of its inputs (fan-out), in chunks.
+
+    Attributes:
+        input_name (str): The name of the iterated input, each call of the method gets one of its elements.
+        chunk_size (typing.Optional[int]): The number of elements handled by each task, when the iterated input is a
+            parameter of the block (its size is then known when the graph is built).
+        partitions (int): The number of tasks, when the iterated input comes from another block (or when no
+            `chunk_size` is given).
+        reduce_method_id (typing.Optional[str]): The method reducing the list of results into one value. It must be
+            associative: it is applied to the results of each chunk, then to the partial results.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    input_name: str
+    chunk_size: typing.Optional[int] = Field(None, gt=0)
+    partitions: int = Field(8, gt=0)
+    reduce_method_id: typing.Optional[str] = None
 
 
 def block_as_html_default(block: "Block") -> str:
     return "<span>block html rendering not defined</span>"
 
 
-def block_method_source_code_default(block: "Block"):
+def block_method_source_code_default(block: "Block") -> str:
     from curry.methods import MethodManager
 
-    return inspect.getsource(MethodManager.get_method_info(block.method_id).method)
+    return MethodManager.get_method_info(block.method_id).method_code
+
+
+class ProducerMapping(typing.Mapping[str, BlockProducer]):
+    """
+    Read-only mapping of producers, indexed by format name. Unlike `types.MappingProxyType`, it can be pickled.
+
+    Args:
+        producers (typing.Mapping[str, BlockProducer]): The producers, indexed by format name.
+
+    """
+
+    __slots__ = ("_producers",)
+
+    def __init__(self, producers: typing.Mapping[str, BlockProducer]):
+        self._producers = dict(producers)
+
+    def __getitem__(self, format_name: str) -> BlockProducer:
+        return self._producers[format_name]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._producers)
+
+    def __len__(self) -> int:
+        return len(self._producers)
+
+    def __repr__(self) -> str:
+        return f"ProducerMapping({self._producers!r})"
+
+    def __reduce__(self) -> typing.Union[str, tuple[typing.Any, ...]]:
+        # The default producers are unpickled as the shared mapping, not as a copy of it
+        if self is DEFAULT_PRODUCERS:
+            return "DEFAULT_PRODUCERS"
+        return (ProducerMapping, (self._producers,))
+
+
+# Shared by all the blocks: registering a producer on a block replaces its mapping instead of mutating this one
+DEFAULT_PRODUCERS: typing.Mapping[str, BlockProducer] = ProducerMapping({
+    "html": BlockProducer(format_name="html", func=block_as_html_default),
+    "python_source": BlockProducer(
+        format_name="python_source",
+        description="Get the source code of the producer python function",
+        func=block_method_source_code_default,
+        # The source code is read from the method registry, which can change without the block changing
+        cache=False,
+    ),
+})
 
 
 class Block(BaseModel):
@@ -47,7 +149,9 @@ class Block(BaseModel):
         method_id (str): The method ID associated with the block.
         parameters (AnyDict): The parameters of the block.
         connections (list[BlockConnection]): The connections of the block.
-        producers (dict[str, BlockProducer]): The producers of the block
+        mapping (typing.Optional[BlockMapping]): If set, the method is mapped over the elements of one of the inputs.
+        producers (typing.Mapping[str, BlockProducer]): The producers of the block, read-only (use
+            `register_producer` to add one). Default to the shared `DEFAULT_PRODUCERS`, not serialized.
     """
 
     model_config = ConfigDict(strict=True, extra="forbid")
@@ -59,15 +163,51 @@ class Block(BaseModel):
     description: typing.Optional[str] = None
     parameters: AnyDict = {}
     connections: list[BlockConnection] = []
-
-    producers: dict[str, BlockProducer] = {
-        "html": BlockProducer(format_name="html", func=block_as_html_default),
-        "python_source": BlockProducer(
-            format_name="python_source",
-            description="Get the source code of the producer python function",
-            func=block_method_source_code_default,
-        ),
-    }
+    mapping: typing.Optional[BlockMapping] = None
+
+    producers: typing.Mapping[str, BlockProducer] = Field(default_factory=lambda: DEFAULT_PRODUCERS, exclude=True)
+
+    # The outputs of the caching producers, indexed by format name, cleared when a field is assigned
+    _produced: AnyDict = PrivateAttr(default_factory=dict)
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._produced.clear()
+
+    @property
+    def produced(self) -> AnyDict:
+        """The cached outputs of the producers, indexed by format name."""
+        # Read from the storage of the private attributes: `self._produced` goes through the slow `__getattr__`
+        return typing.cast(AnyDict, typing.cast(AnyDict, self.__pydantic_private__)["_produced"])
+
+    def model_copy(
+        self, *, update: typing.Optional[typing.Mapping[str, typing.Any]] = None, deep: bool = False
+    ) -> "Block":
+        copy = super().model_copy(update=update, deep=deep)
+        # The private attributes are shallow copied: the copy must not share (nor inherit stale) outputs
+        copy._produced = {}
+        return copy
+
+    def __copy__(self) -> "Block":
+        copy = super().__copy__()
+        copy._produced = {}
+        return copy
+
+    def __deepcopy__(self, memo: typing.Optional[dict[int, typing.Any]] = None) -> "Block":
+        memo = {} if memo is None else memo
+        # The producers are shared, not copied: their mappings are read-only
+        memo[id(self.producers)] = self.producers
+        copy = super().__deepcopy__(memo)
+        copy._produced = {}
+        return copy
+
+    def invalidate_produced(self) -> None:
+        """
+        Forget the cached outputs of the producers, after mutating a field in place (e.g. `block.parameters[...] = `).
+        Assigning a field invalidates them already.
+        """
+        self._produced.clear()
 
     def has_producer(self, format_name: str) -> bool:
         """
@@ -82,7 +222,22 @@ class Block(BaseModel):
         return format_name in self.producers
 
     def produce(self, format_name: str) -> typing.Any:
-        return self.producers[format_name].func(self)
+        """
+        Render the block in a format, the output of a caching producer being computed only once.
+
+        Parameters:
+            format_name (str): The name of the format.
+
+        Returns:
+            typing.Any: The output of the producer.
+        """
+        producer = self.producers[format_name]
+        if not producer.cache:
+            return producer.func(self)
+        produced = self.produced
+        if format_name not in produced:
+            produced[format_name] = producer.func(self)
+        return produced[format_name]
 
     def available_producers(self) -> list[str]:
         """
@@ -94,9 +249,15 @@ class Block(BaseModel):
         return list(self.producers.keys())
 
     def register_producer(self, producer: BlockProducer) -> None:
+        """
+        Add a producer to this block only, overriding the producer of the same format if any.
+
+        Parameters:
+            producer (BlockProducer): The producer to register.
+        """
         # if producer.format_name in self.producers:
         #     raise ProducerAlreadyRegistered(producer.format_name)
-        self.producers[producer.format_name] = producer
+        self.producers = ProducerMapping({**self.producers, producer.format_name: producer})
 
     @classmethod
     def from_func(cls, func: AnyCallable, **kwargs: typing.Any) -> "Block":
@@ -125,3 +286,76 @@ class Block(BaseModel):
         block = cls(**kwargs)
 
         return block
+
+
+_BLOCK_LIST_ADAPTER = TypeAdapter(list[Block])
+
+
+def produce_many(blocks: typing.Sequence[Block], format_name: str) -> list[typing.Any]:
+    """
+    Render many blocks in a format in one pass: cached outputs are reused and the other blocks are rendered together,
+    by the `batch_func` of their producer when it has one.
+
+    Args:
+        blocks (typing.Sequence[Block]): The blocks.
+        format_name (str): The name of the format.
+
+    Returns:
+        list[typing.Any]: The outputs, in the order of the blocks.
+
+    Raises:
+        KeyError: If a block has no producer for the format.
+    """
+    outputs: list[typing.Any] = [None] * len(blocks)
+    # The blocks left to render, grouped by producer (most blocks share the default ones)
+    pending: dict[int, tuple[BlockProducer, list[int]]] = {}
+    for index, block in enumerate(blocks):
+        producer = block.producers[format_name]
+        produced = block.produced
+        if producer.cache and format_name in produced:
+            outputs[index] = produced[format_name]
+        else:
+            pending.setdefault(id(producer), (producer, []))[1].append(index)
+
+    for producer, indexes in pending.values():
+        group = [blocks[index] for index in indexes]
+        if producer.batch_func is not None:
+            rendered = producer.batch_func(group)
+        else:
+            rendered = [producer.func(block) for block in group]
+        for index, block, output in zip(indexes, group, rendered):
+            outputs[index] = output
+            if producer.cache:
+                block.produced[format_name] = output
+    return outputs
+
+
+def load_blocks(data: typing.Union[str, bytes, typing.Sequence[AnyDict]]) -> list[Block]:
+    """
+    Validate many block definitions at once, with one validator for the whole list.
+
+    Args:
+        data (typing.Union[str, bytes, typing.Sequence[AnyDict]]): A JSON array of blocks, or the decoded list.
+
+    Returns:
+        list[Block]: The blocks.
+
+    Raises:
+        pydantic.ValidationError: If a block definition is invalid.
+    """
+    if isinstance(data, (str, bytes)):
+        return _BLOCK_LIST_ADAPTER.validate_json(data)
+    return _BLOCK_LIST_ADAPTER.validate_python(data)
+
+
+def dump_blocks(blocks: typing.Sequence[Block]) -> str:
+    """
+    Serialize blocks into a JSON array that `load_blocks` can read back (producers are not serialized).
+
+    Args:
+        blocks (typing.Sequence[Block]): The blocks.
+
+    Returns:
+        str: The JSON array of blocks.
+    """
+    return _BLOCK_LIST_ADAPTER.dump_json(list(blocks)).decode()
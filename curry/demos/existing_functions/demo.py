@@ -1,6 +1,6 @@
 import typing
 
-from curry.block import Block
+from curry.block import load_blocks
 from curry.demos.existing_functions.fake_methods import constant, filter_data, load_data, merge_data, sum_data
 from curry.flow import submit_workflow
 from curry.methods import MethodManager
@@ -54,7 +54,7 @@ BLOCKS_AS_JSON:list[dict[str,typing.Any]] = [
 ]
 
 
-BLOCKS = [Block.model_validate(block) for block in BLOCKS_AS_JSON]
+BLOCKS = load_blocks(BLOCKS_AS_JSON)
 
 # Executing the workflow
 s = submit_workflow(BLOCKS, render=True)
@@ -1,7 +1,7 @@
 import time
 import typing
 
-from curry.block import Block
+from curry.block import load_blocks
 from curry.flow import submit_workflow
 from curry.methods import MethodManager
 
@@ -140,7 +140,7 @@ BLOCKS_AS_JSON: list[dict[str, typing.Any]] = [
 ]
 
 
-BLOCKS = [Block.model_validate(block) for block in BLOCKS_AS_JSON]
+BLOCKS = load_blocks(BLOCKS_AS_JSON)
 
 # Executing the workflow
 s = submit_workflow(BLOCKS, render=True)
@@ -1,16 +1,215 @@
+import functools
+import typing
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 from faker import Faker
 
+from curry.methods import MethodManager
+
+DEFAULT_VOCABULARY_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Fixed bounds, so that a seeded generator gives the same data every day
+DEFAULT_START_DATE = "1975-01-01"
+DEFAULT_END_DATE = "2024-12-31"
+
+FakeDataFormat = typing.Literal["parquet", "arrow"]
+
+
+class MissingPyArrowError(ImportError):
+    """
+    Exception raised when fake data is written to a file without `pyarrow` installed.
+
+    Args:
+        file_format (str): The format of the file.
+
+    """
+
+    def __init__(self, file_format: str):
+        self.file_format = file_format
+        self.message = f"Writing {file_format} files requires `pyarrow`, install the `arrow` extra of curry"
+        super().__init__(self.message)
+
+
+class FakeDataGenerator:
+    """
+    Generates fake data frames (`date`, `author`, `tags`, `sentence`) fast enough to load test workflows with
+    millions of rows.
+
+    Faker is only called to sample a vocabulary of each column once, the rows are then drawn from it with NumPy. The
+    text columns are categorical: the vocabulary is stored once, each row holding an index in it.
+
+    Chunks are drawn from independent random streams derived from the seed and their index: a chunk is the same
+    whether it is generated alone (e.g. by a mapped block) or after the other ones.
+
+    Args:
+        seed (typing.Optional[int]): The seed of the vocabularies and the draws (default to a random one).
+        vocabulary_size (int): The number of values sampled by Faker for each column.
+        locale (typing.Optional[str]): The locale of the Faker vocabularies.
+        start_date (str): The first possible date.
+        end_date (str): The last possible date.
+
+    """
+
+    def __init__(
+        self,
+        seed: typing.Optional[int] = None,
+        vocabulary_size: int = DEFAULT_VOCABULARY_SIZE,
+        locale: typing.Optional[str] = None,
+        start_date: str = DEFAULT_START_DATE,
+        end_date: str = DEFAULT_END_DATE,
+    ):
+        self.seed_sequence = np.random.SeedSequence(seed)
+        fake = Faker(locale)
+        fake.seed_instance(typing.cast(int, self.seed_sequence.entropy))
+        self.authors = pd.Index(np.unique([fake.name() for _ in range(vocabulary_size)]))
+        self.tags = pd.Index(np.unique([", ".join(fake.words(nb=3)) for _ in range(vocabulary_size)]))
+        self.sentences = pd.Index(np.unique([fake.sentence(nb_words=10) for _ in range(vocabulary_size)]))
+        self.first_day = np.datetime64(start_date, "D").astype(np.int64)
+        self.last_day = np.datetime64(end_date, "D").astype(np.int64)
+
+    def chunk(self, index: int, num_rows: int) -> pd.DataFrame:
+        """
+        Generate a chunk of rows.
+
+        Parameters:
+            index (int): The index of the chunk, selecting its random stream.
+            num_rows (int): The number of rows.
+
+        Returns:
+            pd.DataFrame: The rows.
+        """
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=(index,)))
+        days = rng.integers(self.first_day, self.last_day, size=num_rows, endpoint=True)
+        return pd.DataFrame({
+            "date": days.astype("datetime64[D]").astype("datetime64[s]"),
+            "author": pd.Categorical.from_codes(rng.integers(len(self.authors), size=num_rows), self.authors),
+            "tags": pd.Categorical.from_codes(rng.integers(len(self.tags), size=num_rows), self.tags),
+            "sentence": pd.Categorical.from_codes(rng.integers(len(self.sentences), size=num_rows), self.sentences),
+        })
+
+    def chunks(self, num_rows: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> typing.Iterator[pd.DataFrame]:
+        """
+        Generate rows chunk by chunk, each chunk being generated when the previous one is consumed.
+
+        Parameters:
+            num_rows (int): The total number of rows.
+            chunk_size (int): The number of rows per chunk (the last chunk may be smaller).
+
+        Yields:
+            pd.DataFrame: The chunks.
+        """
+        for index, start in enumerate(range(0, num_rows, chunk_size)):
+            yield self.chunk(index, min(chunk_size, num_rows - start))
+
+    def write(
+        self,
+        path: typing.Union[str, Path],
+        num_rows: int,
+        file_format: FakeDataFormat = "parquet",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Path:
+        """
+        Write rows to a Parquet or Arrow IPC file, one chunk at a time so that the memory used stays bounded. The
+        file is written even without rows, with the columns of the data.
+
+        Parameters:
+            path (typing.Union[str, Path]): The file.
+            num_rows (int): The total number of rows.
+            file_format (FakeDataFormat): `parquet`, or `arrow` for an Arrow IPC file.
+            chunk_size (int): The number of rows generated and written at once.
+
+        Returns:
+            Path: The file.
+
+        Raises:
+            MissingPyArrowError: If `pyarrow` is not installed.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise MissingPyArrowError(file_format) from error
+
+        path = Path(path)
+        # Without rows, an empty chunk still gives the file its schema
+        chunks = self.chunks(num_rows, chunk_size) if num_rows > 0 else iter([self.chunk(0, 0)])
+        writer: typing.Any = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    if file_format == "parquet":
+                        writer = pq.ParquetWriter(str(path), table.schema)
+                    else:
+                        writer = pa.ipc.new_file(str(path), table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+
+def get_fake_data_generator(
+    seed: typing.Optional[int] = None, vocabulary_size: int = DEFAULT_VOCABULARY_SIZE
+) -> FakeDataGenerator:
+    """
+    Returns the generator of a seed, its vocabularies being sampled only once per process (e.g. per Dask worker).
+    Without a seed, a new generator is returned at each call.
+    """
+    if seed is None:
+        return FakeDataGenerator(None, vocabulary_size)
+    return _seeded_generator(seed, vocabulary_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _seeded_generator(seed: int, vocabulary_size: int) -> FakeDataGenerator:
+    return FakeDataGenerator(seed, vocabulary_size)
+
 
 # 1. Generate a fake dataset using pandas
-def generate_fake_data(num_rows: int = 1000) -> pd.DataFrame:
-    fake = Faker()
-    data = []
-    for _ in range(num_rows):
-        date = fake.date_between(start_date="-50y", end_date="today")
-        author = fake.name()
-        tags = ", ".join(fake.words(nb=3))
-        sentence = fake.sentence(nb_words=10)
-        data.append({"date": date, "author": author, "tags": tags, "sentence": sentence})
-    df = pd.DataFrame(data)
-    return df
+def generate_fake_data(num_rows: int = 1000, seed: typing.Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate a fake data frame of `num_rows` rows, see `FakeDataGenerator`.
+
+    The columns keep their historical types: `date` holds `datetime.date` objects and the text columns plain
+    strings. Use `FakeDataGenerator` directly for the faster `datetime64` and categorical columns.
+    """
+    frame = FakeDataGenerator(seed).chunk(0, num_rows)
+    return pd.DataFrame({
+        "date": frame["date"].dt.date,
+        "author": frame["author"].to_numpy(),
+        "tags": frame["tags"].to_numpy(),
+        "sentence": frame["sentence"].to_numpy(),
+    })
+
+
+@MethodManager.register(name="fake_data", tags=["fake", "benchmark"], deterministic=False, seed_parameter="seed")
+def fake_data(num_rows: int = 1000, seed: typing.Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate a fake data frame (`date`, `author`, `tags`, `sentence`). Seeded calls always return the same rows, so
+    their blocks are shared and cached like the ones of deterministic methods.
+    """
+    return get_fake_data_generator(seed).chunk(0, num_rows)
+
+
+@MethodManager.register(name="fake_data_chunk", tags=["fake", "benchmark"], deterministic=False, seed_parameter="seed")
+def fake_data_chunk(index: int, num_rows: int = DEFAULT_CHUNK_SIZE, seed: typing.Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate the chunk `index` of a large fake dataset: map the block over a list of indexes to generate the chunks
+    in parallel (with a seed, so that they share the same vocabularies).
+    """
+    return get_fake_data_generator(seed).chunk(index, num_rows)
+
+
+@MethodManager.register(name="write_fake_data", tags=["fake", "benchmark", "io"], deterministic=False)
+def write_fake_data(
+    path: str,
+    num_rows: int,
+    file_format: FakeDataFormat = "parquet",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: typing.Optional[int] = None,
+) -> str:
+    """Write a fake dataset to a Parquet or Arrow IPC file, chunk by chunk, and return its path."""
+    return str(get_fake_data_generator(seed).write(path, num_rows, file_format, chunk_size))
@@ -0,0 +1,60 @@
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+DEFAULT_SQLITE_URL = "sqlite:///curry.db"
+
+
+def _is_in_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def create_sqlite_engine(
+    url: str = DEFAULT_SQLITE_URL,
+    pool_size: int = 5,
+    busy_timeout: float = 5.0,
+    wal: bool = True,
+    echo: bool = False,
+) -> Engine:
+    """
+    Create a pooled SQLite engine tuned for one writer and many concurrent readers.
+
+    Connections are kept in a pool and can be used from any thread. Each new connection switches the database to
+    the WAL journal (readers do not block the writer), relaxes the fsync policy to `NORMAL` (safe with WAL), enables
+    the foreign keys and waits up to `busy_timeout` seconds for a lock instead of failing at once.
+
+    An in-memory database lives in a single connection, shared by all the threads.
+
+    Args:
+        url (str): The SQLAlchemy URL of the database.
+        pool_size (int): The number of connections kept open.
+        busy_timeout (float): How long to wait for a lock held by another connection, in seconds.
+        wal (bool): Use the WAL journal mode (ignored for in-memory databases).
+        echo (bool): Log all the SQL statements.
+
+    Returns:
+        Engine: The engine.
+    """
+    connect_args: dict[str, typing.Any] = {"check_same_thread": False, "timeout": busy_timeout}
+    if _is_in_memory(url):
+        engine = create_engine(url, echo=echo, connect_args=connect_args, poolclass=StaticPool)
+        wal = False
+    else:
+        engine = create_engine(
+            url, echo=echo, connect_args=connect_args, pool_size=pool_size, max_overflow=pool_size, pool_pre_ping=True
+        )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection: typing.Any, connection_record: typing.Any) -> None:
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        cursor.close()
+
+    return engine
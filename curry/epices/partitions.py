@@ -0,0 +1,20 @@
+import datetime
+import typing
+
+from curry.methods import MethodManager
+from curry.utils.time.time import Granularity, period_partitions
+from curry.utils.typing import AnyDict
+
+
+@MethodManager.register(name="split_periods", tags=["time", "partitioning"], lightweight=True)
+def split_periods_into_partitions(
+    starts: list[datetime.datetime],
+    ends: list[datetime.datetime],
+    granularity: Granularity = "month",
+    tz: typing.Optional[str] = None,
+) -> list[AnyDict]:
+    """
+    Split periods (e.g. the acquisition period of each sensor) into calendar partitions, to be loaded by a mapped
+    block iterating over them: each partition is a `{"period", "start", "end", "label"}` dict.
+    """
+    return period_partitions(starts, ends, granularity, tz)
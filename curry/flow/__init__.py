@@ -1,3 +1,64 @@
-from .workflow import submit_workflow
+from .cache import CacheMissError, CacheStats, ResultCache
+from .checkpoint import CheckpointCache, CheckpointNotFoundError, CheckpointRun, CheckpointStore, RunFailedError
+from .compiler import CompiledWorkflow, compile_workflow
+from .durations import DurationHistory, DurationStats
+from .errors import (
+    CycleDetectedError,
+    DanglingConnectionError,
+    DuplicateBlockError,
+    StreamingConnectionError,
+    UnknownBlockError,
+    UnknownOutputError,
+    WorkflowCompilationError,
+)
+from .incremental import IncrementalWorkflow, WorkflowDiff, diff_workflows
+from .instrumentation import BlockEvent, GraphBuildEvent, RunReport, WorkflowInstrumentation
+from .run import WorkflowRun, submit_workflow_async
+from .storage import AsyncFlowStore, FlowNotFoundError, FlowStore, FlowSummary, RunSummary
+from .streaming import StreamAbortedError, StreamPipeline
+from .transport import SpilledResult, SpillTransport
+from .workflow import WorkflowGraphBuilder, build_workflow_graph, resume_workflow, submit_workflow
 
-__all__ = ["submit_workflow"]
+__all__ = [
+    "AsyncFlowStore",
+    "BlockEvent",
+    "CacheMissError",
+    "CacheStats",
+    "CheckpointCache",
+    "CheckpointNotFoundError",
+    "CheckpointRun",
+    "CheckpointStore",
+    "CompiledWorkflow",
+    "CycleDetectedError",
+    "DanglingConnectionError",
+    "DuplicateBlockError",
+    "DurationHistory",
+    "DurationStats",
+    "FlowNotFoundError",
+    "FlowStore",
+    "FlowSummary",
+    "GraphBuildEvent",
+    "IncrementalWorkflow",
+    "ResultCache",
+    "RunFailedError",
+    "RunReport",
+    "RunSummary",
+    "SpillTransport",
+    "SpilledResult",
+    "StreamAbortedError",
+    "StreamPipeline",
+    "StreamingConnectionError",
+    "UnknownBlockError",
+    "UnknownOutputError",
+    "WorkflowCompilationError",
+    "WorkflowDiff",
+    "WorkflowGraphBuilder",
+    "WorkflowInstrumentation",
+    "WorkflowRun",
+    "build_workflow_graph",
+    "compile_workflow",
+    "diff_workflows",
+    "resume_workflow",
+    "submit_workflow",
+    "submit_workflow_async",
+]
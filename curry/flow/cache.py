@@ -0,0 +1,191 @@
+import logging
+import os
+import pickle
+import tempfile
+import typing
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from curry.utils.typing import AnyCallable
+
+logger = logging.getLogger("curry.flow.cache")
+
+DEFAULT_CACHE_MAX_SIZE = 2 * 1024**3
+
+
+class CacheMissError(KeyError):
+    """
+    Exception raised when a key is not stored in the result cache.
+
+    Args:
+        key (str): The missing key.
+
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.message = f"No cached result for key '{key}'"
+        super().__init__(self.message)
+
+
+class CacheStats(BaseModel):
+    """
+    Hit/miss counters of a result cache.
+
+    Attributes:
+        hits (int): Number of blocks served from the cache.
+        misses (int): Number of blocks that had to be computed.
+        writes (int): Number of results stored in the cache.
+        evictions (int): Number of results removed to keep the cache under its size limit.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed store of block results.
+
+    Results are pickled in `directory`, one file per key. The least recently used results are evicted once the total
+    size of the stored files exceeds `max_size`. The directory can be shared by several processes (Dask workers
+    included): files are written atomically and a missing file is simply a cache miss.
+
+    Args:
+        directory (typing.Union[str, Path]): Where the results are stored.
+        max_size (int): The maximum total size of the stored results, in bytes.
+
+    """
+
+    def __init__(self, directory: typing.Union[str, Path], max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._size = self.size()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._path(key).exists()
+
+    def size(self) -> int:
+        """
+        Returns the total size of the stored results.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def get(self, key: str) -> typing.Any:
+        """
+        Load a stored result and mark it as recently used.
+
+        Parameters:
+            key (str): The key of the result.
+
+        Returns:
+            typing.Any: The stored result.
+
+        Raises:
+            CacheMissError: If no result is stored for this key.
+        """
+        path = self._path(key)
+        try:
+            with path.open("rb") as file:
+                value = pickle.load(file)  # noqa: S301 the cache directory is trusted
+        except FileNotFoundError:
+            raise CacheMissError(key) from None
+        # The modification time is used as the last access time for the LRU eviction
+        path.touch(exist_ok=True)
+        return value
+
+    def put(self, key: str, value: typing.Any) -> None:
+        """
+        Store a result, then evict the least recently used results if the cache is too big.
+
+        Parameters:
+            key (str): The key of the result.
+            value (typing.Any): The result, it must be picklable.
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+        self.stats.writes += 1
+        self._size += path.stat().st_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used results until the cache fits in `max_size`.
+        """
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            self.stats.evictions += 1
+        self._size = size
+
+    def clear(self) -> None:
+        """
+        Remove all the stored results.
+        """
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def wrap(self, method: AnyCallable, key: str) -> AnyCallable:
+        """
+        Wrap a method so that its result is stored under `key` once computed.
+
+        Parameters:
+            method (AnyCallable): The method of a block.
+            key (str): The key of the block result.
+
+        Returns:
+            AnyCallable: The wrapped method.
+        """
+        return _CachedCall(self, method, key)
+
+
+class _CachedCall:
+    """Picklable callable computing a block and storing its result, so that it can run on any Dask worker."""
+
+    def __init__(self, cache: ResultCache, method: AnyCallable, key: str):
+        self.cache = cache
+        self.method = method
+        self.key = key
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        result = self.method(*args, **kwargs)
+        try:
+            self.cache.put(self.key, result)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError):
+            logger.warning("Could not store the result of key %s in the cache", self.key, exc_info=True)
+        return result
@@ -0,0 +1,267 @@
+import logging
+import shutil
+import sys
+import time
+import typing
+from pathlib import Path
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from curry.block import dump_blocks, load_blocks
+from curry.flow.cache import CacheMissError, ResultCache
+from curry.flow.compiler import CompiledWorkflow, compile_workflow
+
+logger = logging.getLogger("curry.flow.checkpoint")
+
+RunStatus = typing.Literal["running", "failed", "finished"]
+
+
+class CheckpointNotFoundError(KeyError):
+    """
+    Exception raised when no checkpoint is stored for a run.
+
+    Args:
+        run_id (str): The id of the run.
+
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.message = f"No checkpoint stored for run '{run_id}'"
+        super().__init__(self.message)
+
+
+class RunFailedError(Exception):
+    """
+    Exception raised when a checkpointed run fails, the results of its finished blocks being kept.
+
+    Args:
+        run_id (str): The id of the run, to give to `resume_workflow`.
+        error (BaseException): The error of the failed block.
+
+    """
+
+    def __init__(self, run_id: str, error: BaseException):
+        self.run_id = run_id
+        self.error = error
+        self.message = f"Run '{run_id}' failed ({error!r}), resume it with `resume_workflow`"
+        super().__init__(self.message)
+
+
+class CheckpointRun(BaseModel):
+    """
+    The state of a checkpointed run.
+
+    Attributes:
+        run_id (str): The id of the run.
+        status (RunStatus): `running`, `failed` or `finished`.
+        targets (list[str]): The ids of the blocks the run computes.
+        attempts (int): How many times the run was submitted (resumptions included).
+        created_at (float): When the run was first submitted (epoch, in seconds).
+        updated_at (float): When the status last changed (epoch, in seconds).
+        error (typing.Optional[str]): The error of the last failed attempt.
+    """
+
+    run_id: str
+    status: RunStatus
+    targets: list[str]
+    attempts: int = 1
+    created_at: float
+    updated_at: float
+    error: typing.Optional[str] = None
+
+
+class CheckpointCache(ResultCache):
+    """
+    The results of the finished blocks of a run, never evicted.
+
+    Results are also read from and written to the `shared` cache, if any, so that a checkpointed run still benefits
+    from the results of previous runs.
+
+    Args:
+        directory (typing.Union[str, Path]): Where the results are stored.
+        shared (typing.Optional[ResultCache]): The cache shared by the runs.
+
+    """
+
+    def __init__(self, directory: typing.Union[str, Path], shared: typing.Optional[ResultCache] = None):
+        super().__init__(directory, max_size=sys.maxsize)
+        self.shared = shared
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(key) or (self.shared is not None and key in self.shared)
+
+    def get(self, key: str) -> typing.Any:
+        try:
+            return super().get(key)
+        except CacheMissError:
+            if self.shared is None:
+                raise
+            return self.shared.get(key)
+
+    def put(self, key: str, value: typing.Any) -> None:
+        super().put(key, value)
+        if self.shared is not None:
+            self.shared.put(key, value)
+
+
+class CheckpointStore:
+    """
+    Keeps the definition, the state and the results of the finished blocks of the runs, so that a failed run can be
+    resumed: only the blocks without a result (the failed ones and those depending on them) are computed again.
+
+    Each run is stored in its own sub-directory: the workflow in `blocks.json`, its state in `run.json` and the
+    block results in `results/`, addressed by the content of the blocks (see `compute_block_key`). A block whose
+    method, parameters or upstream blocks changed before the resumption is thus computed again.
+
+    Args:
+        directory (typing.Union[str, Path]): Where the runs are stored.
+
+    """
+
+    def __init__(self, directory: typing.Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _run_directory(self, run_id: str) -> Path:
+        return self.directory / run_id
+
+    def _save(self, run: CheckpointRun) -> None:
+        path = self._run_directory(run.run_id) / "run.json"
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(run.model_dump_json())
+        temporary_path.replace(path)
+
+    def start(
+        self,
+        workflow: CompiledWorkflow,
+        targets: typing.Sequence[str],
+        run_id: typing.Optional[str] = None,
+    ) -> CheckpointRun:
+        """
+        Record that a run is submitted, or resubmitted when it is already stored.
+
+        Parameters:
+            workflow (CompiledWorkflow): The workflow.
+            targets (typing.Sequence[str]): The ids of the blocks the run computes.
+            run_id (typing.Optional[str]): The id of the run (default to a random uuid).
+
+        Returns:
+            CheckpointRun: The state of the run.
+        """
+        run_id = run_id or str(uuid4())
+        now = time.time()
+        run_directory = self._run_directory(run_id)
+        if (run_directory / "run.json").exists():
+            run = self.get(run_id).model_copy(
+                update={"status": "running", "targets": list(targets), "updated_at": now, "error": None}
+            )
+            run.attempts += 1
+        else:
+            run = CheckpointRun(run_id=run_id, status="running", targets=list(targets), created_at=now, updated_at=now)
+        run_directory.mkdir(exist_ok=True)
+        (run_directory / "blocks.json").write_text(
+            dump_blocks([workflow.blocks[block_id] for block_id in workflow.order])
+        )
+        self._save(run)
+        return run
+
+    def finish(self, run_id: str, error: typing.Optional[BaseException] = None) -> CheckpointRun:
+        """
+        Record the end of a run.
+
+        Parameters:
+            run_id (str): The id of the run.
+            error (typing.Optional[BaseException]): The error the run failed with, if it did.
+
+        Returns:
+            CheckpointRun: The state of the run.
+        """
+        run = self.get(run_id).model_copy(
+            update={
+                "status": "failed" if error is not None else "finished",
+                "updated_at": time.time(),
+                "error": repr(error) if error is not None else None,
+            }
+        )
+        self._save(run)
+        return run
+
+    def results(self, run_id: str, shared: typing.Optional[ResultCache] = None) -> CheckpointCache:
+        """
+        Returns the results of the finished blocks of a run.
+
+        Parameters:
+            run_id (str): The id of the run.
+            shared (typing.Optional[ResultCache]): The cache shared by the runs, see `CheckpointCache`.
+
+        Returns:
+            CheckpointCache: The results, new ones being added as the blocks finish.
+        """
+        return CheckpointCache(self._run_directory(run_id) / "results", shared)
+
+    def get(self, run_id: str) -> CheckpointRun:
+        """
+        Returns the state of a run.
+
+        Parameters:
+            run_id (str): The id of the run.
+
+        Returns:
+            CheckpointRun: The state of the run.
+
+        Raises:
+            CheckpointNotFoundError: If the run is not stored.
+        """
+        try:
+            return CheckpointRun.model_validate_json((self._run_directory(run_id) / "run.json").read_bytes())
+        except FileNotFoundError:
+            raise CheckpointNotFoundError(run_id) from None
+
+    def load(self, run_id: str) -> tuple[CompiledWorkflow, list[str]]:
+        """
+        Load the workflow of a run and its targets, to resume it.
+
+        Parameters:
+            run_id (str): The id of the run.
+
+        Returns:
+            tuple[CompiledWorkflow, list[str]]: The compiled workflow and the ids of the blocks the run computes.
+
+        Raises:
+            CheckpointNotFoundError: If the run is not stored.
+        """
+        run = self.get(run_id)
+        blocks = load_blocks((self._run_directory(run_id) / "blocks.json").read_bytes())
+        return compile_workflow(blocks), run.targets
+
+    def runs(self, status: typing.Optional[RunStatus] = None) -> list[CheckpointRun]:
+        """
+        List the stored runs, the most recent first.
+
+        Parameters:
+            status (typing.Optional[RunStatus]): Only list the runs in this state.
+
+        Returns:
+            list[CheckpointRun]: The states of the runs.
+        """
+        runs = []
+        for path in self.directory.glob("*/run.json"):
+            try:
+                run = CheckpointRun.model_validate_json(path.read_bytes())
+            except (FileNotFoundError, ValueError):
+                logger.warning("Ignoring the unreadable checkpoint %s", path)
+                continue
+            if status is None or run.status == status:
+                runs.append(run)
+        return sorted(runs, key=lambda run: run.created_at, reverse=True)
+
+    def delete(self, run_id: str) -> None:
+        """
+        Remove a run and the results of its blocks.
+
+        Parameters:
+            run_id (str): The id of the run.
+        """
+        shutil.rmtree(self._run_directory(run_id), ignore_errors=True)
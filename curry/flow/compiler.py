@@ -0,0 +1,211 @@
+import typing
+from collections import deque
+
+from pydantic import BaseModel, ConfigDict
+
+from curry.block import Block, load_blocks
+from curry.flow.errors import CycleDetectedError, DanglingConnectionError, DuplicateBlockError, UnknownBlockError
+from curry.utils.typing import AnyDict
+
+
+class CompiledWorkflow(BaseModel):
+    """
+    A validated and topologically sorted workflow, ready to be turned into a Dask graph.
+
+    A compiled workflow can be kept and submitted several times: the adjacency index, the ordering and the
+    validation are only computed once, by `compile_workflow`.
+
+    Attributes:
+        blocks (dict[str, Block]): The blocks of the workflow, indexed by id.
+        order (list[str]): The block ids in topological order (upstream blocks first).
+        parents (dict[str, list[str]]): For each block id, the ids of the blocks it is connected to.
+        children (dict[str, list[str]]): For each block id, the ids of the blocks connected to it.
+        sources (list[str]): The ids of the blocks without upstream block, in topological order.
+        sinks (list[str]): The ids of the blocks without downstream block, in topological order.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    blocks: dict[str, Block]
+    order: list[str]
+    parents: dict[str, list[str]]
+    children: dict[str, list[str]]
+    sources: list[str]
+    sinks: list[str]
+
+    @classmethod
+    def from_json(cls, data: typing.Union[str, bytes, typing.Sequence[AnyDict]]) -> "CompiledWorkflow":
+        """
+        Load and compile a workflow definition in one pass, validating all the blocks at once.
+
+        Args:
+            data (typing.Union[str, bytes, typing.Sequence[AnyDict]]): A JSON array of blocks, or the decoded list.
+
+        Returns:
+            CompiledWorkflow: The compiled workflow.
+
+        Raises:
+            pydantic.ValidationError: If a block definition is invalid.
+            WorkflowCompilationError: If the blocks do not form a valid workflow.
+        """
+        return compile_workflow(load_blocks(data))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __contains__(self, block_id: object) -> bool:
+        return block_id in self.blocks
+
+    def ordered_blocks(self) -> list[Block]:
+        """
+        Returns the blocks of the workflow in topological order.
+
+        Returns:
+            list[Block]: The blocks, upstream blocks first.
+        """
+        return [self.blocks[block_id] for block_id in self.order]
+
+    def ancestors(self, block_ids: typing.Iterable[str], boundaries: typing.Container[str] = ()) -> list[str]:
+        """
+        Returns the given blocks and all the blocks they depend on, in topological order.
+
+        Parameters:
+            block_ids (typing.Iterable[str]): The ids of the blocks to reach.
+            boundaries (typing.Container[str]): The ids of blocks whose own ancestors are not needed (e.g. because
+                their result is already known).
+
+        Returns:
+            list[str]: The ids of the blocks needed to compute the given blocks.
+
+        Raises:
+            UnknownBlockError: If one of the block ids is not part of the workflow.
+        """
+        needed: set[str] = set()
+        stack: list[str] = []
+        for block_id in block_ids:
+            if block_id not in self.blocks:
+                raise UnknownBlockError(block_id)
+            stack.append(block_id)
+        while stack:
+            block_id = stack.pop()
+            if block_id in needed:
+                continue
+            needed.add(block_id)
+            if block_id not in boundaries:
+                stack.extend(self.parents[block_id])
+        if len(needed) == len(self.order):
+            return list(self.order)
+        return [block_id for block_id in self.order if block_id in needed]
+
+    def descendants(self, block_ids: typing.Iterable[str]) -> list[str]:
+        """
+        Returns the given blocks and all the blocks depending on them, in topological order.
+
+        Parameters:
+            block_ids (typing.Iterable[str]): The ids of the blocks to start from.
+
+        Returns:
+            list[str]: The ids of the blocks impacted by the given blocks.
+
+        Raises:
+            UnknownBlockError: If one of the block ids is not part of the workflow.
+        """
+        impacted: set[str] = set()
+        stack: list[str] = []
+        for block_id in block_ids:
+            if block_id not in self.blocks:
+                raise UnknownBlockError(block_id)
+            stack.append(block_id)
+        while stack:
+            block_id = stack.pop()
+            if block_id in impacted:
+                continue
+            impacted.add(block_id)
+            stack.extend(self.children[block_id])
+        return [block_id for block_id in self.order if block_id in impacted]
+
+
+def _find_cycle(remaining: set[str], parents: dict[str, list[str]]) -> list[str]:
+    """Walk up the parents of the blocks left over by Kahn's algorithm until a block is seen twice."""
+    # Every remaining block has at least one remaining parent, so the walk always ends on a cycle
+    current = next(iter(sorted(remaining)))
+    path: list[str] = []
+    positions: dict[str, int] = {}
+    while current not in positions:
+        positions[current] = len(path)
+        path.append(current)
+        current = next(parent for parent in parents[current] if parent in remaining)
+    cycle = path[positions[current] :]
+    cycle.reverse()
+    return [*cycle, cycle[0]]
+
+
+def _build_adjacency(blocks_by_id: dict[str, Block]) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+    """Index the parents and children of every block (a block fed twice by the same block only counts one edge)."""
+    parents: dict[str, list[str]] = {block_id: [] for block_id in blocks_by_id}
+    children: dict[str, list[str]] = {block_id: [] for block_id in blocks_by_id}
+    for block_id, block in blocks_by_id.items():
+        block_parents = parents[block_id]
+        for connection in block.connections:
+            source_block_id = connection.source_block_id
+            if source_block_id not in blocks_by_id:
+                raise DanglingConnectionError(block_id, source_block_id)
+            if source_block_id not in block_parents:
+                block_parents.append(source_block_id)
+                children[source_block_id].append(block_id)
+    return parents, children
+
+
+def _topological_sort(parents: dict[str, list[str]], children: dict[str, list[str]]) -> list[str]:
+    """Kahn's algorithm, stable with regards to the original order of the blocks."""
+    in_degrees = {block_id: len(block_parents) for block_id, block_parents in parents.items()}
+    ready = deque(block_id for block_id, in_degree in in_degrees.items() if in_degree == 0)
+    order: list[str] = []
+    while ready:
+        block_id = ready.popleft()
+        order.append(block_id)
+        for child_id in children[block_id]:
+            in_degrees[child_id] -= 1
+            if in_degrees[child_id] == 0:
+                ready.append(child_id)
+
+    if len(order) != len(parents):
+        remaining = {block_id for block_id, in_degree in in_degrees.items() if in_degree > 0}
+        raise CycleDetectedError(_find_cycle(remaining, parents))
+    return order
+
+
+def compile_workflow(blocks: typing.Iterable[Block]) -> CompiledWorkflow:
+    """
+    Validate a list of blocks and sort it topologically, in O(V+E).
+
+    The blocks can be given in any order. Blocks that do not depend on each other keep their relative order.
+
+    Args:
+        blocks (typing.Iterable[Block]): The blocks of the workflow.
+
+    Returns:
+        CompiledWorkflow: The compiled workflow.
+
+    Raises:
+        DuplicateBlockError: If two blocks share the same id.
+        DanglingConnectionError: If a block is connected to a block that is not part of the workflow.
+        CycleDetectedError: If the connections form a cycle.
+    """
+    blocks_by_id: dict[str, Block] = {}
+    for block in blocks:
+        if block.id in blocks_by_id:
+            raise DuplicateBlockError(block.id)
+        blocks_by_id[block.id] = block
+
+    parents, children = _build_adjacency(blocks_by_id)
+    order = _topological_sort(parents, children)
+
+    return CompiledWorkflow(
+        blocks=blocks_by_id,
+        order=order,
+        parents=parents,
+        children=children,
+        sources=[block_id for block_id in order if not parents[block_id]],
+        sinks=[block_id for block_id in order if not children[block_id]],
+    )
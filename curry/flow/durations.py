@@ -0,0 +1,214 @@
+import logging
+import threading
+import typing
+from pathlib import Path
+
+from pydantic import BaseModel, TypeAdapter
+
+from curry.flow.compiler import CompiledWorkflow
+from curry.flow.instrumentation import RunReport
+from curry.methods import MethodManager
+from curry.methods.manager import MethodInfo, NotRegisteredError
+
+logger = logging.getLogger("curry.flow.durations")
+
+DEFAULT_SMOOTHING = 0.3
+
+
+class DurationStats(BaseModel):
+    """
+    Running statistics of the duration of a method.
+
+    Attributes:
+        mean (float): The exponentially weighted moving average of the duration, in seconds.
+        last (float): The last observed duration, in seconds.
+        minimum (float): The shortest observed duration, in seconds.
+        maximum (float): The longest observed duration, in seconds.
+        count (int): The number of observations.
+    """
+
+    mean: float
+    last: float
+    minimum: float
+    maximum: float
+    count: int = 1
+
+    def observe(self, duration: float, smoothing: float) -> None:
+        """
+        Add an observation, weighted by `smoothing` in the moving average.
+
+        Parameters:
+            duration (float): The duration, in seconds.
+            smoothing (float): The weight of the new observation, between 0 and 1.
+        """
+        self.mean += smoothing * (duration - self.mean)
+        self.last = duration
+        self.minimum = min(self.minimum, duration)
+        self.maximum = max(self.maximum, duration)
+        self.count += 1
+
+
+_STATS_ADAPTER = TypeAdapter(dict[str, DurationStats])
+
+
+def method_key(method_info: MethodInfo) -> str:
+    """The key of the statistics of a method: a new version of a method starts with no history."""
+    return f"{method_info.id}:{method_info.version}"
+
+
+class DurationHistory:
+    """
+    The durations of the methods measured in previous runs, used to prioritize the longest chains of blocks.
+
+    Statistics are kept per method id and version, as exponentially weighted moving averages so that they follow
+    slow changes of the data. A mapped block contributes the duration of each of its chunks, which run in parallel.
+
+    Args:
+        path (typing.Optional[typing.Union[str, Path]]): The JSON file the statistics are loaded from, if it exists,
+            and saved to (default to in-memory statistics only).
+        smoothing (float): The weight of a new observation in the moving average, between 0 and 1.
+
+    """
+
+    def __init__(self, path: typing.Optional[typing.Union[str, Path]] = None, smoothing: float = DEFAULT_SMOOTHING):
+        self.path = Path(path) if path is not None else None
+        self.smoothing = smoothing
+        self.stats: dict[str, DurationStats] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.stats = _STATS_ADAPTER.validate_json(self.path.read_bytes())
+
+    def observe(self, method_info: MethodInfo, duration: float) -> None:
+        """
+        Record a duration of a method.
+
+        Parameters:
+            method_info (MethodInfo): The method.
+            duration (float): The duration, in seconds.
+        """
+        key = method_key(method_info)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                self.stats[key] = DurationStats(mean=duration, last=duration, minimum=duration, maximum=duration)
+            else:
+                stats.observe(duration, self.smoothing)
+
+    def record(self, report: RunReport) -> int:
+        """
+        Record the durations of the blocks of a run that succeeded (streaming pipelines are ignored).
+
+        Parameters:
+            report (RunReport): The report of the run.
+
+        Returns:
+            int: The number of recorded durations.
+        """
+        recorded = 0
+        for event in report.blocks:
+            if event.error is not None:
+                continue
+            try:
+                method_info = MethodManager.get_method_info(event.method_id)
+            except NotRegisteredError:
+                continue
+            self.observe(method_info, event.duration)
+            recorded += 1
+        return recorded
+
+    def expected(self, method_info: MethodInfo) -> typing.Optional[float]:
+        """
+        Returns the expected duration of a method, in seconds, if it ran before.
+        """
+        stats = self.stats.get(method_key(method_info))
+        return stats.mean if stats is not None else None
+
+    def block_durations(
+        self, workflow: CompiledWorkflow, block_ids: typing.Optional[typing.Iterable[str]] = None
+    ) -> dict[str, float]:
+        """
+        Returns the expected duration of the blocks of a workflow.
+
+        Blocks whose method never ran are expected to last the average duration of the known blocks.
+
+        Parameters:
+            workflow (CompiledWorkflow): The workflow.
+            block_ids (typing.Optional[typing.Iterable[str]]): The blocks (default to all the blocks).
+
+        Returns:
+            dict[str, float]: The durations in seconds, indexed by block id, empty if no method of the blocks ran.
+        """
+        expected: dict[str, typing.Optional[float]] = {
+            block_id: self.expected(MethodManager.get_method_info(workflow.blocks[block_id].method_id))
+            for block_id in (workflow.order if block_ids is None else block_ids)
+        }
+        known = [duration for duration in expected.values() if duration is not None]
+        if not known:
+            return {}
+        default = sum(known) / len(known)
+        return {block_id: default if duration is None else duration for block_id, duration in expected.items()}
+
+    def save(self, path: typing.Optional[typing.Union[str, Path]] = None) -> None:
+        """
+        Write the statistics as JSON.
+
+        Parameters:
+            path (typing.Optional[typing.Union[str, Path]]): The file to write (default to the file of the history).
+        """
+        path = Path(path) if path is not None else self.path
+        if path is None:
+            return
+        with self._lock:
+            data = _STATS_ADAPTER.dump_json(self.stats, indent=2)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        temporary_path.write_bytes(data)
+        temporary_path.replace(path)
+
+
+def remaining_critical_paths(
+    workflow: CompiledWorkflow, durations: typing.Mapping[str, float], block_ids: typing.Iterable[str]
+) -> dict[str, float]:
+    """
+    Returns, for each block, the duration of the longest chain of blocks from its start to the end of the workflow.
+
+    Parameters:
+        workflow (CompiledWorkflow): The workflow.
+        durations (typing.Mapping[str, float]): The expected durations of the blocks, indexed by block id.
+        block_ids (typing.Iterable[str]): The blocks to compute, in topological order, only their chains are measured.
+
+    Returns:
+        dict[str, float]: The remaining critical path length in seconds, indexed by block id.
+    """
+    block_ids = list(block_ids)
+    remaining: dict[str, float] = {}
+    for block_id in reversed(block_ids):
+        downstream = (remaining[child_id] for child_id in workflow.children[block_id] if child_id in remaining)
+        remaining[block_id] = durations.get(block_id, 0.0) + max(downstream, default=0.0)
+    return remaining
+
+
+def critical_path_priorities(
+    workflow: CompiledWorkflow, durations: typing.Mapping[str, float], block_ids: typing.Iterable[str]
+) -> dict[str, float]:
+    """
+    Turn the remaining critical paths of the blocks into Dask priorities between 0 and 1.
+
+    Blocks heading the longest chains get the highest priorities and start first. The priorities stay below 1 so
+    that the integer priorities of the methods (see `ResourceHints.priority`) always prevail.
+
+    Parameters:
+        workflow (CompiledWorkflow): The workflow.
+        durations (typing.Mapping[str, float]): The expected durations of the blocks, indexed by block id.
+        block_ids (typing.Iterable[str]): The blocks to compute, in topological order.
+
+    Returns:
+        dict[str, float]: The priorities, indexed by block id, empty without durations.
+    """
+    if not durations:
+        return {}
+    remaining = remaining_critical_paths(workflow, durations, block_ids)
+    longest = max(remaining.values(), default=0.0)
+    if longest <= 0:
+        return {}
+    return {block_id: 0.99 * length / longest for block_id, length in remaining.items()}
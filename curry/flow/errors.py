@@ -0,0 +1,104 @@
+class WorkflowCompilationError(Exception):
+    """
+    Base exception raised when a list of blocks cannot be compiled into a workflow.
+    """
+
+
+class DuplicateBlockError(WorkflowCompilationError):
+    """
+    Exception raised when two blocks of a workflow share the same id.
+
+    Args:
+        block_id (str): The duplicated block id.
+
+    """
+
+    def __init__(self, block_id: str):
+        self.block_id = block_id
+        self.message = f"Block '{block_id}' is defined more than once"
+        super().__init__(self.message)
+
+
+class DanglingConnectionError(WorkflowCompilationError):
+    """
+    Exception raised when a block is connected to a block that is not part of the workflow.
+
+    Args:
+        block_id (str): The id of the block holding the connection.
+        source_block_id (str): The id of the missing upstream block.
+
+    """
+
+    def __init__(self, block_id: str, source_block_id: str):
+        self.block_id = block_id
+        self.source_block_id = source_block_id
+        self.message = f"Block '{block_id}' is connected to unknown block '{source_block_id}'"
+        super().__init__(self.message)
+
+
+class CycleDetectedError(WorkflowCompilationError):
+    """
+    Exception raised when the connections of a workflow form a cycle.
+
+    Args:
+        cycle (list[str]): The block ids forming the cycle, the first id being repeated at the end.
+
+    """
+
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        self.message = f"Workflow contains a cycle: {' -> '.join(cycle)}"
+        super().__init__(self.message)
+
+
+class StreamingConnectionError(WorkflowCompilationError):
+    """
+    Exception raised when a streaming connection cannot be pipelined.
+
+    Args:
+        block_id (str): The id of the block holding the connection.
+        source_block_id (str): The id of the upstream block.
+        reason (str): Why the connection cannot be streamed.
+
+    """
+
+    def __init__(self, block_id: str, source_block_id: str, reason: str):
+        self.block_id = block_id
+        self.source_block_id = source_block_id
+        self.reason = reason
+        self.message = f"Block '{block_id}' cannot stream from block '{source_block_id}': {reason}"
+        super().__init__(self.message)
+
+
+class UnknownBlockError(Exception):
+    """
+    Exception raised when a block id does not belong to the workflow.
+
+    Args:
+        block_id (str): The unknown block id.
+
+    """
+
+    def __init__(self, block_id: str):
+        self.block_id = block_id
+        self.message = f"Block '{block_id}' is not part of the workflow"
+        super().__init__(self.message)
+
+
+class UnknownOutputError(WorkflowCompilationError):
+    """
+    Exception raised when a connection refers to an output the upstream method does not declare.
+
+    Args:
+        block_id (str): The id of the block holding the connection.
+        source_block_id (str): The id of the upstream block.
+        output_name (str): The unknown output.
+
+    """
+
+    def __init__(self, block_id: str, source_block_id: str, output_name: str):
+        self.block_id = block_id
+        self.source_block_id = source_block_id
+        self.output_name = output_name
+        self.message = f"Block '{block_id}' is connected to unknown output '{output_name}' of block '{source_block_id}'"
+        super().__init__(self.message)
@@ -0,0 +1,102 @@
+import datetime
+import hashlib
+import json
+import typing
+from uuid import uuid4
+
+from dask.base import tokenize
+from pydantic import BaseModel
+
+from curry.block import Block
+from curry.flow.compiler import CompiledWorkflow
+from curry.methods import MethodManager
+
+
+def _canonical_default(value: typing.Any) -> typing.Any:
+    """Turn the values `json` does not know into a stable representation."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    # dask knows how to hash numpy arrays, pandas objects and most of the python builtins deterministically
+    return {"__token__": tokenize(value)}
+
+
+def canonicalize_parameters(parameters: typing.Mapping[str, typing.Any]) -> str:
+    """
+    Serialize block parameters into a string that does not depend on the key order.
+
+    Args:
+        parameters (typing.Mapping[str, typing.Any]): The parameters of a block.
+
+    Returns:
+        str: The canonical JSON representation of the parameters.
+    """
+    return json.dumps(parameters, sort_keys=True, separators=(",", ":"), default=_canonical_default)
+
+
+def compute_block_key(
+    block: Block, upstream_keys: typing.Mapping[str, str], run_id: typing.Optional[str] = None
+) -> str:
+    """
+    Compute the content-addressed key of a block.
+
+    The key only depends on what the block computes: the method id, the method code, the parameters, the
+    mapping and the keys of the connected upstream blocks. Two blocks sharing the same key produce the same result.
+    The key of a block whose method is not deterministic (and that does not give it a seed, see
+    `MethodInfo.is_deterministic`) also depends on the block id and on the run: it is never shared, neither within
+    a run nor between runs, and neither are the keys of the blocks depending on it.
+
+    Args:
+        block (Block): The block.
+        upstream_keys (typing.Mapping[str, str]): The keys of the upstream blocks, indexed by block id.
+        run_id (typing.Optional[str]): The id of the run, only used by the blocks whose method is not deterministic
+            (default to a random nonce).
+
+    Returns:
+        str: The SHA-256 hex digest identifying the result of the block.
+    """
+    method_info = MethodManager.get_method_info(block.method_id)
+    connections = sorted(
+        (
+            connection.self_input_name,
+            connection.source_output_name,
+            upstream_keys[connection.source_block_id],
+            connection.streaming,
+        )
+        for connection in block.connections
+    )
+    parts = [
+        str(method_info.id),
+        method_info.code_hash,
+        canonicalize_parameters(block.parameters),
+        json.dumps(connections, separators=(",", ":")),
+        block.mapping.model_dump_json() if block.mapping is not None else "",
+    ]
+    connected_inputs = [connection.self_input_name for connection in block.connections]
+    if not method_info.is_deterministic(block.parameters, connected_inputs):
+        parts.extend([f"block:{block.id}", f"run:{run_id or uuid4()}"])
+    payload = "\n".join(parts)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def compute_block_keys(
+    workflow: CompiledWorkflow, block_ids: typing.Iterable[str], run_id: typing.Optional[str] = None
+) -> dict[str, str]:
+    """
+    Compute the content-addressed keys of blocks of a workflow.
+
+    Args:
+        workflow (CompiledWorkflow): The compiled workflow.
+        block_ids (typing.Iterable[str]): The ids of the blocks, in topological order, with all their ancestors.
+        run_id (typing.Optional[str]): The id of the run, see `compute_block_key`.
+
+    Returns:
+        dict[str, str]: The key of every block, indexed by block id.
+    """
+    keys: dict[str, str] = {}
+    for block_id in block_ids:
+        keys[block_id] = compute_block_key(workflow.blocks[block_id], keys, run_id)
+    return keys
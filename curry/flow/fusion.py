@@ -0,0 +1,111 @@
+import typing
+
+from curry.flow.compiler import CompiledWorkflow
+from curry.utils.typing import AnyDict
+
+# Blocks whose method is expected to last less than this, in seconds, are fused like lightweight methods
+DEFAULT_FUSION_THRESHOLD = 0.005
+
+
+class FusedStep:
+    """
+    One block of a fused chain: its method, its fixed parameters and the inputs fed by the previous block.
+
+    Args:
+        block_id (str): The id of the block.
+        method (typing.Callable[..., typing.Any]): The method of the block.
+        parameters (AnyDict): The parameters of the block, without the connections from the previous block.
+        input_names (list[str]): The inputs receiving the result of the previous block (empty for the first block).
+
+    """
+
+    def __init__(
+        self,
+        block_id: str,
+        method: typing.Callable[..., typing.Any],
+        parameters: AnyDict,
+        input_names: list[str],
+    ):
+        self.block_id = block_id
+        self.method = method
+        self.parameters = parameters
+        self.input_names = input_names
+
+
+class FusedChain:
+    """
+    Picklable callable running a linear chain of blocks in one task, each block getting the result of the previous
+    one, without any round trip to the scheduler.
+
+    The task returns the result of the last block, or the results of the `exposed` blocks indexed by block id when
+    intermediate results are needed (targets, inspection).
+
+    Args:
+        steps (list[FusedStep]): The blocks of the chain, in order.
+        exposed (typing.Optional[typing.Collection[str]]): The ids of the blocks whose result is returned (default to
+            the last block only).
+
+    """
+
+    def __init__(self, steps: list[FusedStep], exposed: typing.Optional[typing.Collection[str]] = None):
+        self.steps = steps
+        self.exposed = set(exposed) if exposed is not None else None
+
+    def __call__(self, **parameters: typing.Any) -> typing.Any:
+        head, *tail = self.steps
+        result = head.method(**parameters)
+        results = {head.block_id: result}
+        for step in tail:
+            result = step.method(**step.parameters, **dict.fromkeys(step.input_names, result))
+            results[step.block_id] = result
+        if self.exposed is None:
+            return result
+        return {block_id: value for block_id, value in results.items() if block_id in self.exposed}
+
+
+def find_fusable_chains(
+    workflow: CompiledWorkflow,
+    block_ids: typing.Sequence[str],
+    fusable: typing.Callable[[str], bool],
+    compatible: typing.Optional[typing.Callable[[str, str], bool]] = None,
+) -> list[list[str]]:
+    """
+    Find the linear chains of fusable blocks: each block of a chain is the only parent of the next one, which is its
+    only child among the computed blocks.
+
+    Parameters:
+        workflow (CompiledWorkflow): The compiled workflow.
+        block_ids (typing.Sequence[str]): The computed blocks, in topological order.
+        fusable (typing.Callable[[str], bool]): Whether a block may be fused (e.g. its method is lightweight).
+        compatible (typing.Optional[typing.Callable[[str, str], bool]]): Whether a block may be fused with the next
+            one (e.g. they need the same resources).
+
+    Returns:
+        list[list[str]]: The chains of at least two blocks, in topological order of their first block.
+    """
+    needed = set(block_ids)
+    next_block_ids: dict[str, str] = {}
+    has_previous: set[str] = set()
+    for block_id in block_ids:
+        if not fusable(block_id):
+            continue
+        children = [child_id for child_id in workflow.children[block_id] if child_id in needed]
+        if len(children) != 1:
+            continue
+        child_id = children[0]
+        if workflow.parents[child_id] != [block_id] or not fusable(child_id):
+            continue
+        if compatible is not None and not compatible(block_id, child_id):
+            continue
+        next_block_ids[block_id] = child_id
+        has_previous.add(child_id)
+
+    chains = []
+    for block_id in block_ids:
+        if block_id not in next_block_ids or block_id in has_previous:
+            continue
+        chain = [block_id]
+        while chain[-1] in next_block_ids:
+            chain.append(next_block_ids[chain[-1]])
+        chains.append(chain)
+    return chains
@@ -0,0 +1,205 @@
+import typing
+
+import dask
+from distributed import Client
+from pydantic import BaseModel
+
+from curry.block import Block, BlockMapping
+from curry.flow.cache import ResultCache
+from curry.flow.compiler import CompiledWorkflow, compile_workflow
+from curry.flow.fingerprint import canonicalize_parameters
+from curry.flow.workflow import build_workflow_graph, cluster_resources
+from curry.methods import MethodManager
+from curry.utils.typing import AnyDict
+
+
+class WorkflowDiff(BaseModel):
+    """
+    The structural differences between two versions of a workflow.
+
+    Attributes:
+        added (list[str]): The ids of the blocks only present in the new version.
+        removed (list[str]): The ids of the blocks only present in the previous version.
+        changed (list[str]): The ids of the blocks whose method, parameters, connections or mapping changed.
+        invalidated (list[str]): The ids of the added and changed blocks and of all the blocks depending on them.
+        unchanged (list[str]): The ids of the blocks whose previous result is still valid.
+    """
+
+    added: list[str] = []
+    removed: list[str] = []
+    changed: list[str] = []
+    invalidated: list[str] = []
+    unchanged: list[str] = []
+
+
+def _block_signature(
+    block: Block,
+) -> tuple[str, str, str, list[tuple[str, str, str, bool]], typing.Optional[BlockMapping]]:
+    method_info = MethodManager.get_method_info(block.method_id)
+    connections = sorted(
+        (connection.self_input_name, connection.source_output_name, connection.source_block_id, connection.streaming)
+        for connection in block.connections
+    )
+    return (
+        str(method_info.id),
+        method_info.code_hash,
+        canonicalize_parameters(block.parameters),
+        connections,
+        block.mapping,
+    )
+
+
+def diff_workflows(previous: CompiledWorkflow, current: CompiledWorkflow) -> WorkflowDiff:
+    """
+    Compare two versions of a workflow, block by block.
+
+    Args:
+        previous (CompiledWorkflow): The previous version of the workflow.
+        current (CompiledWorkflow): The new version of the workflow.
+
+    Returns:
+        WorkflowDiff: The differences, block ids being listed in the topological order of their version.
+    """
+    added = [block_id for block_id in current.order if block_id not in previous.blocks]
+    removed = [block_id for block_id in previous.order if block_id not in current.blocks]
+    changed = [
+        block_id
+        for block_id in current.order
+        if block_id in previous.blocks
+        and _block_signature(previous.blocks[block_id]) != _block_signature(current.blocks[block_id])
+    ]
+    invalidated = current.descendants([*added, *changed])
+    invalidated_ids = set(invalidated)
+    return WorkflowDiff(
+        added=added,
+        removed=removed,
+        changed=changed,
+        invalidated=invalidated,
+        unchanged=[block_id for block_id in current.order if block_id not in invalidated_ids],
+    )
+
+
+class IncrementalWorkflow:
+    """
+    Keep the last compiled version of a workflow and the results of its blocks, to only recompute what changed.
+
+    Every submission diffs the new blocks against the previous version: the results of the unchanged blocks are
+    reused, only the changed blocks and their descendants are computed. Results are held in memory, or in the
+    cluster memory as futures when a `distributed` client is given. A result cache can be added to also serve
+    results from disk (e.g. after a restart of the process).
+
+    Args:
+        workflow_id (str): The id of the workflow.
+        client (typing.Optional[Client]): The `distributed` client used to compute and hold the results.
+        cache (typing.Optional[ResultCache]): The cache of block results.
+
+    """
+
+    _sessions: typing.ClassVar[dict[str, "IncrementalWorkflow"]] = {}
+
+    def __init__(
+        self,
+        workflow_id: str,
+        client: typing.Optional[Client] = None,
+        cache: typing.Optional[ResultCache] = None,
+    ):
+        self.workflow_id = workflow_id
+        self.client = client
+        self.cache = cache
+        self.workflow: typing.Optional[CompiledWorkflow] = None
+        self._results: AnyDict = {}
+
+    @classmethod
+    def get(
+        cls,
+        workflow_id: str,
+        client: typing.Optional[Client] = None,
+        cache: typing.Optional[ResultCache] = None,
+    ) -> "IncrementalWorkflow":
+        """Retrieve the session of a workflow, creating it on first use."""
+        session = cls._sessions.get(workflow_id)
+        if session is None:
+            session = cls._sessions[workflow_id] = cls(workflow_id, client=client, cache=cache)
+        return session
+
+    @classmethod
+    def forget(cls, workflow_id: str) -> None:
+        """Drop the session of a workflow and the results it holds."""
+        session = cls._sessions.pop(workflow_id, None)
+        if session is not None:
+            session.reset()
+
+    def reset(self) -> None:
+        """
+        Drop the previous version of the workflow and its results.
+        """
+        self.workflow = None
+        self._results = {}
+
+    @property
+    def held_results(self) -> list[str]:
+        """The ids of the blocks whose result is held."""
+        return list(self._results)
+
+    def submit(
+        self,
+        blocks: typing.Union[list[Block], CompiledWorkflow],
+        targets: typing.Optional[typing.Sequence[str]] = None,
+    ) -> AnyDict:
+        """
+        Compute a new version of the workflow, reusing the results of the blocks that did not change.
+
+        Args:
+            blocks (typing.Union[list[Block], CompiledWorkflow]): The blocks, in any order, or a compiled workflow.
+            targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute (default to the sinks).
+
+        Returns:
+            AnyDict: Like `submit_workflow`, with the `diff` against the previous version.
+        """
+        workflow = blocks if isinstance(blocks, CompiledWorkflow) else compile_workflow(blocks)
+        diff = (
+            diff_workflows(self.workflow, workflow)
+            if self.workflow is not None
+            else WorkflowDiff(added=list(workflow.order), invalidated=list(workflow.order))
+        )
+
+        # Only the results that are still valid are reused, the session is updated once the run succeeded
+        unchanged_ids = set(diff.unchanged)
+        valid_results = {block_id: value for block_id, value in self._results.items() if block_id in unchanged_ids}
+
+        target_ids = list(workflow.sinks if targets is None else dict.fromkeys(targets))
+        task_dict = build_workflow_graph(
+            workflow,
+            target_ids,
+            cache=self.cache,
+            precomputed=valid_results,
+            # Every block result is held to be reused by the next versions
+            keep_intermediates=True,
+            available_resources=cluster_resources(self.client) if self.client is not None else None,
+        )
+        new_ids = [block_id for block_id in task_dict if block_id not in valid_results]
+        new_tasks = [task_dict[block_id] for block_id in new_ids]
+
+        # Every computed block is held, so that any later version can reuse it
+        if self.client is not None:
+            new_results = dict(zip(new_ids, self.client.compute(new_tasks)))
+            held_results = {**valid_results, **new_results}
+            try:
+                results = dict(zip(target_ids, self.client.gather([held_results[block_id] for block_id in target_ids])))
+            except Exception:
+                # Errored futures are released, so that their keys are computed again by the next runs. Unlike
+                # `Client.cancel`, releasing goes through the same stream as the next submissions and cannot race them.
+                for future in new_results.values():
+                    future.release()
+                raise
+        else:
+            held_results = {**valid_results, **dict(zip(new_ids, dask.compute(*new_tasks)))}
+            results = {block_id: held_results[block_id] for block_id in target_ids}
+
+        self.workflow = workflow
+        self._results = held_results
+        return {
+            "result": results.get(target_ids[-1]) if target_ids else None,
+            "results": results,
+            "diff": diff,
+        }
@@ -0,0 +1,351 @@
+import functools
+import threading
+import time
+import typing
+from pathlib import Path
+from uuid import uuid4
+
+from dask.sizeof import sizeof
+from distributed import Client, get_worker
+from pydantic import BaseModel
+
+from curry.utils.typing import AnyDict
+
+BLOCK_EVENTS_TOPIC = "curry-block-events"
+
+
+class GraphBuildEvent(BaseModel):
+    """
+    Emitted once the Dask graph of a workflow is built.
+
+    Attributes:
+        run_id (str): The id of the run.
+        block_count (int): The number of blocks of the workflow.
+        task_count (int): The number of blocks that got a task (needed, not cached and not precomputed).
+        duration (float): The time spent building the graph, in seconds.
+    """
+
+    kind: typing.Literal["graph_build"] = "graph_build"
+    run_id: str
+    block_count: int
+    task_count: int
+    duration: float
+
+
+class BlockEvent(BaseModel):
+    """
+    Emitted each time the method of a block has run.
+
+    Attributes:
+        run_id (str): The id of the run.
+        block_id (str): The id of the block.
+        method_id (str): The method of the block.
+        started_at (float): When the method started (epoch, in seconds).
+        ended_at (float): When the method ended (epoch, in seconds).
+        duration (float): The duration of the method, in seconds.
+        queue_time (typing.Optional[float]): The time between the submission of the graph and the start of the method.
+        result_size (typing.Optional[int]): The approximate size of the result, in bytes.
+        worker (str): The Dask worker address, or the thread name with the local schedulers.
+        error (typing.Optional[str]): The error raised by the method, if any.
+    """
+
+    kind: typing.Literal["block"] = "block"
+    run_id: str
+    block_id: str
+    method_id: str
+    started_at: float
+    ended_at: float
+    duration: float
+    queue_time: typing.Optional[float] = None
+    result_size: typing.Optional[int] = None
+    worker: str
+    error: typing.Optional[str] = None
+
+
+WorkflowEvent = typing.Union[GraphBuildEvent, BlockEvent]
+WorkflowHook = typing.Callable[[WorkflowEvent], None]
+
+
+class RunReport(BaseModel):
+    """
+    All the events of a run.
+
+    Attributes:
+        run_id (str): The id of the run.
+        submitted_at (typing.Optional[float]): When the graph was submitted (epoch, in seconds).
+        graph_build (typing.Optional[GraphBuildEvent]): The graph construction timing.
+        blocks (list[BlockEvent]): The timing of every block method that ran.
+    """
+
+    run_id: str
+    submitted_at: typing.Optional[float] = None
+    graph_build: typing.Optional[GraphBuildEvent] = None
+    blocks: list[BlockEvent] = []
+
+    def slowest(self, count: int = 10) -> list[BlockEvent]:
+        """
+        Returns the longest block methods.
+
+        Parameters:
+            count (int): The number of events to return.
+
+        Returns:
+            list[BlockEvent]: The events, longest first.
+        """
+        return sorted(self.blocks, key=lambda event: event.duration, reverse=True)[:count]
+
+    def write(self, path: typing.Union[str, Path]) -> None:
+        """
+        Export the report as JSON.
+
+        Parameters:
+            path (typing.Union[str, Path]): The file to write.
+        """
+        Path(path).write_text(self.model_dump_json(indent=2))
+
+
+class WorkflowInstrumentation:
+    """
+    Collects the timing events of a workflow run and forwards them to hooks.
+
+    With the local schedulers, events are emitted from the thread running the block. On a `distributed` cluster,
+    workers publish them on the `BLOCK_EVENTS_TOPIC` topic: the instrumentation must be attached to the client
+    (`submit_workflow` does it for the default client).
+
+    Args:
+        run_id (typing.Optional[str]): The id of the run (default to a random uuid).
+        hooks (typing.Iterable[WorkflowHook]): Functions called with every event.
+
+    """
+
+    def __init__(self, run_id: typing.Optional[str] = None, hooks: typing.Iterable[WorkflowHook] = ()):
+        self.run_id = run_id or str(uuid4())
+        self.hooks = list(hooks)
+        self.submitted_at: typing.Optional[float] = None
+        self.graph_build: typing.Optional[GraphBuildEvent] = None
+        self.block_events: list[BlockEvent] = []
+        self.expected_block_events = 0
+        self._lock = threading.Lock()
+        self._clients: list[Client] = []
+
+    def add_hook(self, hook: WorkflowHook) -> None:
+        """Call `hook` with every future event."""
+        self.hooks.append(hook)
+
+    def emit(self, event: WorkflowEvent) -> None:
+        """
+        Record an event and forward it to the hooks.
+
+        Parameters:
+            event (WorkflowEvent): The event.
+        """
+        if isinstance(event, BlockEvent):
+            if event.run_id != self.run_id:
+                return
+            if event.queue_time is None and self.submitted_at is not None:
+                event.queue_time = max(event.started_at - self.submitted_at, 0.0)
+            with self._lock:
+                self.block_events.append(event)
+        else:
+            self.graph_build = event
+        for hook in self.hooks:
+            hook(event)
+
+    def mark_submitted(self) -> None:
+        """
+        Record the submission time of the graph, used to compute the queue time of the blocks.
+        """
+        self.submitted_at = time.time()
+
+    def instrument(self, method: typing.Callable[..., typing.Any], block_id: str, method_id: str) -> "InstrumentedCall":
+        """
+        Wrap the method of a block so that it emits a `BlockEvent` each time it runs.
+
+        Parameters:
+            method (typing.Callable[..., typing.Any]): The method of the block.
+            block_id (str): The id of the block.
+            method_id (str): The method id of the block.
+
+        Returns:
+            InstrumentedCall: The wrapped method.
+        """
+        self.expected_block_events += 1
+        return InstrumentedCall(self, method, block_id, method_id)
+
+    def attach(self, client: Client) -> None:
+        """
+        Receive the events published by the workers of a `distributed` cluster. The instrumentations of concurrent
+        runs can be attached to the same client, each one receiving the events of its run.
+
+        Parameters:
+            client (Client): The client the workflow is computed with.
+        """
+        if client not in self._clients:
+            WorkerEventRouter.add(client, self)
+            self._clients.append(client)
+
+    def detach(self) -> None:
+        """
+        Stop receiving the events of the `distributed` clusters.
+        """
+        for client in self._clients:
+            WorkerEventRouter.remove(client, self)
+        self._clients = []
+
+    def wait(self, timeout: float = 5.0) -> bool:
+        """
+        Wait for the events published by the workers of a `distributed` cluster to be received.
+
+        Parameters:
+            timeout (float): The maximum time to wait, in seconds.
+
+        Returns:
+            bool: True if all the expected block events were received.
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.block_events) < self.expected_block_events:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def report(self) -> RunReport:
+        """
+        Returns all the events received so far.
+
+        Returns:
+            RunReport: The report of the run.
+        """
+        with self._lock:
+            blocks = list(self.block_events)
+        return RunReport(
+            run_id=self.run_id, submitted_at=self.submitted_at, graph_build=self.graph_build, blocks=blocks
+        )
+
+
+class WorkerEventRouter:
+    """
+    Forwards the events published on the `BLOCK_EVENTS_TOPIC` topic of a client to the instrumentations of their run.
+
+    A client keeps a single handler per topic: the topic is subscribed to when the first instrumentation is attached
+    to the client, and unsubscribed from when the last one is detached.
+    """
+
+    _lock: typing.ClassVar[threading.Lock] = threading.Lock()
+    # The attached instrumentations of every client, indexed by id of client then by run id
+    _routes: typing.ClassVar[dict[int, dict[str, list[WorkflowInstrumentation]]]] = {}
+
+    @classmethod
+    def add(cls, client: Client, instrumentation: WorkflowInstrumentation) -> None:
+        """
+        Forward the events of the run of an instrumentation to it.
+
+        Parameters:
+            client (Client): The client the run is computed with.
+            instrumentation (WorkflowInstrumentation): The instrumentation of the run.
+        """
+        with cls._lock:
+            routes = cls._routes.get(id(client))
+            if routes is None:
+                routes = cls._routes[id(client)] = {}
+                client.subscribe_topic(BLOCK_EVENTS_TOPIC, functools.partial(cls._route, routes))
+            routes.setdefault(instrumentation.run_id, []).append(instrumentation)
+
+    @classmethod
+    def remove(cls, client: Client, instrumentation: WorkflowInstrumentation) -> None:
+        """
+        Stop forwarding events to an instrumentation.
+
+        Parameters:
+            client (Client): The client the instrumentation was added to.
+            instrumentation (WorkflowInstrumentation): The instrumentation.
+        """
+        with cls._lock:
+            routes = cls._routes.get(id(client))
+            if routes is None:
+                return
+            instrumentations = routes.get(instrumentation.run_id, [])
+            if instrumentation in instrumentations:
+                instrumentations.remove(instrumentation)
+            if not instrumentations:
+                routes.pop(instrumentation.run_id, None)
+            if not routes:
+                del cls._routes[id(client)]
+                client.unsubscribe_topic(BLOCK_EVENTS_TOPIC)
+
+    @classmethod
+    def _route(cls, routes: dict[str, list[WorkflowInstrumentation]], event: tuple[float, AnyDict]) -> None:
+        _, message = event
+        with cls._lock:
+            instrumentations = list(routes.get(message.get("run_id", ""), ()))
+        if not instrumentations:
+            return
+        message = {key: value for key, value in message.items() if key in BlockEvent.model_fields}
+        for instrumentation in instrumentations:
+            instrumentation.emit(BlockEvent.model_validate(message))
+
+
+class InstrumentedCall:
+    """
+    Picklable callable timing the method of a block.
+
+    The instrumentation itself is not pickled: a copy running on a Dask worker publishes its events on the
+    `BLOCK_EVENTS_TOPIC` topic instead.
+    """
+
+    def __init__(
+        self,
+        instrumentation: WorkflowInstrumentation,
+        method: typing.Callable[..., typing.Any],
+        block_id: str,
+        method_id: str,
+    ):
+        self.instrumentation: typing.Optional[WorkflowInstrumentation] = instrumentation
+        self.run_id = instrumentation.run_id
+        self.method = method
+        self.block_id = block_id
+        self.method_id = method_id
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        started_at = time.time()
+        start = time.perf_counter()
+        error: typing.Optional[str] = None
+        result: typing.Any = None
+        try:
+            result = self.method(*args, **kwargs)
+        except Exception as exception:
+            error = repr(exception)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self._publish(started_at, duration, result, error)
+        return result
+
+    def _publish(self, started_at: float, duration: float, result: typing.Any, error: typing.Optional[str]) -> None:
+        try:
+            worker: typing.Any = get_worker()
+        except ValueError:
+            worker = None
+        event = BlockEvent(
+            run_id=self.run_id,
+            block_id=self.block_id,
+            method_id=self.method_id,
+            started_at=started_at,
+            ended_at=started_at + duration,
+            duration=duration,
+            result_size=sizeof(result) if error is None else None,
+            worker=worker.address if worker is not None else threading.current_thread().name,
+            error=error,
+        )
+        if worker is not None:
+            worker.log_event(BLOCK_EVENTS_TOPIC, event.model_dump(mode="json"))
+        elif self.instrumentation is not None:
+            self.instrumentation.emit(event)
+
+    def __getstate__(self) -> AnyDict:
+        state = self.__dict__.copy()
+        state["instrumentation"] = None
+        return state
+
+    def __setstate__(self, state: AnyDict) -> None:
+        self.__dict__.update(state)
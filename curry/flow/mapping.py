@@ -0,0 +1,140 @@
+import math
+import operator
+import typing
+
+from curry.block import BlockMapping
+from curry.flow.tasks import GraphTask, TaskRef
+from curry.methods import MethodManager
+from curry.utils.typing import AnyCallable, AnyDict
+
+# Registered methods are called with keyword arguments
+MethodCallable = typing.Callable[..., typing.Any]
+
+
+def split_into_chunks(items: typing.Iterable[typing.Any], *, chunk_size: int) -> list[list[typing.Any]]:
+    """
+    Split elements into chunks of `chunk_size` elements (the last chunk may be smaller).
+
+    Args:
+        items (typing.Iterable[typing.Any]): The elements.
+        chunk_size (int): The number of elements per chunk.
+
+    Returns:
+        list[list[typing.Any]]: The chunks.
+    """
+    items = list(items)
+    return [items[start : start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def split_into_partitions(items: typing.Iterable[typing.Any], partitions: int) -> list[list[typing.Any]]:
+    """
+    Split elements into exactly `partitions` chunks of similar sizes (some chunks may be empty).
+
+    Args:
+        items (typing.Iterable[typing.Any]): The elements.
+        partitions (int): The number of chunks.
+
+    Returns:
+        list[list[typing.Any]]: The chunks.
+    """
+    items = list(items)
+    chunk_size = max(math.ceil(len(items) / partitions), 1)
+    return [items[index * chunk_size : (index + 1) * chunk_size] for index in range(partitions)]
+
+
+def map_chunk(
+    method: MethodCallable,
+    input_name: str,
+    chunk: list[typing.Any],
+    parameters: typing.Optional[AnyDict] = None,
+    reduce: typing.Optional[AnyCallable] = None,
+) -> list[typing.Any]:
+    """
+    Apply a method to each element of a chunk, then reduce the results of the chunk if a reduce method is given.
+
+    The other parameters of the method are given as one dict, so that their names cannot clash with the arguments
+    of `map_chunk`.
+    """
+    parameters = parameters or {}
+    results = [method(**{input_name: item}, **parameters) for item in chunk]
+    if reduce is not None:
+        return [reduce(results)] if results else []
+    return results
+
+
+def combine_chunks(*chunks: list[typing.Any], reduce: typing.Optional[AnyCallable] = None) -> typing.Any:
+    """Concatenate the results of all the chunks, then reduce them if a reduce method is given."""
+    results = [result for chunk in chunks for result in chunk]
+    return reduce(results) if reduce is not None else results
+
+
+class ReduceMethod:
+    """Picklable callable passing a list of results to the first parameter of a registered reduce method."""
+
+    def __init__(self, method_id: str):
+        method_info = MethodManager.get_method_info(method_id)
+        self.method: MethodCallable = method_info.get_callable()
+        self.input_name = next(iter(method_info.signature.parameters))
+
+    def __call__(self, results: list[typing.Any]) -> typing.Any:
+        return self.method(**{self.input_name: results})
+
+
+def build_mapped_tasks(
+    mapping: BlockMapping,
+    method: MethodCallable,
+    parameters: AnyDict,
+    task_name: str,
+    combine: MethodCallable = combine_chunks,
+    wrap_chunk: typing.Optional[typing.Callable[[MethodCallable], MethodCallable]] = None,
+) -> tuple[str, list[GraphTask]]:
+    """
+    Create the Dask tasks of a mapped block: one task per chunk of the iterated input, and one combining them.
+
+    Args:
+        mapping (BlockMapping): The mapping of the block.
+        method (MethodCallable): The method applied to each element.
+        parameters (AnyDict): The parameters of the block, connections included as references to their task.
+        task_name (str): The key of the combining task, and the prefix of the keys of the other tasks.
+        combine (MethodCallable): The function combining the chunk results, e.g. wrapped to store the final result.
+        wrap_chunk (typing.Optional[typing.Callable[[MethodCallable], MethodCallable]]): Wraps the function of each
+            chunk task, e.g. to time it.
+
+    Returns:
+        tuple[str, list[GraphTask]]: The key of the task returning the list of results (or the reduced result), and all
+            the tasks of the block.
+    """
+    parameters = dict(parameters)
+    iterated = parameters.pop(mapping.input_name)
+    reduce = ReduceMethod(mapping.reduce_method_id) if mapping.reduce_method_id is not None else None
+
+    tasks: list[GraphTask] = []
+    chunks: typing.Sequence[typing.Any]
+    if isinstance(iterated, TaskRef):
+        # The size of the input is only known at runtime, split it in a fixed number of partitions
+        split_key = f"{task_name}-split"
+        tasks.append(GraphTask(split_key, split_into_partitions, iterated, mapping.partitions))
+        for index in range(mapping.partitions):
+            tasks.append(GraphTask(f"{split_key}-{index}", operator.getitem, TaskRef(split_key), index))
+        chunks = [TaskRef(f"{split_key}-{index}") for index in range(mapping.partitions)]
+    elif mapping.chunk_size is not None:
+        chunks = split_into_chunks(iterated, chunk_size=mapping.chunk_size)
+    else:
+        chunks = split_into_partitions(iterated, mapping.partitions)
+
+    chunk_parameters: typing.Any = parameters
+    if any(isinstance(value, TaskRef) for value in parameters.values()):
+        # The results of the connections are gathered in the dict of parameters by a task of their own
+        parameters_key = f"{task_name}-parameters"
+        tasks.append(GraphTask(parameters_key, dict, **parameters))
+        chunk_parameters = TaskRef(parameters_key)
+
+    chunk_keys = []
+    for index, chunk in enumerate(chunks):
+        chunk_key = f"{task_name}-chunk-{index}"
+        # Each chunk task is wrapped on its own, e.g. so that every chunk is expected to emit its timing event
+        chunk_function = wrap_chunk(map_chunk) if wrap_chunk is not None else map_chunk
+        tasks.append(GraphTask(chunk_key, chunk_function, method, mapping.input_name, chunk, chunk_parameters, reduce))
+        chunk_keys.append(chunk_key)
+    tasks.append(GraphTask(task_name, combine, *(TaskRef(key) for key in chunk_keys), reduce=reduce))
+    return task_name, tasks
@@ -1,6 +1,8 @@
+import time
 from typing import Optional
 from uuid import UUID
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel  # type: ignore [partially]
 
 
@@ -8,3 +10,54 @@ class Flow(SQLModel, table=True):
     id: UUID = Field(primary_key=True)
     name: Optional[str] = Field(description="Human readable name for the flow")
     config: str
+    block_count: int = Field(default=0, description="Number of blocks, to list flows without decoding their config")
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time, index=True)
+
+
+class FlowPlan(SQLModel, table=True):
+    """A compiled version of a flow: its topological order and adjacency, to load it without compiling it again."""
+
+    __tablename__ = "flow_plan"
+    __table_args__ = (Index("ix_flow_plan_flow_id_created_at", "flow_id", "created_at"),)
+
+    id: UUID = Field(primary_key=True)
+    flow_id: UUID = Field(foreign_key="flow.id", ondelete="CASCADE")
+    config_hash: str = Field(index=True, description="SHA-256 of the flow config the plan was compiled from")
+    order: str
+    parents: str
+    children: str
+    created_at: float = Field(default_factory=time.time)
+
+
+class FlowRun(SQLModel, table=True):
+    __tablename__ = "flow_run"
+    __table_args__ = (Index("ix_flow_run_flow_id_submitted_at", "flow_id", "submitted_at"),)
+
+    id: str = Field(primary_key=True, description="The run id of the instrumentation")
+    flow_id: UUID = Field(foreign_key="flow.id", ondelete="CASCADE")
+    plan_id: Optional[UUID] = Field(default=None, foreign_key="flow_plan.id", ondelete="SET NULL")
+    status: str = Field(default="pending", index=True)
+    submitted_at: float = Field(default_factory=time.time, index=True)
+    ended_at: Optional[float] = None
+    graph_build_duration: Optional[float] = None
+    block_count: int = 0
+    error: Optional[str] = None
+
+
+class BlockRunEvent(SQLModel, table=True):
+    __tablename__ = "block_run_event"
+    __table_args__ = (Index("ix_block_run_event_run_id_block_id", "run_id", "block_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: str = Field(foreign_key="flow_run.id", ondelete="CASCADE")
+    block_id: str
+    method_id: str = Field(index=True)
+    status: str
+    started_at: float
+    ended_at: float
+    duration: float
+    queue_time: Optional[float] = None
+    result_size: Optional[int] = None
+    worker: str
+    error: Optional[str] = None
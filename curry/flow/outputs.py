@@ -0,0 +1,20 @@
+import typing
+
+# The name connections use by default: the whole result of the upstream block
+DEFAULT_OUTPUT = "output"
+
+
+def select_output(result: typing.Any, output_name: str) -> typing.Any:
+    """
+    Pick a named output in the result of a method: a key of a mapping, or a field of a named tuple (or any object).
+
+    Args:
+        result (typing.Any): The result of the method.
+        output_name (str): The name of the output.
+
+    Returns:
+        typing.Any: The output.
+    """
+    if isinstance(result, typing.Mapping):
+        return result[output_name]
+    return getattr(result, output_name)
@@ -0,0 +1,181 @@
+import asyncio
+import inspect
+import typing
+import weakref
+from uuid import uuid4
+
+from distributed import Client, Future
+
+from curry.block import Block
+from curry.flow.cache import ResultCache
+from curry.flow.compiler import CompiledWorkflow, compile_workflow
+from curry.flow.durations import DurationHistory
+from curry.flow.errors import UnknownBlockError
+from curry.flow.instrumentation import WorkflowInstrumentation
+from curry.flow.workflow import build_workflow_graph, cluster_resources
+from curry.methods import MethodSource
+from curry.utils.typing import AnyDict
+
+
+class WorkflowRun:
+    """
+    Handle on a workflow submitted to a `distributed` cluster.
+
+    The handle is returned as soon as the graph is submitted. It gives access to the future of every block, to
+    their status, and can be awaited to get the results of the targets. Runs are only registered while the handle
+    is referenced: dropping it lets the cluster release the results it holds.
+
+    Args:
+        client (Client): The client the workflow was submitted with.
+        futures (dict[str, Future]): The future of every submitted block, indexed by block id.
+        target_ids (list[str]): The ids of the blocks whose result is returned.
+        run_id (typing.Optional[str]): The id of the run (default to a random uuid).
+
+    """
+
+    _runs: typing.ClassVar["weakref.WeakValueDictionary[str, WorkflowRun]"] = weakref.WeakValueDictionary()
+
+    def __init__(
+        self,
+        client: Client,
+        futures: dict[str, Future],
+        target_ids: list[str],
+        run_id: typing.Optional[str] = None,
+    ):
+        self.run_id = run_id or str(uuid4())
+        self.client = client
+        self.futures = futures
+        self.target_ids = target_ids
+        self._runs[self.run_id] = self
+
+    @classmethod
+    def get(cls, run_id: str) -> typing.Optional["WorkflowRun"]:
+        """Retrieve a run that was not released, nor dropped, yet."""
+        return cls._runs.get(run_id)
+
+    def future(self, block_id: str) -> Future:
+        """
+        Returns the future of a block.
+
+        Parameters:
+            block_id (str): The id of the block.
+
+        Returns:
+            Future: The future of the block.
+
+        Raises:
+            UnknownBlockError: If the block was not submitted with this run.
+        """
+        if block_id not in self.futures:
+            raise UnknownBlockError(block_id)
+        return self.futures[block_id]
+
+    def status(self) -> dict[str, str]:
+        """
+        Returns the status of every submitted block (`pending`, `finished`, `error`, `cancelled` or `lost`).
+
+        Returns:
+            dict[str, str]: The status, indexed by block id.
+        """
+        return {block_id: future.status or "pending" for block_id, future in self.futures.items()}
+
+    def done(self) -> bool:
+        """
+        Whether all the submitted blocks are over, successfully or not.
+
+        Returns:
+            bool: True if no block is pending anymore.
+        """
+        return all(future.done() for future in self.futures.values())
+
+    async def cancel(self) -> None:
+        """
+        Cancel all the blocks of the run that are not over yet.
+        """
+        cancelled = self.client.cancel(list(self.futures.values()))
+        if inspect.isawaitable(cancelled):
+            await cancelled
+
+    async def result(self) -> AnyDict:
+        """
+        Wait for the targets and return their results.
+
+        Returns:
+            AnyDict: The result of every target, indexed by block id.
+        """
+        target_futures = [self.futures[block_id] for block_id in self.target_ids]
+        if self.client.asynchronous:
+            values = await self.client.gather(target_futures)
+        else:
+            # A synchronous client blocks while gathering, keep the event loop free
+            values = await asyncio.to_thread(self.client.gather, target_futures)
+        return dict(zip(self.target_ids, values))
+
+    def release(self) -> None:
+        """
+        Forget the run and let the cluster release the results it holds.
+        """
+        self._runs.pop(self.run_id, None)
+        self.futures = {}
+
+    def __await__(self) -> typing.Generator[typing.Any, None, AnyDict]:
+        return self.result().__await__()
+
+
+async def submit_workflow_async(
+    blocks: typing.Union[list[Block], CompiledWorkflow],
+    client: Client,
+    targets: typing.Optional[typing.Sequence[str]] = None,
+    cache: typing.Optional[ResultCache] = None,
+    track_blocks: bool = True,
+    instrumentation: typing.Optional[WorkflowInstrumentation] = None,
+    durations: typing.Optional[DurationHistory] = None,
+    methods: typing.Optional[MethodSource] = None,
+) -> WorkflowRun:
+    """
+    Submit a workflow to a `distributed` cluster without waiting for its results.
+
+    With an asynchronous client (`Client(..., asynchronous=True)`) nothing blocks the event loop, so many workflows
+    can run at the same time on a shared client, e.g. from the handlers of a web server.
+
+    Args:
+        blocks (typing.Union[list[Block], CompiledWorkflow]): The blocks, in any order, or an already compiled workflow.
+        client (Client): The client used to submit the graph.
+        targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute (default to the sinks).
+        cache (typing.Optional[ResultCache]): The cache of block results.
+        track_blocks (bool): Whether to get a future for every block, and not only for the targets. The results of
+            all the blocks are then held in the cluster memory until the run is released.
+        instrumentation (typing.Optional[WorkflowInstrumentation]): Receives the graph construction timing and the
+            timing of every block, its `run_id` is used as the id of the run.
+        durations (typing.Optional[DurationHistory]): The durations of the methods in previous runs, to start the
+            longest chains of blocks first. Record the durations of the run with
+            `durations.record(instrumentation.report())` once it is done.
+        methods (typing.Optional[MethodSource]): The registry the methods of the blocks are looked up in, e.g. the
+            one of the tenant submitting the workflow (default to the methods in use, see `MethodManager.use`).
+
+    Returns:
+        WorkflowRun: The handle on the submitted workflow.
+    """
+    workflow = blocks if isinstance(blocks, CompiledWorkflow) else compile_workflow(blocks)
+    target_ids = list(workflow.sinks if targets is None else dict.fromkeys(targets))
+
+    # Building the graph of a large workflow takes a while, keep the event loop free
+    task_dict = await asyncio.to_thread(
+        build_workflow_graph,
+        workflow,
+        target_ids,
+        cache=cache,
+        instrumentation=instrumentation,
+        available_resources=cluster_resources(client),
+        durations=durations,
+        keep_intermediates=track_blocks,
+        methods=methods,
+    )
+    submitted_ids = list(task_dict) if track_blocks else target_ids
+    if instrumentation is not None:
+        instrumentation.attach(client)
+        instrumentation.mark_submitted()
+    futures = client.compute([task_dict[block_id] for block_id in submitted_ids])
+
+    run_id = instrumentation.run_id if instrumentation is not None else None
+    return WorkflowRun(client, dict(zip(submitted_ids, futures)), target_ids, run_id=run_id)
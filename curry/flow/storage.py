@@ -0,0 +1,484 @@
+import asyncio
+import hashlib
+import json
+import time
+import typing
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import func, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import defer
+from sqlmodel import Session, SQLModel, col, select
+
+from curry.block import Block, dump_blocks, load_blocks
+from curry.epices.databases.sqlite import DEFAULT_SQLITE_URL, create_sqlite_engine
+from curry.flow.compiler import CompiledWorkflow, compile_workflow
+from curry.flow.instrumentation import BlockEvent, RunReport
+from curry.flow.models import BlockRunEvent, Flow, FlowPlan, FlowRun
+
+
+class FlowNotFoundError(KeyError):
+    """
+    Exception raised when a flow, a plan or a run is not stored.
+
+    Args:
+        kind (str): What was looked for (`flow`, `plan` or `run`).
+        identifier (typing.Union[str, UUID]): Its id.
+
+    """
+
+    def __init__(self, kind: str, identifier: typing.Union[str, UUID]):
+        self.kind = kind
+        self.identifier = identifier
+        self.message = f"No {kind} stored with id '{identifier}'"
+        super().__init__(self.message)
+
+
+class FlowSummary(BaseModel):
+    """
+    A stored flow, without its config.
+
+    Attributes:
+        id (UUID): The id of the flow.
+        name (typing.Optional[str]): The name of the flow.
+        block_count (int): The number of blocks.
+        created_at (float): When the flow was first saved (epoch, in seconds).
+        updated_at (float): When the flow was last saved (epoch, in seconds).
+    """
+
+    id: UUID
+    name: typing.Optional[str] = None
+    block_count: int
+    created_at: float
+    updated_at: float
+
+
+class RunSummary(BaseModel):
+    """
+    A stored run, without its block events.
+
+    Attributes:
+        id (str): The id of the run.
+        flow_id (UUID): The id of the flow.
+        plan_id (typing.Optional[UUID]): The id of the plan the run was computed from.
+        status (str): `pending`, `running`, `finished`, `error` or `cancelled`.
+        submitted_at (float): When the run was submitted (epoch, in seconds).
+        ended_at (typing.Optional[float]): When the run ended (epoch, in seconds).
+        graph_build_duration (typing.Optional[float]): The time spent building the graph, in seconds.
+        block_count (int): The number of block events recorded.
+        error (typing.Optional[str]): The error of the run, if any.
+    """
+
+    id: str
+    flow_id: UUID
+    plan_id: typing.Optional[UUID] = None
+    status: str
+    submitted_at: float
+    ended_at: typing.Optional[float] = None
+    graph_build_duration: typing.Optional[float] = None
+    block_count: int = 0
+    error: typing.Optional[str] = None
+
+
+def _hash_config(config: str) -> str:
+    return hashlib.sha256(config.encode()).hexdigest()
+
+
+class FlowStore:
+    """
+    Persist flows, their compiled plans, their runs and the timing of every block of a run.
+
+    Listing flows and runs only reads indexed summary columns: the block configs are never decoded, and runs are
+    paged by flow id and submission time. Block events are written with one bulk insert per run.
+
+    Args:
+        engine (typing.Optional[Engine]): The database engine (default to a WAL-mode SQLite database, see
+            `create_sqlite_engine`).
+        create_tables (bool): Create the missing tables.
+
+    """
+
+    def __init__(self, engine: typing.Optional[Engine] = None, create_tables: bool = True):
+        self.engine = engine if engine is not None else create_sqlite_engine(DEFAULT_SQLITE_URL)
+        if create_tables:
+            SQLModel.metadata.create_all(
+                self.engine,
+                tables=[typing.cast(typing.Any, model).__table__ for model in (Flow, FlowPlan, FlowRun, BlockRunEvent)],
+            )
+
+    def save_flow(
+        self,
+        blocks: typing.Union[list[Block], CompiledWorkflow],
+        flow_id: typing.Optional[UUID] = None,
+        name: typing.Optional[str] = None,
+    ) -> UUID:
+        """
+        Store the blocks of a flow, replacing the previous version if the flow exists.
+
+        Parameters:
+            blocks (typing.Union[list[Block], CompiledWorkflow]): The blocks, or a compiled workflow.
+            flow_id (typing.Optional[UUID]): The id of the flow (default to a new random id).
+            name (typing.Optional[str]): The name of the flow (default to the stored name).
+
+        Returns:
+            UUID: The id of the flow.
+        """
+        block_list = blocks.ordered_blocks() if isinstance(blocks, CompiledWorkflow) else blocks
+        config = dump_blocks(block_list)
+        flow_id = flow_id or uuid4()
+        with Session(self.engine) as session:
+            flow = session.get(Flow, flow_id)
+            if flow is None:
+                flow = Flow(id=flow_id, name=name, config=config, block_count=len(block_list))
+            else:
+                flow.name = name if name is not None else flow.name
+                flow.config = config
+                flow.block_count = len(block_list)
+                flow.updated_at = time.time()
+            session.add(flow)
+            session.commit()
+        return flow_id
+
+    def load_flow(self, flow_id: UUID) -> list[Block]:
+        """
+        Load the blocks of a flow.
+
+        Parameters:
+            flow_id (UUID): The id of the flow.
+
+        Returns:
+            list[Block]: The blocks.
+
+        Raises:
+            FlowNotFoundError: If the flow is not stored.
+        """
+        with Session(self.engine) as session:
+            config = session.exec(select(Flow.config).where(Flow.id == flow_id)).first()
+        if config is None:
+            raise FlowNotFoundError("flow", flow_id)
+        return load_blocks(config)
+
+    def list_flows(self, limit: int = 100, offset: int = 0) -> list[FlowSummary]:
+        """
+        List the stored flows, most recently updated first, without loading their config.
+
+        Parameters:
+            limit (int): The maximum number of flows returned.
+            offset (int): The number of flows skipped.
+
+        Returns:
+            list[FlowSummary]: The flows.
+        """
+        statement = (
+            select(Flow)
+            .options(defer(typing.cast(typing.Any, Flow.config)))
+            .order_by(col(Flow.updated_at).desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        with Session(self.engine) as session:
+            flows = session.exec(statement).all()
+            return [FlowSummary.model_validate(flow, from_attributes=True) for flow in flows]
+
+    def delete_flow(self, flow_id: UUID) -> None:
+        """
+        Delete a flow, with its plans, runs and block events.
+
+        Parameters:
+            flow_id (UUID): The id of the flow.
+        """
+        with Session(self.engine) as session:
+            flow = session.get(Flow, flow_id)
+            if flow is not None:
+                session.delete(flow)
+                session.commit()
+
+    def save_plan(self, flow_id: UUID, workflow: CompiledWorkflow) -> UUID:
+        """
+        Store the compiled plan of a flow, saving the flow first if its config changed.
+
+        A plan compiled from the same config as an existing plan of the flow is not stored twice.
+
+        Parameters:
+            flow_id (UUID): The id of the flow.
+            workflow (CompiledWorkflow): The compiled workflow.
+
+        Returns:
+            UUID: The id of the plan.
+        """
+        config = dump_blocks(workflow.ordered_blocks())
+        config_hash = _hash_config(config)
+        with Session(self.engine) as session:
+            stored_config = session.exec(select(Flow.config).where(Flow.id == flow_id)).first()
+        if stored_config is None or _hash_config(stored_config) != config_hash:
+            self.save_flow(workflow, flow_id=flow_id)
+
+        with Session(self.engine) as session:
+            plan_id = session.exec(
+                select(FlowPlan.id).where(FlowPlan.flow_id == flow_id, FlowPlan.config_hash == config_hash)
+            ).first()
+            if plan_id is not None:
+                return plan_id
+            plan = FlowPlan(
+                id=uuid4(),
+                flow_id=flow_id,
+                config_hash=config_hash,
+                order=json.dumps(workflow.order),
+                parents=json.dumps(workflow.parents),
+                children=json.dumps(workflow.children),
+            )
+            session.add(plan)
+            session.commit()
+            return plan.id
+
+    def load_plan(self, plan_id: UUID) -> CompiledWorkflow:
+        """
+        Load a compiled plan, without sorting nor validating the connections again.
+
+        If the flow was saved again since, the plan is compiled from the current config instead.
+
+        Parameters:
+            plan_id (UUID): The id of the plan.
+
+        Returns:
+            CompiledWorkflow: The compiled workflow.
+
+        Raises:
+            FlowNotFoundError: If the plan is not stored.
+        """
+        with Session(self.engine) as session:
+            row = session.exec(
+                select(FlowPlan, Flow.config).join(Flow, col(Flow.id) == FlowPlan.flow_id).where(FlowPlan.id == plan_id)
+            ).first()
+        if row is None:
+            raise FlowNotFoundError("plan", plan_id)
+        plan, config = row
+        blocks = load_blocks(config)
+        if _hash_config(config) != plan.config_hash:
+            return compile_workflow(blocks)
+
+        order: list[str] = json.loads(plan.order)
+        parents: dict[str, list[str]] = json.loads(plan.parents)
+        children: dict[str, list[str]] = json.loads(plan.children)
+        return CompiledWorkflow(
+            blocks={block.id: block for block in blocks},
+            order=order,
+            parents=parents,
+            children=children,
+            sources=[block_id for block_id in order if not parents[block_id]],
+            sinks=[block_id for block_id in order if not children[block_id]],
+        )
+
+    def start_run(
+        self,
+        run_id: str,
+        flow_id: UUID,
+        plan_id: typing.Optional[UUID] = None,
+        submitted_at: typing.Optional[float] = None,
+    ) -> None:
+        """
+        Record that a run of a flow was submitted.
+
+        Parameters:
+            run_id (str): The id of the run (e.g. the `run_id` of its `WorkflowInstrumentation`).
+            flow_id (UUID): The id of the flow.
+            plan_id (typing.Optional[UUID]): The id of the plan the run is computed from.
+            submitted_at (typing.Optional[float]): When the run was submitted (default to now).
+        """
+        with Session(self.engine) as session:
+            session.add(
+                FlowRun(
+                    id=run_id,
+                    flow_id=flow_id,
+                    plan_id=plan_id,
+                    status="running",
+                    submitted_at=submitted_at or time.time(),
+                )
+            )
+            session.commit()
+
+    def record_block_events(self, run_id: str, events: typing.Iterable[BlockEvent]) -> int:
+        """
+        Store the timing of blocks of a run, in one bulk insert.
+
+        Parameters:
+            run_id (str): The id of the run.
+            events (typing.Iterable[BlockEvent]): The block events.
+
+        Returns:
+            int: The number of events stored.
+        """
+        rows = [
+            {
+                **event.model_dump(exclude={"kind", "run_id"}),
+                "run_id": run_id,
+                "status": "error" if event.error is not None else "finished",
+            }
+            for event in events
+        ]
+        if not rows:
+            return 0
+        with Session(self.engine) as session:
+            session.execute(insert(BlockRunEvent), rows)
+            session.commit()
+        return len(rows)
+
+    def finish_run(
+        self,
+        run_id: str,
+        status: str = "finished",
+        error: typing.Optional[str] = None,
+        report: typing.Optional[RunReport] = None,
+    ) -> None:
+        """
+        Record the end of a run, and the timing of its blocks if a report is given.
+
+        Parameters:
+            run_id (str): The id of the run.
+            status (str): The final status of the run (`finished`, `error` or `cancelled`).
+            error (typing.Optional[str]): The error of the run, if any.
+            report (typing.Optional[RunReport]): The events of the run.
+
+        Raises:
+            FlowNotFoundError: If the run was not started.
+        """
+        if report is not None:
+            self.record_block_events(run_id, report.blocks)
+        with Session(self.engine) as session:
+            run = session.get(FlowRun, run_id)
+            if run is None:
+                raise FlowNotFoundError("run", run_id)
+            run.status = status
+            run.error = error
+            run.ended_at = time.time()
+            run.block_count = session.exec(
+                select(func.count()).select_from(BlockRunEvent).where(BlockRunEvent.run_id == run_id)
+            ).one()
+            if report is not None and report.graph_build is not None:
+                run.graph_build_duration = report.graph_build.duration
+            session.add(run)
+            session.commit()
+
+    def list_runs(self, flow_id: typing.Optional[UUID] = None, limit: int = 100, offset: int = 0) -> list[RunSummary]:
+        """
+        List the runs, most recent first.
+
+        Parameters:
+            flow_id (typing.Optional[UUID]): Only list the runs of this flow.
+            limit (int): The maximum number of runs returned.
+            offset (int): The number of runs skipped.
+
+        Returns:
+            list[RunSummary]: The runs.
+        """
+        statement = select(FlowRun).order_by(col(FlowRun.submitted_at).desc()).limit(limit).offset(offset)
+        if flow_id is not None:
+            statement = statement.where(FlowRun.flow_id == flow_id)
+        with Session(self.engine) as session:
+            runs = session.exec(statement).all()
+            return [RunSummary.model_validate(run.model_dump()) for run in runs]
+
+    def get_run(self, run_id: str) -> RunSummary:
+        """
+        Returns a run.
+
+        Parameters:
+            run_id (str): The id of the run.
+
+        Returns:
+            RunSummary: The run.
+
+        Raises:
+            FlowNotFoundError: If the run is not stored.
+        """
+        with Session(self.engine) as session:
+            run = session.get(FlowRun, run_id)
+            if run is None:
+                raise FlowNotFoundError("run", run_id)
+            return RunSummary.model_validate(run.model_dump())
+
+    def get_block_events(self, run_id: str) -> list[BlockEvent]:
+        """
+        Returns the timing of the blocks of a run, in start order.
+
+        Parameters:
+            run_id (str): The id of the run.
+
+        Returns:
+            list[BlockEvent]: The block events.
+        """
+        with Session(self.engine) as session:
+            rows = session.exec(
+                select(BlockRunEvent).where(BlockRunEvent.run_id == run_id).order_by(col(BlockRunEvent.started_at))
+            ).all()
+            return [BlockEvent.model_validate(row.model_dump(exclude={"id", "status"})) for row in rows]
+
+
+class AsyncFlowStore:
+    """
+    Asynchronous facade of a `FlowStore`: every call runs in a worker thread, so that the event loop of a server is
+    never blocked by the database.
+
+    Args:
+        store (typing.Optional[FlowStore]): The store (default to a `FlowStore` with the default engine).
+
+    """
+
+    def __init__(self, store: typing.Optional[FlowStore] = None):
+        self.store = store if store is not None else FlowStore()
+
+    async def save_flow(
+        self,
+        blocks: typing.Union[list[Block], CompiledWorkflow],
+        flow_id: typing.Optional[UUID] = None,
+        name: typing.Optional[str] = None,
+    ) -> UUID:
+        return await asyncio.to_thread(self.store.save_flow, blocks, flow_id, name)
+
+    async def load_flow(self, flow_id: UUID) -> list[Block]:
+        return await asyncio.to_thread(self.store.load_flow, flow_id)
+
+    async def list_flows(self, limit: int = 100, offset: int = 0) -> list[FlowSummary]:
+        return await asyncio.to_thread(self.store.list_flows, limit, offset)
+
+    async def delete_flow(self, flow_id: UUID) -> None:
+        await asyncio.to_thread(self.store.delete_flow, flow_id)
+
+    async def save_plan(self, flow_id: UUID, workflow: CompiledWorkflow) -> UUID:
+        return await asyncio.to_thread(self.store.save_plan, flow_id, workflow)
+
+    async def load_plan(self, plan_id: UUID) -> CompiledWorkflow:
+        return await asyncio.to_thread(self.store.load_plan, plan_id)
+
+    async def start_run(
+        self,
+        run_id: str,
+        flow_id: UUID,
+        plan_id: typing.Optional[UUID] = None,
+        submitted_at: typing.Optional[float] = None,
+    ) -> None:
+        await asyncio.to_thread(self.store.start_run, run_id, flow_id, plan_id, submitted_at)
+
+    async def record_block_events(self, run_id: str, events: typing.Iterable[BlockEvent]) -> int:
+        return await asyncio.to_thread(self.store.record_block_events, run_id, list(events))
+
+    async def finish_run(
+        self,
+        run_id: str,
+        status: str = "finished",
+        error: typing.Optional[str] = None,
+        report: typing.Optional[RunReport] = None,
+    ) -> None:
+        await asyncio.to_thread(self.store.finish_run, run_id, status, error, report)
+
+    async def list_runs(
+        self, flow_id: typing.Optional[UUID] = None, limit: int = 100, offset: int = 0
+    ) -> list[RunSummary]:
+        return await asyncio.to_thread(self.store.list_runs, flow_id, limit, offset)
+
+    async def get_run(self, run_id: str) -> RunSummary:
+        return await asyncio.to_thread(self.store.get_run, run_id)
+
+    async def get_block_events(self, run_id: str) -> list[BlockEvent]:
+        return await asyncio.to_thread(self.store.get_block_events, run_id)
@@ -0,0 +1,375 @@
+import asyncio
+import inspect
+import queue
+import threading
+import typing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from curry.flow.compiler import CompiledWorkflow
+from curry.flow.errors import StreamingConnectionError
+from curry.methods import MethodManager
+from curry.utils.typing import AnyDict
+
+DEFAULT_STREAM_QUEUE_SIZE = 8
+
+StageKind = typing.Literal["generator", "async_generator", "coroutine", "function"]
+
+
+class StreamAbortedError(Exception):
+    """
+    Exception raised in a stage iterating over a stream whose producer failed.
+
+    Args:
+        source_block_id (str): The id of the failed producer.
+
+    """
+
+    def __init__(self, source_block_id: str):
+        self.source_block_id = source_block_id
+        self.message = f"The stream of block '{source_block_id}' was interrupted"
+        super().__init__(self.message)
+
+
+class StreamChannel:
+    """
+    Bounded queue of chunks between two stages of a pipeline.
+
+    The producer blocks when the queue is full (backpressure), and stops publishing once the consumer closed the
+    channel (e.g. it stopped iterating early).
+
+    Args:
+        source_block_id (str): The id of the producer.
+        maxsize (int): The maximum number of chunks waiting in the queue.
+
+    """
+
+    _END = object()
+
+    def __init__(self, source_block_id: str, maxsize: int = DEFAULT_STREAM_QUEUE_SIZE):
+        self.source_block_id = source_block_id
+        self.failed = False
+        self._queue: queue.Queue[typing.Any] = queue.Queue(maxsize)
+        self._closed = threading.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def put(self, chunk: typing.Any) -> bool:
+        """Wait for room in the queue and add a chunk. Returns False if the consumer is gone."""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.05)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def finish(self, failed: bool = False) -> None:
+        """Signal the end of the stream to the consumer."""
+        self.failed = failed
+        self.put(self._END)
+
+    def close(self) -> None:
+        """Stop receiving chunks (called by the consumer)."""
+        self._closed.set()
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._END:
+                if self.failed:
+                    raise StreamAbortedError(self.source_block_id)
+                return
+            yield chunk
+
+
+class StreamStage:
+    """
+    One block of a streaming pipeline: its method, its fixed parameters and the streams it consumes.
+
+    Args:
+        block_id (str): The id of the block.
+        method (typing.Callable[..., typing.Any]): The method of the block.
+        kind (StageKind): How the method is run, see `stage_kind`.
+        parameters (AnyDict): The parameters of the block, without its connections.
+        inputs (dict[str, str]): The non-streaming connections, the name of the argument of the pipeline task
+            holding the input value indexed by input name.
+        streams (dict[str, str]): The streaming connections, the id of the producer indexed by input name.
+
+    """
+
+    def __init__(
+        self,
+        block_id: str,
+        method: typing.Callable[..., typing.Any],
+        kind: StageKind,
+        parameters: AnyDict,
+        inputs: dict[str, str],
+        streams: dict[str, str],
+    ):
+        self.block_id = block_id
+        self.method = method
+        self.kind = kind
+        self.parameters = parameters
+        self.inputs = inputs
+        self.streams = streams
+
+
+def stage_kind(method: typing.Callable[..., typing.Any]) -> StageKind:
+    """How a stage runs its method: iterating over what it yields, awaiting it, or calling it."""
+    if inspect.isgeneratorfunction(method):
+        return "generator"
+    if inspect.isasyncgenfunction(method):
+        return "async_generator"
+    if inspect.iscoroutinefunction(method):
+        return "coroutine"
+    return "function"
+
+
+def _publish(chunk: typing.Any, channels: list[StreamChannel], collected: typing.Optional[list[typing.Any]]) -> bool:
+    """Send a chunk to all the consumers. Returns False once nobody needs the next chunks."""
+    if collected is not None:
+        collected.append(chunk)
+    delivered = [channel.put(chunk) for channel in channels]
+    return collected is not None or any(delivered)
+
+
+async def _drain_async_generator(
+    generator: typing.AsyncIterator[typing.Any],
+    channels: list[StreamChannel],
+    collected: typing.Optional[list[typing.Any]],
+) -> None:
+    async for chunk in generator:
+        if not _publish(chunk, channels, collected):
+            break
+
+
+def _run_stage(
+    stage: StreamStage,
+    values: AnyDict,
+    input_channels: dict[str, StreamChannel],
+    output_channels: list[StreamChannel],
+    collect: bool,
+) -> typing.Any:
+    kwargs = {
+        **stage.parameters,
+        **{input_name: values[argument] for input_name, argument in stage.inputs.items()},
+        **{input_name: iter(channel) for input_name, channel in input_channels.items()},
+    }
+    collected: typing.Optional[list[typing.Any]] = [] if collect else None
+    result: typing.Any = None
+    try:
+        if stage.kind == "generator":
+            for chunk in stage.method(**kwargs):
+                if not _publish(chunk, output_channels, collected):
+                    break
+            result = collected
+        elif stage.kind == "async_generator":
+            asyncio.run(_drain_async_generator(stage.method(**kwargs), output_channels, collected))
+            result = collected
+        elif stage.kind == "coroutine":
+            result = asyncio.run(stage.method(**kwargs))
+        else:
+            result = stage.method(**kwargs)
+    except BaseException:
+        for channel in output_channels:
+            channel.finish(failed=True)
+        raise
+    finally:
+        for channel in input_channels.values():
+            channel.close()
+    for channel in output_channels:
+        channel.finish()
+    return result
+
+
+class StreamPipeline:
+    """
+    Picklable callable running blocks linked by streaming connections in one task, each block in its own thread.
+
+    Chunks flow between the blocks through bounded queues: the stages overlap, and the memory used by a stream is
+    bounded by `queue_size` chunks. The task returns the result of every block, indexed by block id: streaming
+    methods only keep the list of their chunks when they are `collected` (targets, or feeding a regular connection),
+    their result is None otherwise.
+
+    A block consuming several streams of the same producer must iterate over them together (e.g. with `zip`):
+    exhausting one stream first would block the producer once the queue of the other one is full.
+
+    Args:
+        stages (list[StreamStage]): The blocks of the pipeline, in topological order.
+        collected (typing.Collection[str]): The ids of the streaming methods whose chunks are returned as a list.
+        queue_size (int): The maximum number of chunks waiting between two stages.
+
+    """
+
+    def __init__(
+        self,
+        stages: list[StreamStage],
+        collected: typing.Collection[str] = (),
+        queue_size: int = DEFAULT_STREAM_QUEUE_SIZE,
+    ):
+        self.stages = stages
+        self.collected = set(collected)
+        self.queue_size = queue_size
+
+    def __call__(self, **values: typing.Any) -> AnyDict:
+        input_channels: dict[str, dict[str, StreamChannel]] = {stage.block_id: {} for stage in self.stages}
+        output_channels: dict[str, list[StreamChannel]] = {stage.block_id: [] for stage in self.stages}
+        for stage in self.stages:
+            for input_name, source_block_id in stage.streams.items():
+                channel = StreamChannel(source_block_id, self.queue_size)
+                input_channels[stage.block_id][input_name] = channel
+                output_channels[source_block_id].append(channel)
+
+        with ThreadPoolExecutor(max_workers=len(self.stages), thread_name_prefix="curry-stream") as executor:
+            futures = {
+                stage.block_id: executor.submit(
+                    _run_stage,
+                    stage,
+                    values,
+                    input_channels[stage.block_id],
+                    output_channels[stage.block_id],
+                    stage.block_id in self.collected,
+                )
+                for stage in self.stages
+            }
+        # Report the error of the first failing stage, not the interruption it caused downstream
+        errors = [error for error in (future.exception() for future in futures.values()) if error is not None]
+        if errors:
+            raise next((error for error in errors if not isinstance(error, StreamAbortedError)), errors[0])
+
+        return {block_id: future.result() for block_id, future in futures.items()}
+
+
+def _is_streaming(workflow: CompiledWorkflow, block_id: str) -> bool:
+    return MethodManager.get_method_info(workflow.blocks[block_id].method_id).streaming
+
+
+def _check_streaming_connection(
+    workflow: CompiledWorkflow, needed: typing.Container[str], block_id: str, source_block_id: str
+) -> None:
+    if source_block_id not in needed or not _is_streaming(workflow, source_block_id):
+        raise StreamingConnectionError(block_id, source_block_id, "the upstream method is not a generator")
+    if workflow.blocks[block_id].mapping is not None:
+        raise StreamingConnectionError(block_id, source_block_id, "mapped blocks cannot consume streams")
+
+
+def _check_regular_connections(workflow: CompiledWorkflow, pipeline: list[str]) -> None:
+    members = set(pipeline)
+    for block_id in pipeline:
+        for connection in workflow.blocks[block_id].connections:
+            if not connection.streaming and connection.source_block_id in members:
+                # The consumer would wait for a result that is only complete once the stream is consumed
+                raise StreamingConnectionError(
+                    block_id, connection.source_block_id, "the blocks are also linked by a regular connection"
+                )
+
+
+def find_stream_pipelines(workflow: CompiledWorkflow, block_ids: typing.Sequence[str]) -> list[list[str]]:
+    """
+    Group the blocks linked by streaming connections, each streaming method being part of a group.
+
+    Parameters:
+        workflow (CompiledWorkflow): The compiled workflow.
+        block_ids (typing.Sequence[str]): The ids of the blocks to compute, in topological order.
+
+    Returns:
+        list[list[str]]: The block ids of each pipeline, in topological order.
+
+    Raises:
+        StreamingConnectionError: If a streaming connection does not come from a streaming method, feeds a mapped
+            block, or if two blocks of a pipeline are also linked by a regular connection.
+    """
+    needed = set(block_ids)
+    group_of: dict[str, list[str]] = {}
+
+    def merge(first: str, second: str) -> None:
+        first_group, second_group = group_of[first], group_of[second]
+        if first_group is not second_group:
+            first_group.extend(second_group)
+            for block_id in second_group:
+                group_of[block_id] = first_group
+
+    for block_id in block_ids:
+        block = workflow.blocks[block_id]
+        for connection in block.connections:
+            if not connection.streaming:
+                continue
+            source_block_id = connection.source_block_id
+            _check_streaming_connection(workflow, needed, block_id, source_block_id)
+            group_of.setdefault(source_block_id, [source_block_id])
+            group_of.setdefault(block_id, [block_id])
+            merge(source_block_id, block_id)
+        if block_id not in group_of and _is_streaming(workflow, block_id):
+            group_of[block_id] = [block_id]
+
+    positions = {block_id: position for position, block_id in enumerate(block_ids)}
+    pipelines = list({id(group): sorted(group, key=positions.__getitem__) for group in group_of.values()}.values())
+    for pipeline in pipelines:
+        _check_regular_connections(workflow, pipeline)
+    return pipelines
+
+
+def schedule_pipelines(
+    workflow: CompiledWorkflow, block_ids: typing.Sequence[str], pipelines: list[list[str]]
+) -> list[typing.Union[str, list[str]]]:
+    """
+    Order the blocks and the pipelines so that every block or pipeline comes after all its inputs.
+
+    Parameters:
+        workflow (CompiledWorkflow): The compiled workflow.
+        block_ids (typing.Sequence[str]): The ids of the blocks to compute, in topological order.
+        pipelines (list[list[str]]): The pipelines, see `find_stream_pipelines`.
+
+    Returns:
+        list[typing.Union[str, list[str]]]: The ids of the blocks outside of the pipelines, and the pipelines.
+
+    Raises:
+        StreamingConnectionError: If a pipeline depends on itself through blocks outside of it.
+    """
+    pipeline_of = {block_id: index for index, pipeline in enumerate(pipelines) for block_id in pipeline}
+    needed = set(block_ids)
+
+    def unit(block_id: str) -> typing.Union[str, int]:
+        return pipeline_of.get(block_id, block_id)
+
+    units = list(dict.fromkeys(unit(block_id) for block_id in block_ids))
+    members: dict[typing.Union[str, int], list[str]] = {}
+    for block_id in block_ids:
+        members.setdefault(unit(block_id), []).append(block_id)
+
+    children: dict[typing.Union[str, int], set[typing.Union[str, int]]] = {current: set() for current in units}
+    in_degrees: dict[typing.Union[str, int], int] = dict.fromkeys(units, 0)
+    for current in units:
+        parents = {
+            unit(parent_id)
+            for block_id in members[current]
+            for parent_id in workflow.parents[block_id]
+            if parent_id in needed
+        } - {current}
+        in_degrees[current] = len(parents)
+        for parent in parents:
+            children[parent].add(current)
+
+    # Kahn's algorithm, stable with regards to the order of the blocks
+    positions = {current: position for position, current in enumerate(units)}
+    ready = deque(current for current in units if in_degrees[current] == 0)
+    scheduled: list[typing.Union[str, int]] = []
+    while ready:
+        current = ready.popleft()
+        scheduled.append(current)
+        for child in sorted(children[current], key=positions.__getitem__):
+            in_degrees[child] -= 1
+            if in_degrees[child] == 0:
+                ready.append(child)
+
+    if len(scheduled) < len(units):
+        done = set(scheduled)
+        blocked = next(current for current in units if current not in done and isinstance(current, int))
+        pipeline = pipelines[typing.cast(int, blocked)]
+        raise StreamingConnectionError(
+            pipeline[-1], pipeline[0], "the pipeline depends on its own results through other blocks"
+        )
+    return [pipelines[current] if isinstance(current, int) else current for current in scheduled]
@@ -0,0 +1,70 @@
+import typing
+
+from dask.core import literal
+from dask.utils import apply
+
+
+class TaskRef:
+    """
+    The result of another task, given as an argument of a `GraphTask`.
+
+    Args:
+        key (str): The key of the task.
+
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"TaskRef({self.key!r})"
+
+
+class GraphTask:
+    """
+    A task of a workflow graph: a function called with positional and keyword arguments, the `TaskRef` among them
+    being replaced by the results of their tasks.
+
+    The task is written in the tuple form of the Dask graph specification (see `to_tuple`), that all the supported
+    Dask versions run.
+
+    Args:
+        key (str): The key of the task.
+        func (typing.Callable[..., typing.Any]): The function.
+        *args (typing.Any): The positional arguments.
+        **kwargs (typing.Any): The keyword arguments.
+
+    """
+
+    __slots__ = ("args", "func", "key", "kwargs")
+
+    def __init__(self, key: str, func: typing.Callable[..., typing.Any], *args: typing.Any, **kwargs: typing.Any):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    @property
+    def dependencies(self) -> set[str]:
+        """The keys of the tasks whose results are arguments of the task."""
+        return {value.key for value in (*self.args, *self.kwargs.values()) if isinstance(value, TaskRef)}
+
+    def to_tuple(self) -> tuple[typing.Any, ...]:
+        """Returns the task in the tuple form of the Dask graph specification."""
+        args = [_argument(value) for value in self.args]
+        if not self.kwargs:
+            return (self.func, *args)
+        kwargs = (dict, [[name, _argument(value)] for name, value in self.kwargs.items()])
+        return (apply, self.func, args, kwargs)
+
+
+def _argument(value: typing.Any) -> typing.Any:
+    """An argument in the tuple form: the key of a referenced task, or a value Dask must not look into."""
+    if isinstance(value, TaskRef):
+        return value.key
+    # Dask reads strings as keys and runs the tuples starting with a callable found in containers, quote them
+    if isinstance(value, (str, tuple, list, dict, set)):
+        return (literal(value),)
+    return value
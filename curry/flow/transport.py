@@ -0,0 +1,213 @@
+import importlib.util
+import logging
+import shutil
+import tempfile
+import typing
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+
+from curry.utils.typing import AnyDict
+
+logger = logging.getLogger("curry.flow.transport")
+
+DEFAULT_SPILL_THRESHOLD = 64 * 1024**2
+
+
+def _has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class SpilledResult(BaseModel):
+    """
+    Reference to a block result written to the spill directory, passed between tasks instead of the result itself.
+
+    Attributes:
+        path (str): The file holding the result.
+        kind (typing.Literal["ndarray", "arrow"]): `ndarray` for a `.npy` file, `arrow` for an Arrow IPC file.
+        nbytes (int): The size of the result, in bytes.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    path: str
+    kind: typing.Literal["ndarray", "arrow"]
+    nbytes: int
+
+
+def _write_ndarray(value: np.ndarray, path: Path) -> None:
+    with path.open("wb") as file:
+        np.save(file, value, allow_pickle=False)
+
+
+def _write_arrow(value: pd.DataFrame, path: Path) -> None:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(value)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def spill(value: typing.Any, directory: Path, threshold: int = DEFAULT_SPILL_THRESHOLD) -> typing.Any:
+    """
+    Write a large array or data frame to a file of `directory`, and return a reference to it.
+
+    Numeric arrays are written as `.npy` files. Data frames are written as Arrow IPC files, which requires `pyarrow`
+    (the `arrow` extra): without it, a warning is logged and the data frame is returned unchanged. Any other value,
+    or any value smaller than `threshold` bytes, is returned unchanged.
+
+    Args:
+        value (typing.Any): The result of a block.
+        directory (Path): The spill directory of the run.
+        threshold (int): The minimum size of the spilled values, in bytes.
+
+    Returns:
+        typing.Any: A `SpilledResult`, or the value itself.
+    """
+    if isinstance(value, np.ndarray) and not value.dtype.hasobject and value.nbytes >= threshold:
+        kind: typing.Literal["ndarray", "arrow"] = "ndarray"
+        nbytes = value.nbytes
+        writer: typing.Callable[[typing.Any, Path], None] = _write_ndarray
+    elif isinstance(value, pd.DataFrame):
+        nbytes = int(value.memory_usage(index=True, deep=False).sum())
+        if nbytes < threshold:
+            return value
+        if not _has_pyarrow():
+            logger.warning(
+                "Cannot spill a data frame of %d bytes without pyarrow, install the `arrow` extra of curry", nbytes
+            )
+            return value
+        kind, writer = "arrow", _write_arrow
+    else:
+        return value
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid4()}.{'npy' if kind == 'ndarray' else 'arrow'}"
+    writer(value, path)
+    logger.debug("Spilled a %s of %d bytes to %s", type(value).__name__, nbytes, path)
+    return SpilledResult(path=str(path), kind=kind, nbytes=nbytes)
+
+
+def load_spilled(value: typing.Any) -> typing.Any:
+    """
+    Open a spilled result as a read-only view on its memory-mapped file (any other value is returned unchanged).
+
+    Arrays are `numpy.memmap`. Data frames are converted from the memory-mapped Arrow table without copying their
+    numeric columns that have no missing values.
+
+    Args:
+        value (typing.Any): A `SpilledResult`, or any value.
+
+    Returns:
+        typing.Any: The result.
+    """
+    if not isinstance(value, SpilledResult):
+        return value
+    if value.kind == "ndarray":
+        return np.load(value.path, mmap_mode="r", allow_pickle=False)
+
+    import pyarrow as pa
+
+    with pa.memory_map(value.path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def materialize(value: typing.Any) -> typing.Any:
+    """
+    Load a spilled result into memory, so that it outlives the spill directory.
+
+    Args:
+        value (typing.Any): A `SpilledResult`, or any value.
+
+    Returns:
+        typing.Any: The result, as an in-memory copy.
+    """
+    if not isinstance(value, SpilledResult):
+        return value
+    loaded = load_spilled(value)
+    return np.array(loaded) if value.kind == "ndarray" else loaded.copy(deep=True)
+
+
+class SpilledCall:
+    """
+    Picklable callable opening the spilled results it gets as arguments, and spilling its own result if large.
+    """
+
+    def __init__(self, method: typing.Callable[..., typing.Any], directory: Path, threshold: int):
+        self.method = method
+        self.directory = directory
+        self.threshold = threshold
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        args = tuple(load_spilled(arg) for arg in args)
+        kwargs = {name: load_spilled(value) for name, value in kwargs.items()}
+        return spill(self.method(*args, **kwargs), self.directory, self.threshold)
+
+
+class SpillTransport:
+    """
+    Pass the large block results through files of a spill directory instead of pickling them between workers.
+
+    A block returning a numeric array or a data frame (with `pyarrow` installed) of at least `threshold` bytes writes
+    it once to the spill directory. Downstream blocks get a read-only, memory-mapped view of the file: results are not
+    copied nor pickled again, whatever the number of consumers. The directory must be reachable at the same path by
+    all the workers (local disk for a `LocalCluster`, shared file system otherwise).
+
+    Each run writes in its own sub-directory, removed by `cleanup` once the results of the targets are materialized.
+
+    Args:
+        directory (typing.Optional[typing.Union[str, Path]]): The spill directory (default to `curry-spill` in the
+            temporary directory).
+        threshold (int): The minimum size of the spilled results, in bytes.
+
+    """
+
+    def __init__(
+        self,
+        directory: typing.Optional[typing.Union[str, Path]] = None,
+        threshold: int = DEFAULT_SPILL_THRESHOLD,
+    ):
+        self.directory = Path(directory) if directory is not None else Path(tempfile.gettempdir()) / "curry-spill"
+        self.threshold = threshold
+
+    def run_directory(self, run_id: str) -> Path:
+        """The directory where the results of a run are spilled."""
+        return self.directory / run_id
+
+    def wrap(self, method: typing.Callable[..., typing.Any], run_id: str) -> SpilledCall:
+        """
+        Wrap the method of a block so that it opens the spilled results it gets and spills its own result.
+
+        Parameters:
+            method (typing.Callable[..., typing.Any]): The method of the block.
+            run_id (str): The id of the run.
+
+        Returns:
+            SpilledCall: The wrapped method.
+        """
+        return SpilledCall(method, self.run_directory(run_id), self.threshold)
+
+    def materialize(self, results: AnyDict) -> AnyDict:
+        """
+        Load the spilled results of the targets into memory.
+
+        Parameters:
+            results (AnyDict): The results of the targets, indexed by block id.
+
+        Returns:
+            AnyDict: The in-memory results.
+        """
+        return {block_id: materialize(value) for block_id, value in results.items()}
+
+    def cleanup(self, run_id: str) -> None:
+        """
+        Remove the files spilled by a run.
+
+        Parameters:
+            run_id (str): The id of the run.
+        """
+        shutil.rmtree(self.run_directory(run_id), ignore_errors=True)
@@ -1,62 +1,875 @@
+import hashlib
+import logging
+import operator
+import time
 import typing
+from uuid import uuid4
 
+import dask
 from dask.delayed import Delayed, delayed
+from dask.highlevelgraph import HighLevelGraph, Layer, MaterializedLayer
+from distributed import Client, default_client
 
-from curry.block import Block
-from curry.methods import MethodManager
+from curry.block import Block, BlockConnection, BlockMapping
+from curry.flow.cache import ResultCache
+from curry.flow.checkpoint import CheckpointStore, RunFailedError
+from curry.flow.compiler import CompiledWorkflow, compile_workflow
+from curry.flow.durations import DurationHistory, critical_path_priorities
+from curry.flow.errors import UnknownOutputError
+from curry.flow.fingerprint import compute_block_keys
+from curry.flow.fusion import DEFAULT_FUSION_THRESHOLD, FusedChain, FusedStep, find_fusable_chains
+from curry.flow.instrumentation import GraphBuildEvent, WorkflowInstrumentation
+from curry.flow.mapping import MethodCallable, build_mapped_tasks, combine_chunks
+from curry.flow.outputs import DEFAULT_OUTPUT, select_output
+from curry.flow.streaming import (
+    DEFAULT_STREAM_QUEUE_SIZE,
+    StreamPipeline,
+    StreamStage,
+    find_stream_pipelines,
+    schedule_pipelines,
+    stage_kind,
+)
+from curry.flow.tasks import GraphTask, TaskRef
+from curry.flow.transport import SpillTransport, load_spilled
+from curry.methods import MethodManager, MethodSource, ResourceHints
 from curry.utils.typing import AnyDict
 
+logger = logging.getLogger("curry.flow.workflow")
+
+
+class PriorityAnnotation:
+    """
+    The priority annotation of a layer of the graph, whose tasks have different priorities.
+
+    Args:
+        priorities (dict[str, float]): The priority of every task of the layer, indexed by key.
+
+    """
+
+    def __init__(self, priorities: dict[str, float]):
+        self.priorities = priorities
+
+    def __call__(self, key: str) -> float:
+        return self.priorities[key]
+
+
+class GraphLayer:
+    """
+    Consecutive tasks of a workflow sharing the same annotations, their priorities excepted.
+
+    Args:
+        name (str): The name of the layer in the high level graph.
+        annotations (AnyDict): The annotations of the tasks, without their priority.
+
+    """
+
+    def __init__(self, name: str, annotations: AnyDict):
+        self.name = name
+        self.annotations = annotations
+        self.tasks: dict[str, typing.Any] = {}
+        self.priorities: dict[str, float] = {}
+        self.dependencies: set[str] = set()
+
+    def to_layer(self) -> MaterializedLayer:
+        """Returns the layer, annotated."""
+        annotations = dict(self.annotations)
+        if any(self.priorities.values()):
+            annotations["priority"] = PriorityAnnotation(self.priorities)
+        return MaterializedLayer(self.tasks, annotations=annotations or None)
+
+
+class WorkflowGraphBuilder:
+    """
+    Turns a compiled workflow into Dask tasks, block by block, upstream blocks first.
+
+    Only the targets and the blocks they depend on get a task. When a cache is given, blocks whose result is cached
+    are loaded from it (their upstream blocks are not computed) and the other blocks store their result in it.
+    Blocks whose result is already known, as a value or as a `distributed` future, can be given in `precomputed`.
+
+    Blocks linked by streaming connections are run together in one task, see `StreamPipeline`. Streaming methods
+    always run again with their consumers: their chunks are neither cached nor reused from `precomputed`.
+
+    The failed calls of the methods registered with a retry policy are retried inside their task (each element of a
+    mapped block being retried on its own), before the result is cached. The blocks of streaming pipelines are not
+    retried: the chunks they already published cannot be taken back.
+
+    Linear chains of lightweight blocks (see `MethodManager.register`), or of blocks expected to last less than
+    `fusion_threshold` according to the duration history, are fused in a single task, see `FusedChain`. The inner
+    blocks of a chain then get no task of their own, unless they are targets or `keep_intermediates` is set.
+
+    With a duration history, the tasks are prioritized by the expected duration of the longest chain of blocks they
+    start, so that the long chains are not delayed by short blocks when the workers are busy.
+
+    The tasks are written in a single materialized graph, shared by the `Delayed` of all the blocks: building it
+    takes linear time, whatever the depth of the workflow. Their keys are derived from the content of the blocks
+    (see `compute_block_key`): blocks computing the same thing, i.e. calling the same deterministic method with the
+    same parameters on the same upstream results, share a single task. The keys of the blocks calling a method that is
+    not deterministic, and of the blocks depending on them, are derived from the run id. When the methods are wrapped
+    by a cache, an instrumentation or a transport, all the keys are derived from it, so that concurrent runs on the
+    same client do not share tasks.
+
+    A connection to a named output of a method (see `MethodManager.register`) depends on a task selecting this output
+    only: the whole result is released as soon as its outputs are selected, and each output once its last consumer is
+    done.
+
+    Args:
+        workflow (CompiledWorkflow): The compiled workflow.
+        targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute (default to the sinks).
+        cache (typing.Optional[ResultCache]): The cache of block results.
+        precomputed (typing.Optional[typing.Mapping[str, typing.Any]]): Known block results, indexed by block id.
+        instrumentation (typing.Optional[WorkflowInstrumentation]): Receives the graph construction timing, and the
+            timing of every block method once computed.
+        transport (typing.Optional[SpillTransport]): Passes the large results through files instead of pickling them.
+        run_id (typing.Optional[str]): The id of the run, naming its spill directory (default to the run id of the
+            instrumentation, or to a random uuid).
+        stream_queue_size (int): The maximum number of chunks waiting between two blocks of a streaming pipeline.
+        available_resources (typing.Optional[typing.Collection[str]]): The resources declared by the workers, only
+            those are requested by the tasks (default to the resources of the workers of the default client).
+        durations (typing.Optional[DurationHistory]): The durations of the methods in previous runs.
+        fuse (bool): Whether to fuse the chains of lightweight blocks.
+        keep_intermediates (bool): Whether the inner blocks of the fused chains keep a task returning their result.
+        fusion_threshold (float): The expected duration under which a block is fused, in seconds.
+        methods (typing.Optional[MethodSource]): The registry the methods of the blocks are looked up in (default to
+            the methods in use, see `MethodManager.use`). The graph is built against a snapshot of it, taken when the
+            builder is created: methods registered meanwhile do not affect it.
+
+    """
+
+    def __init__(
+        self,
+        workflow: CompiledWorkflow,
+        targets: typing.Optional[typing.Sequence[str]] = None,
+        cache: typing.Optional[ResultCache] = None,
+        precomputed: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        instrumentation: typing.Optional[WorkflowInstrumentation] = None,
+        transport: typing.Optional[SpillTransport] = None,
+        run_id: typing.Optional[str] = None,
+        stream_queue_size: int = DEFAULT_STREAM_QUEUE_SIZE,
+        available_resources: typing.Optional[typing.Collection[str]] = None,
+        durations: typing.Optional[DurationHistory] = None,
+        fuse: bool = True,
+        keep_intermediates: bool = False,
+        fusion_threshold: float = DEFAULT_FUSION_THRESHOLD,
+        methods: typing.Optional[MethodSource] = None,
+    ):
+        self.workflow = workflow
+        self.methods = (methods if methods is not None else MethodManager.snapshot()).snapshot()
+        self.target_ids = list(workflow.sinks if targets is None else targets)
+        self.cache = cache
+        self.precomputed = precomputed or {}
+        self.instrumentation = instrumentation
+        self.transport = transport
+        self.run_id = run_id or (instrumentation.run_id if instrumentation is not None else str(uuid4()))
+        self.stream_queue_size = stream_queue_size
+        if available_resources is None:
+            client = _get_default_client()
+            available_resources = cluster_resources(client) if client is not None else set()
+        self.available_resources = available_resources
+        self.durations = durations
+        self.fuse = fuse
+        self.keep_intermediates = keep_intermediates
+        self.fusion_threshold = fusion_threshold
+        self.priorities: dict[str, float] = {}
+        self.block_keys: dict[str, str] = {}
+        self.cached_block_ids: set[str] = set()
+        self.duplicates: dict[str, str] = {}
+        self.fused_chains: list[list[str]] = []
+        self.keys: dict[str, str] = {}
+        self.output_keys: dict[tuple[str, str], str] = {}
+        self.layers: list[GraphLayer] = []
+        self.tasks: dict[str, Delayed] = {}
+        self._key_layers: dict[str, str] = {}
+        self._collections: list[Delayed] = []
+        self._priority: float = 0
+
+    def build(self) -> dict[str, Delayed]:
+        """
+        Create the tasks of the needed blocks.
+
+        Returns:
+            dict[str, Delayed]: The Dask task of every needed block, indexed by block id (the inner blocks of the
+                fused chains excepted, unless `keep_intermediates` is set).
+        """
+        with MethodManager.use(self.methods):
+            return self._build()
+
+    def _build(self) -> dict[str, Delayed]:
+        build_start = time.perf_counter()
+        block_ids = self._needed_block_ids()
+        pipelines = find_stream_pipelines(self.workflow, block_ids)
+        units: list[typing.Union[str, list[str], tuple[str, ...]]] = list(
+            schedule_pipelines(self.workflow, block_ids, pipelines) if pipelines else block_ids
+        )
+        if self.durations is not None:
+            self.priorities = self._critical_path_priorities(block_ids)
+        self.duplicates = self._find_duplicates(units)
+        if self.fuse:
+            units = self._fuse_chains(units, block_ids)
+
+        for unit in units:
+            if isinstance(unit, list):
+                logger.debug("Processing streaming pipeline %s", unit)
+                self._enter(unit)
+                self._pipeline_tasks(unit, needed=block_ids)
+            elif isinstance(unit, tuple):
+                logger.debug("Processing fused chain %s", unit)
+                self._enter(list(unit))
+                self._fused_tasks(list(unit))
+            elif unit in self.duplicates:
+                logger.debug("Block %s computes the same result as block %s", unit, self.duplicates[unit])
+                self.keys[unit] = self.keys[self.duplicates[unit]]
+            else:
+                block = self.workflow.blocks[unit]
+                logger.debug("Processing block %s with method %s", unit, block.method_id)
+                self._enter([unit])
+                self.keys[unit] = self._block_task(block)
+        self.tasks = self._collect_tasks()
+
+        if self.instrumentation is not None:
+            reused_count = sum(
+                1 for block_id in block_ids if block_id in self.precomputed or block_id in self.cached_block_ids
+            )
+            self.instrumentation.emit(
+                GraphBuildEvent(
+                    run_id=self.instrumentation.run_id,
+                    block_count=len(self.workflow),
+                    task_count=len(block_ids) - reused_count,
+                    duration=time.perf_counter() - build_start,
+                )
+            )
+        return self.tasks
+
+    @property
+    def graph_size(self) -> int:
+        """The number of Dask tasks created for the workflow."""
+        return sum(len(layer.tasks) for layer in self.layers)
+
+    def _enter(self, block_ids: list[str]) -> None:
+        """Select the layer of the tasks of the blocks, annotated with the resource hints of their methods."""
+        hints = [
+            MethodManager.get_method_info(self.workflow.blocks[block_id].method_id).resources for block_id in block_ids
+        ]
+        annotations = ResourceHints.combine(hints).to_annotations(self.available_resources)
+        self._priority = annotations.pop("priority", 0)
+        if self.priorities:
+            self._priority += max(self.priorities[block_id] for block_id in block_ids)
+        # A new layer is only started when the annotations change, layers stay in topological order
+        if not self.layers or self.layers[-1].annotations != annotations:
+            self.layers.append(GraphLayer(f"curry-workflow-{uuid4()}", annotations))
+
+    def _add(self, task: GraphTask) -> str:
+        """Add a task to the current layer, and returns its key."""
+        layer = self.layers[-1]
+        key = task.key
+        layer.tasks[key] = task.to_tuple()
+        layer.priorities[key] = self._priority
+        for dependency in task.dependencies:
+            dependency_layer = self._key_layers[dependency]
+            if dependency_layer != layer.name:
+                layer.dependencies.add(dependency_layer)
+        self._key_layers[key] = layer.name
+        return key
+
+    def _collect_tasks(self) -> dict[str, Delayed]:
+        """Assemble the high level graph, and returns the `Delayed` of every block."""
+        layers: dict[str, Layer] = {}
+        dependencies: dict[str, set[str]] = {}
+        for collection in self._collections:
+            collection_graph = typing.cast(HighLevelGraph, collection.__dask_graph__())
+            layers.update(collection_graph.layers)
+            dependencies.update(collection_graph.dependencies)
+        for layer in self.layers:
+            layers[layer.name] = layer.to_layer()
+            dependencies[layer.name] = layer.dependencies
+        graph = HighLevelGraph(layers, dependencies)
+        return {block_id: Delayed(key, graph, layer=self._key_layers[key]) for block_id, key in self.keys.items()}
+
+    def _critical_path_priorities(self, block_ids: list[str]) -> dict[str, float]:
+        """The priorities of the blocks, the known and cached results taking no time."""
+        durations = typing.cast(DurationHistory, self.durations).block_durations(self.workflow, block_ids)
+        for block_id in durations.keys() & {*self.precomputed, *self.cached_block_ids}:
+            if not self._is_streaming(block_id):
+                durations[block_id] = 0.0
+        return critical_path_priorities(self.workflow, durations, block_ids)
+
+    def _find_duplicates(self, units: list[typing.Union[str, list[str], tuple[str, ...]]]) -> dict[str, str]:
+        """The blocks computing the same result as a block scheduled before them, indexed by block id."""
+        first_block_ids: dict[str, str] = {}
+        duplicates: dict[str, str] = {}
+        for unit in units:
+            # The blocks of the streaming pipelines and the precomputed blocks keep their own task
+            if not isinstance(unit, str) or unit in self.precomputed:
+                continue
+            first_block_id = first_block_ids.setdefault(self.block_keys[unit], unit)
+            if first_block_id != unit:
+                duplicates[unit] = first_block_id
+        return duplicates
+
+    def _fuse_chains(
+        self, units: list[typing.Union[str, list[str], tuple[str, ...]]], block_ids: list[str]
+    ) -> list[typing.Union[str, list[str], tuple[str, ...]]]:
+        """Replace the blocks of the fusable chains by the chains, as tuples, at the place of their first block."""
+        pipeline_block_ids = {block_id for unit in units if isinstance(unit, list) for block_id in unit}
+        # Shared results are consumed by the children of all the duplicates, they stay in their own task
+        shared_block_ids = {*self.duplicates, *self.duplicates.values()}
+
+        def fusable(block_id: str) -> bool:
+            block = self.workflow.blocks[block_id]
+            if (
+                block.mapping is not None
+                or block_id in pipeline_block_ids
+                or block_id in shared_block_ids
+                or block_id in self.precomputed
+                or block_id in self.cached_block_ids
+            ):
+                return False
+            method_info = MethodManager.get_method_info(block.method_id)
+            if method_info.lightweight:
+                return True
+            expected = self.durations.expected(method_info) if self.durations is not None else None
+            return expected is not None and expected <= self.fusion_threshold
+
+        def compatible(block_id: str, next_block_id: str) -> bool:
+            next_block = self.workflow.blocks[next_block_id]
+            # A fused block gets the whole result of the previous one
+            if any(self._selected_output(next_block, connection) for connection in next_block.connections):
+                return False
+            return bool(
+                MethodManager.get_method_info(self.workflow.blocks[block_id].method_id).resources
+                == MethodManager.get_method_info(next_block.method_id).resources
+            )
+
+        self.fused_chains = find_fusable_chains(self.workflow, block_ids, fusable, compatible)
+        if not self.fused_chains:
+            return units
+        chains = {chain[0]: tuple(chain) for chain in self.fused_chains}
+        fused_block_ids = {block_id for chain in self.fused_chains for block_id in chain}
+        return [
+            chains[unit] if isinstance(unit, str) and unit in chains else unit
+            for unit in units
+            if not isinstance(unit, str) or unit not in fused_block_ids or unit in chains
+        ]
+
+    def _is_streaming(self, block_id: str) -> bool:
+        return MethodManager.get_method_info(self.workflow.blocks[block_id].method_id).streaming
+
+    def _needed_block_ids(self) -> list[str]:
+        """The targets and their ancestors, stopping at the blocks whose result is known or cached."""
+        precomputed = {block_id for block_id in self.precomputed if not self._is_streaming(block_id)}
+        # The keys of the blocks depend on all their ancestors, even those hidden by precomputed results
+        self.block_keys = compute_block_keys(self.workflow, self.workflow.ancestors(self.target_ids), self.run_id)
+        block_ids = self.workflow.ancestors(self.target_ids, boundaries=precomputed)
+        if self.cache is None:
+            return block_ids
+
+        self.cached_block_ids = {
+            block_id
+            for block_id in block_ids
+            if block_id not in precomputed and self.block_keys[block_id] in self.cache
+        }
+        return self.workflow.ancestors(self.target_ids, boundaries={*precomputed, *self.cached_block_ids})
+
+    def _task_key(self, prefix: str, block_id: str, dependencies: typing.Iterable[str]) -> str:
+        """
+        The key of a task computing a block from its content and the keys of the tasks it depends on: the same
+        computation always gets the same key, and two ways of computing a block (e.g. fused or not) never share one.
+        The keys of the runs wrapping their methods (see `_key_scope`) are also derived from their run id.
+        """
+        payload = "\n".join([self.block_keys[block_id], *dependencies, self._key_scope])
+        return f"{prefix}-{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    @property
+    def _key_scope(self) -> str:
+        """
+        The run id when the methods are wrapped by the cache, the instrumentation or the transport: their tasks have
+        side effects of their own (storing the result, reporting the events, spilling to the run directory), two runs
+        submitted to the same client must not share them.
+        """
+        if self.cache is None and self.instrumentation is None and self.transport is None:
+            return ""
+        return self.run_id
+
+    def _upstream_keys(self, block: Block) -> list[str]:
+        """The keys of the tasks of the blocks connected to a block."""
+        return [self._source_key(block, connection) for connection in block.connections]
+
+    def _selected_output(self, block: Block, connection: BlockConnection) -> typing.Optional[str]:
+        """The named output a connection selects, None for the whole result."""
+        output_name = connection.source_output_name
+        source_method_id = self.workflow.blocks[connection.source_block_id].method_id
+        if output_name in MethodManager.get_method_info(source_method_id).output_names:
+            return output_name
+        if output_name == DEFAULT_OUTPUT or connection.streaming:
+            return None
+        raise UnknownOutputError(block.id, connection.source_block_id, output_name)
+
+    def _source_key(self, block: Block, connection: BlockConnection) -> str:
+        """The key of the task feeding a connection: the upstream block, or the selection of one of its outputs."""
+        key = self.keys[connection.source_block_id]
+        output_name = self._selected_output(block, connection)
+        if output_name is None:
+            return key
+        output_key = self.output_keys.get((key, output_name))
+        if output_key is None:
+            select: MethodCallable = select_output
+            if self.transport is not None:
+                select = self.transport.wrap(select, self.run_id)
+            output_key = self._add(GraphTask(f"{key}-output-{output_name}", select, TaskRef(key), output_name))
+            self.output_keys[key, output_name] = output_key
+        return output_key
+
+    def _block_parameters(self, block: Block) -> AnyDict:
+        """Merge block parameters with the references to the tasks of the block connections."""
+        if not block.connections:
+            return block.parameters
+        return {
+            **block.parameters,
+            **{
+                connection.self_input_name: TaskRef(self._source_key(block, connection))
+                for connection in block.connections
+            },
+        }
+
+    def _block_task(self, block: Block) -> str:
+        if block.id in self.precomputed and not self._is_streaming(block.id):
+            # Wrapped as a single literal so that Dask does not traverse (potentially huge) collections
+            precomputed = typing.cast(
+                Delayed,
+                delayed(self.precomputed[block.id], traverse=False, name=f"precomputed-{block.method_id}-{uuid4()}"),
+            )
+            self._collections.append(precomputed)
+            self._key_layers[precomputed.key] = precomputed.__dask_layers__()[0]
+            return typing.cast(str, precomputed.key)
+
+        if self.cache is not None and block.id in self.cached_block_ids:
+            self.cache.stats.hits += 1
+            block_key = self.block_keys[block.id]
+            return self._add(GraphTask(f"cached-{block.method_id}-{block_key}", self.cache.get, block_key))
+
+        if block.mapping is not None:
+            return self._mapped_task(block)
+        return self._method_task(block)
+
+    def _pipeline_tasks(self, block_ids: list[str], needed: typing.Collection[str]) -> None:
+        members = set(block_ids)
+        needed = set(needed)
+        stages = []
+        values: AnyDict = {}
+        collected = []
+        for block_id in block_ids:
+            block = self.workflow.blocks[block_id]
+            method_info = MethodManager.get_method_info(block.method_id)
+            inputs = {}
+            for connection in block.connections:
+                if not connection.streaming:
+                    argument = inputs[connection.self_input_name] = f"{block_id}/{connection.self_input_name}"
+                    values[argument] = TaskRef(self._source_key(block, connection))
+            stages.append(
+                StreamStage(
+                    block_id,
+                    method_info.get_callable(),
+                    stage_kind(method_info.method),
+                    block.parameters,
+                    inputs,
+                    {
+                        connection.self_input_name: connection.source_block_id
+                        for connection in block.connections
+                        if connection.streaming
+                    },
+                )
+            )
+            # The chunks are only kept when a target or a regular connection needs them all
+            if method_info.streaming and (
+                block_id in self.target_ids
+                or any(child_id in needed and child_id not in members for child_id in self.workflow.children[block_id])
+            ):
+                collected.append(block_id)
+
+        pipeline: MethodCallable = StreamPipeline(stages, collected, self.stream_queue_size)
+        if self.instrumentation is not None:
+            pipeline = self.instrumentation.instrument(pipeline, "+".join(block_ids), "stream")
+        if self.transport is not None:
+            pipeline = self.transport.wrap(pipeline, self.run_id)
+        pipeline_key = self._add(GraphTask(f"stream-{uuid4()}", pipeline, **values))
+
+        for block_id in block_ids:
+            self.keys[block_id] = self._add(
+                GraphTask(
+                    f"{self.workflow.blocks[block_id].method_id}-{uuid4()}",
+                    operator.getitem,
+                    TaskRef(pipeline_key),
+                    block_id,
+                )
+            )
+
+    def _fused_tasks(self, block_ids: list[str]) -> None:
+        steps = []
+        for index, block_id in enumerate(block_ids):
+            block = self.workflow.blocks[block_id]
+            method = self._wrapped_method(block)
+            if index == 0:
+                steps.append(FusedStep(block_id, method, {}, []))
+            else:
+                input_names = [connection.self_input_name for connection in block.connections]
+                steps.append(FusedStep(block_id, method, block.parameters, input_names))
+
+        head, tail = self.workflow.blocks[block_ids[0]], block_ids[-1]
+        exposed = [
+            block_id
+            for block_id in block_ids
+            if block_id == tail or self.keep_intermediates or block_id in self.target_ids
+        ]
+        chain: MethodCallable = FusedChain(steps, exposed if len(exposed) > 1 else None)
+        if self.transport is not None:
+            chain = self.transport.wrap(chain, self.run_id)
+        chain_key = self._add(
+            GraphTask(
+                self._task_key(f"fused-{head.method_id}", tail, [*exposed, *self._upstream_keys(head)]),
+                chain,
+                **self._block_parameters(head),
+            )
+        )
+        if len(exposed) == 1:
+            self.keys[tail] = chain_key
+            return
+        for block_id in exposed:
+            self.keys[block_id] = self._add(
+                GraphTask(
+                    self._task_key(self.workflow.blocks[block_id].method_id, block_id, [chain_key]),
+                    operator.getitem,
+                    TaskRef(chain_key),
+                    block_id,
+                )
+            )
+
+    def _method_callable(self, block: Block) -> MethodCallable:
+        """The method of a block, its failed calls being retried according to its policy."""
+        method_info = MethodManager.get_method_info(block.method_id)
+        method: MethodCallable = method_info.get_callable()
+        if method_info.retry is not None:
+            method = method_info.retry.wrap(method, method_info.name)
+        return method
+
+    def _wrapped_method(self, block: Block) -> MethodCallable:
+        """The method of a block, storing its result in the cache and timed by the instrumentation."""
+        method = self._method_callable(block)
+        if self.cache is not None:
+            self.cache.stats.misses += 1
+            method = self.cache.wrap(method, self.block_keys[block.id])
+        if self.instrumentation is not None:
+            method = self.instrumentation.instrument(method, block.id, block.method_id)
+        return method
+
+    def _method_task(self, block: Block) -> str:
+        # Retrieve the function corresponding to the block type
+        method_info = MethodManager.get_method_info(block.method_id)
+        method = self._wrapped_method(block)
+        if self.transport is not None:
+            method = self.transport.wrap(method, self.run_id)
+        return self._add(
+            GraphTask(
+                self._task_key(method_info.original_name, block.id, self._upstream_keys(block)),
+                method,
+                **self._block_parameters(block),
+            )
+        )
+
+    def _mapped_task(self, block: Block) -> str:
+        method_info = MethodManager.get_method_info(block.method_id)
+        # The result of a mapped block is the one of its combining task
+        combine: MethodCallable = combine_chunks
+        if self.cache is not None:
+            self.cache.stats.misses += 1
+            combine = self.cache.wrap(combine_chunks, self.block_keys[block.id])
+
+        mapping = typing.cast(BlockMapping, block.mapping)
+        task_name = self._task_key(method_info.original_name, block.id, self._upstream_keys(block))
+        parameters = self._block_parameters(block)
+        if self.transport is not None:
+            combine = self.transport.wrap(combine, self.run_id)
+            # The chunks are sliced from the iterated input, open it if it was spilled
+            iterated = parameters.get(mapping.input_name)
+            if isinstance(iterated, TaskRef):
+                load_key = self._add(GraphTask(f"load-spilled-{task_name}", load_spilled, iterated))
+                parameters = {**parameters, mapping.input_name: TaskRef(load_key)}
+
+        wrap_chunk = None
+        if self.instrumentation is not None:
+            instrumentation = self.instrumentation
+
+            def wrap_chunk(chunk_function: MethodCallable) -> MethodCallable:
+                return instrumentation.instrument(chunk_function, block.id, block.method_id)
+
+        combined_key, tasks = build_mapped_tasks(
+            mapping,
+            self._method_callable(block),
+            parameters,
+            task_name,
+            combine,
+            wrap_chunk=wrap_chunk,
+        )
+        for task in tasks:
+            self._add(task)
+        return combined_key
+
+
+def build_workflow_graph(
+    workflow: CompiledWorkflow,
+    targets: typing.Optional[typing.Sequence[str]] = None,
+    cache: typing.Optional[ResultCache] = None,
+    precomputed: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    instrumentation: typing.Optional[WorkflowInstrumentation] = None,
+    transport: typing.Optional[SpillTransport] = None,
+    run_id: typing.Optional[str] = None,
+    available_resources: typing.Optional[typing.Collection[str]] = None,
+    durations: typing.Optional[DurationHistory] = None,
+    fuse: bool = True,
+    keep_intermediates: bool = False,
+    methods: typing.Optional[MethodSource] = None,
+) -> dict[str, Delayed]:
+    """
+    Create the Dask tasks of a compiled workflow, see `WorkflowGraphBuilder`.
+
+    Args:
+        workflow (CompiledWorkflow): The compiled workflow.
+        targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute (default to the sinks).
+        cache (typing.Optional[ResultCache]): The cache of block results.
+        precomputed (typing.Optional[typing.Mapping[str, typing.Any]]): Known block results, indexed by block id.
+        instrumentation (typing.Optional[WorkflowInstrumentation]): Receives the graph construction timing, and the
+            timing of every block method once computed.
+        transport (typing.Optional[SpillTransport]): Passes the large results through files instead of pickling them.
+        run_id (typing.Optional[str]): The id of the run, naming its spill directory.
+        available_resources (typing.Optional[typing.Collection[str]]): The resources declared by the workers (default
+            to the resources of the workers of the default client).
+        durations (typing.Optional[DurationHistory]): The durations of the methods in previous runs, to prioritize
+            the longest chains of blocks and fuse the short ones.
+        fuse (bool): Whether to fuse the chains of lightweight blocks in single tasks.
+        keep_intermediates (bool): Whether the inner blocks of the fused chains keep a task returning their result.
+        methods (typing.Optional[MethodSource]): The registry the methods of the blocks are looked up in.
+
+    Returns:
+        dict[str, Delayed]: The Dask task of every needed block, indexed by block id.
+    """
+    return WorkflowGraphBuilder(
+        workflow,
+        targets,
+        cache=cache,
+        precomputed=precomputed,
+        instrumentation=instrumentation,
+        transport=transport,
+        run_id=run_id,
+        available_resources=available_resources,
+        durations=durations,
+        fuse=fuse,
+        keep_intermediates=keep_intermediates,
+        methods=methods,
+    ).build()
+
+
+def cluster_resources(client: Client) -> set[str]:
+    """
+    Returns the names of the resources declared by the workers of a cluster.
+
+    Args:
+        client (Client): A client of the cluster.
+
+    Returns:
+        set[str]: The resource names.
+    """
+    workers = client.scheduler_info(n_workers=-1).get("workers", {})
+    return {name for worker in workers.values() for name in worker.get("resources", {})}
+
+
+def _get_default_client() -> typing.Optional[Client]:
+    """Returns the `distributed` client `dask.compute` uses, if any."""
+    try:
+        return typing.cast(Client, default_client())
+    except ValueError:
+        return None
+
+
+def _compute_targets(
+    target_ids: list[str],
+    target_tasks: list[Delayed],
+    run_id: str,
+    transport: typing.Optional[SpillTransport],
+    checkpoints: typing.Optional[CheckpointStore],
+) -> AnyDict:
+    """Compute the targets of a run, recording its end in the checkpoint store if any."""
+    try:
+        results = dict(zip(target_ids, dask.compute(*target_tasks)))
+        if transport is not None:
+            results = transport.materialize(results)
+    except Exception as error:
+        if checkpoints is None:
+            raise
+        checkpoints.finish(run_id, error)
+        raise RunFailedError(run_id, error) from error
+    finally:
+        if transport is not None:
+            transport.cleanup(run_id)
+    if checkpoints is not None:
+        checkpoints.finish(run_id)
+    return results
+
+
+def _compute_instrumented_targets(
+    target_ids: list[str],
+    target_tasks: list[Delayed],
+    run_id: str,
+    transport: typing.Optional[SpillTransport],
+    checkpoints: typing.Optional[CheckpointStore],
+    instrumentation: WorkflowInstrumentation,
+) -> AnyDict:
+    """Compute the targets of a run, receiving the block events of the `distributed` cluster while it runs."""
+    client = _get_default_client()
+    try:
+        if client is not None:
+            instrumentation.attach(client)
+        instrumentation.mark_submitted()
+        results = _compute_targets(target_ids, target_tasks, run_id, transport, checkpoints)
+        if client is not None:
+            instrumentation.wait()
+    finally:
+        # Failed runs stop receiving the events of the cluster too
+        instrumentation.detach()
+    return results
+
 
 # Function to create a Dask workflow based on the blocks
 def submit_workflow(
-    blocks: list[Block],
+    blocks: typing.Union[list[Block], CompiledWorkflow],
     execute: bool = True,
     render: bool = False,
     render_format: typing.Optional[str] = "png",
     render_filename: typing.Optional[str] = None,
+    targets: typing.Optional[typing.Sequence[str]] = None,
+    cache: typing.Optional[ResultCache] = None,
+    instrumentation: typing.Optional[WorkflowInstrumentation] = None,
+    transport: typing.Optional[SpillTransport] = None,
+    durations: typing.Optional[DurationHistory] = None,
+    fuse: bool = True,
+    checkpoints: typing.Optional[CheckpointStore] = None,
+    run_id: typing.Optional[str] = None,
+    methods: typing.Optional[MethodSource] = None,
 ) -> AnyDict:
-    task_dict: dict[str, Delayed] = {}
+    """
+    Build the Dask graph of a workflow and compute it.
 
-    # Iterate through the blocks of the workflow
-    for block in blocks:
-        block_id = block.id
-        block_method_id = block.method_id or "no_method"
+    Args:
+        blocks (typing.Union[list[Block], CompiledWorkflow]): The blocks, in any order, or an already compiled workflow.
+        execute (bool): Whether to compute the graph.
+        render (bool): Whether to render the graph with graphviz.
+        render_format (typing.Optional[str]): The format of the rendered graph.
+        render_filename (typing.Optional[str]): The file the graph is rendered to.
+        targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute, only the blocks they depend
+            on are part of the graph (default to all the sinks of the workflow).
+        cache (typing.Optional[ResultCache]): The cache of block results, only the blocks whose method, parameters or
+            upstream blocks changed since they were cached are computed.
+        instrumentation (typing.Optional[WorkflowInstrumentation]): Receives the graph construction timing and the
+            timing of every block, see `WorkflowInstrumentation.report`.
+        transport (typing.Optional[SpillTransport]): Passes the large array and data frame results through
+            memory-mapped files instead of pickling them. The files are removed once the results are returned.
+        durations (typing.Optional[DurationHistory]): The durations of the methods in previous runs: the longest
+            chains of blocks start first, and the durations of this run are recorded (and saved, if the history has
+            a file).
+        fuse (bool): Whether to run the chains of lightweight blocks (or of blocks known to be short) as single
+            tasks, saving a round trip to the scheduler per block.
+        checkpoints (typing.Optional[CheckpointStore]): Keeps the workflow and the result of every finished block, so
+            that the run can be resumed with `resume_workflow` if it fails. The blocks already checkpointed by a
+            previous submission of the same run are not computed again.
+        run_id (typing.Optional[str]): The id of the run (default to the run id of the instrumentation, or to a
+            random uuid).
+        methods (typing.Optional[MethodSource]): The registry the methods of the blocks are looked up in, e.g. the
+            one of a tenant (default to the methods in use, see `MethodManager.use`). The run uses a snapshot of it:
+            methods registered meanwhile, from other threads, do not affect it.
 
-        print("\t- Processing block", block_id, "with method", block_method_id)
+    Returns:
+        AnyDict: `results` holds the result of every target indexed by block id, `result` the result of the last
+            target, `render_result` the output of the rendering and `run_id` the id of the run.
 
-        # Retrieve the function corresponding to the block type
-        block_method_info = MethodManager.get_method_info(block_method_id)
-        block_method = block_method_info.method
-
-        # Merge block parameters with block connections
-        block_parameters = {}
-        if len(block.connections) > 0 or len(block.parameters) > 0:
-            block_parameters: AnyDict = {
-                **block.parameters,
-                **{
-                    connection.self_input_name: task_dict[connection.source_block_id]
-                    for connection in block.connections
-                },
-            }
-            print("Block parameters for block", block_id, ":", block_parameters)
-
-        # Create the Dask task for the block
-        task_dict[block_id] = delayed(block_method)(**block_parameters)
-
-    # Retrieve the final block
-    final_task: Delayed = task_dict[list(task_dict.keys())[-1]]
-
-    # Execute the Dask workflow
-    result: typing.Optional[typing.Any] = None  # type: ignore  # noqa: PGH003
+    Raises:
+        RunFailedError: If a block of a checkpointed run fails, the original error being its cause.
+    """
+    # Blocks can be given in any order, a compiled workflow can be reused to skip the compilation
+    workflow = blocks if isinstance(blocks, CompiledWorkflow) else compile_workflow(blocks)
+    target_ids = list(workflow.sinks if targets is None else dict.fromkeys(targets))
+
+    if durations is not None and instrumentation is None:
+        # The durations are measured by the instrumentation
+        instrumentation = WorkflowInstrumentation()
+    run_id = run_id or (instrumentation.run_id if instrumentation is not None else str(uuid4()))
+    if checkpoints is not None:
+        # The finished blocks are stored in the run checkpoint, and in the shared cache if any
+        cache = checkpoints.results(run_id, shared=cache)
+        if execute:
+            checkpoints.start(workflow, target_ids, run_id)
+    task_dict = build_workflow_graph(
+        workflow,
+        target_ids,
+        cache=cache,
+        instrumentation=instrumentation,
+        transport=transport,
+        run_id=run_id,
+        durations=durations,
+        fuse=fuse,
+        methods=methods,
+    )
+    target_tasks = [task_dict[block_id] for block_id in target_ids]
+
+    # Execute the Dask workflow, all the targets at once so that shared upstream blocks only run once
+    results: AnyDict = {}
     if execute:
-        # result = final_task.compute()
-        result = final_task.compute()  # type: ignore  # noqa: PGH003
+        if instrumentation is None:
+            results = _compute_targets(target_ids, target_tasks, run_id, transport, checkpoints)
+        else:
+            results = _compute_instrumented_targets(
+                target_ids, target_tasks, run_id, transport, checkpoints, instrumentation
+            )
+        if durations is not None and instrumentation is not None:
+            # The methods of the events are looked up in the registry the graph was built from
+            with MethodManager.use(methods if methods is not None else MethodManager.snapshot()):
+                durations.record(instrumentation.report())
+            durations.save()
 
     render_result: typing.Any = None
     if render:
-        render_result = final_task.visualize(format=render_format, filename=render_filename)  # type: ignore  # noqa: PGH003
+        render_result = dask.visualize(*target_tasks, format=render_format, filename=render_filename)
 
     return {
-        "result": result,
+        "result": results.get(target_ids[-1]) if target_ids else None,
+        "results": results,
         "render_result": render_result,
+        "run_id": run_id,
     }
+
+
+def resume_workflow(
+    run_id: str,
+    checkpoints: CheckpointStore,
+    targets: typing.Optional[typing.Sequence[str]] = None,
+    **kwargs: typing.Any,
+) -> AnyDict:
+    """
+    Submit a checkpointed run again, typically after it failed: the workflow is rebuilt from its checkpoint and only
+    the blocks without a stored result (the failed ones and the blocks depending on them) are computed.
+
+    Args:
+        run_id (str): The id of the run.
+        checkpoints (CheckpointStore): The store the run was checkpointed in.
+        targets (typing.Optional[typing.Sequence[str]]): The ids of the blocks to compute (default to the targets of
+            the run).
+        **kwargs (typing.Any): The other arguments of `submit_workflow` (`cache`, `instrumentation`...).
+
+    Returns:
+        AnyDict: The results of the run, see `submit_workflow`.
+
+    Raises:
+        CheckpointNotFoundError: If the run is not stored.
+        RunFailedError: If a block fails again.
+    """
+    workflow, run_targets = checkpoints.load(run_id)
+    logger.info("Resuming run %s", run_id)
+    return submit_workflow(
+        workflow, targets=run_targets if targets is None else targets, checkpoints=checkpoints, run_id=run_id, **kwargs
+    )
@@ -1,3 +1,31 @@
-from .manager import MethodManager, NotRegisteredError
+from .manager import MethodInfo, MethodManager, MethodSource, NotRegisteredError
+from .registry import (
+    ENTRY_POINT_GROUP,
+    MethodConflictError,
+    MethodLoadError,
+    MethodRegistry,
+    MethodSpec,
+    RegistrySnapshot,
+)
+from .resources import ResourceHints, WorkloadKind, worker_resources
+from .retry import RetryPolicy
+from .validation import ValidatedMethod, ValidationMode
 
-__all__ = ["MethodManager", "NotRegisteredError"]
+__all__ = [
+    "ENTRY_POINT_GROUP",
+    "MethodConflictError",
+    "MethodInfo",
+    "MethodLoadError",
+    "MethodManager",
+    "MethodRegistry",
+    "MethodSource",
+    "MethodSpec",
+    "NotRegisteredError",
+    "RegistrySnapshot",
+    "ResourceHints",
+    "RetryPolicy",
+    "ValidatedMethod",
+    "ValidationMode",
+    "WorkloadKind",
+    "worker_resources",
+]
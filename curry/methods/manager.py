@@ -1,21 +1,51 @@
+import functools
+import hashlib
 import inspect
+import types
 import typing
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
 from inspect import Signature
+from pathlib import Path
 from uuid import uuid4
 
-from pydantic import BaseModel, ConfigDict, Field, validate_call
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from pydantic.types import UUID4
 
 from curry.block import Block
-from curry.utils.string.uuid import deterministic_uuid_v4
+from curry.methods.registry import (
+    DEFAULT_VERSION,
+    ENTRY_POINT_GROUP,
+    MethodRegistry,
+    NotRegisteredError,
+    RegistrySnapshot,
+    compute_method_id,
+)
+from curry.methods.resources import ResourceHints
+from curry.methods.retry import RetryPolicy
+from curry.methods.validation import ValidatedMethod, ValidationMode
 from curry.utils.typing import AnyCallable
 from curry.utils.typing.typing import AnyDict
 
+__all__ = ["MethodInfo", "MethodManager", "MethodSource", "NotRegisteredError"]
 
-class NotRegisteredError(Exception):
-    def __init__(self, method_name: str):
-        super().__init__(f"Method '{method_name}' is not registered.")
+# Where methods are looked up: a registry (its latest methods) or a snapshot of one
+MethodSource = typing.Union[MethodRegistry, RegistrySnapshot]
+
+
+def _code_parts(code: types.CodeType) -> typing.Iterator[str]:
+    """What a code object computes: its bytecode, the names it uses and its constants, nested functions included."""
+    yield code.co_code.hex()
+    yield repr(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            yield from _code_parts(constant)
+        elif isinstance(constant, frozenset):
+            # The iteration order of a set of strings changes from a process to another
+            yield repr(sorted(map(repr, constant)))
+        else:
+            yield repr(constant)
 
 
 class MethodInfo(BaseModel):
@@ -30,15 +60,130 @@ class MethodInfo(BaseModel):
     original_name: str = Field(description="The true python name of thefunction (should not be set manually)")
     description: typing.Optional[str] = Field(description="A description of the method")
     method: AnyCallable
-    method_code: str = ""
     # inputs: dict[str, Parameter] = Field({}, description="List of the input parameters of the method")
     # output: Parameter = Field(description="Output parameter of the method")
-    signature: Signature = Field(description="Function signature")
+    validation: typing.Optional[ValidationMode] = Field(
+        None, description="How the calls are validated (default to `MethodManager.default_validation`)"
+    )
+    streaming: bool = Field(False, description="The method is a generator (or an async generator) yielding chunks")
+    resources: ResourceHints = Field(
+        default=ResourceHints(), description="What the method needs to run (threads, memory, priority...)"
+    )
+    lightweight: bool = Field(
+        False, description="The method is cheap enough to be fused with its neighbours in a single task"
+    )
+    deterministic: bool = Field(
+        True, description="The method always returns the same result for the same inputs (no randomness, no clock)"
+    )
+    seed_parameter: typing.Optional[str] = Field(
+        None,
+        description="The parameter seeding the random draws of a method that is not deterministic: the calls giving "
+        "it a value are deterministic",
+    )
+    outputs: typing.Optional[list[str]] = Field(
+        None,
+        description="The names of the outputs of the method (default to the fields of its NamedTuple or TypedDict "
+        "return annotation)",
+    )
+    retry: typing.Optional[RetryPolicy] = Field(
+        None, description="How the failed calls of the method are retried when it runs in a workflow"
+    )
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    _validated_methods: dict[ValidationMode, ValidatedMethod] = PrivateAttr(default_factory=dict)
+
+    # The signature and the source code are only read when needed: reading the source is slow
+    @functools.cached_property
+    def signature(self) -> Signature:
+        """Function signature"""
+        return inspect.signature(self.method)
+
+    @functools.cached_property
+    def output_names(self) -> frozenset[str]:
+        """The named outputs blocks can be connected to, each one being a key or a field of the result"""
+        if self.outputs is not None:
+            return frozenset(self.outputs)
+        try:
+            annotation = typing.get_type_hints(self.method).get("return")
+        except (NameError, TypeError):
+            annotation = self.signature.return_annotation
+        if isinstance(annotation, type) and issubclass(annotation, tuple) and hasattr(annotation, "_fields"):
+            return frozenset(annotation._fields)
+        if isinstance(annotation, type) and issubclass(annotation, dict) and hasattr(annotation, "__required_keys__"):
+            return frozenset(typing.get_type_hints(annotation))
+        return frozenset()
+
+    @functools.cached_property
+    def code_hash(self) -> str:
+        """
+        A SHA-256 hex digest of what the function computes, changing when its code changes.
+
+        It is computed from the bytecode of the function, without reading its source: functions whose source cannot
+        be read (defined in a REPL, loaded from a zip...) are supported. The source is only read for the callables
+        without bytecode, and their qualified name is used when it is not available either.
+        """
+        qualname = f"{getattr(self.method, '__module__', '')}:{getattr(self.method, '__qualname__', repr(self.method))}"
+        code = getattr(self.method, "__code__", None)
+        if isinstance(code, types.CodeType):
+            parts = [qualname, *_code_parts(code)]
+        else:
+            try:
+                parts = [qualname, inspect.getsource(self.method)]
+            except (OSError, TypeError):
+                parts = [qualname]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def is_deterministic(
+        self, parameters: typing.Mapping[str, typing.Any], connected_inputs: typing.Collection[str] = ()
+    ) -> bool:
+        """
+        Whether a call of the method always returns the same result, i.e. the method is deterministic or the call
+        gives its `seed_parameter` a value.
+
+        Parameters:
+            parameters (typing.Mapping[str, typing.Any]): The parameters of the call.
+            connected_inputs (typing.Collection[str]): The inputs given by upstream blocks.
+
+        Returns:
+            bool: True if the result of the call can be shared and cached.
+        """
+        if self.deterministic:
+            return True
+        if self.seed_parameter is None:
+            return False
+        return parameters.get(self.seed_parameter) is not None or self.seed_parameter in connected_inputs
+
+    @functools.cached_property
+    def method_code(self) -> str:
+        """The source code of the function, without the registration decorator"""
+        code = inspect.getsource(self.method)
+        return "\n".join([line for line in code.splitlines() if not line.startswith("@MethodManager")])
+
+    def get_callable(self, validation: typing.Optional[ValidationMode] = None) -> AnyCallable:
+        """
+        Returns the method wrapped with its validation, the validator being built only once.
+
+        Parameters:
+            validation (typing.Optional[ValidationMode]): Overrides the validation mode of the method.
+
+        Returns:
+            AnyCallable: The callable to use to run the method, directly or through Dask.
+        """
+        mode = validation or self.validation or MethodManager.default_validation
+        if mode is ValidationMode.OFF:
+            return self.method
+        validated_method = self._validated_methods.get(mode)
+        if validated_method is None:
+            validated_method = self._validated_methods[mode] = ValidatedMethod(self.method, mode)
+            validated_method.build()
+        return validated_method
+
 
 class MethodManager:
-    _registry: typing.ClassVar[dict[str, MethodInfo]] = {}
+    _registry: typing.ClassVar[MethodRegistry] = MethodRegistry()
+    # The methods in use in the current context (e.g. while the graph of a workflow is built), see `use`
+    _active: typing.ClassVar[ContextVar[typing.Optional[MethodSource]]] = ContextVar("curry_methods", default=None)
+    default_validation: typing.ClassVar[ValidationMode] = ValidationMode.BOUNDARY
 
     @classmethod
     def register(
@@ -48,34 +193,81 @@ class MethodManager:
         name: typing.Optional[str] = None,
         description: typing.Optional[str] = None,
         version: typing.Optional[str] = None,
+        tags: typing.Optional[list[str]] = None,
+        validation: typing.Optional[ValidationMode] = None,
+        resources: typing.Optional[ResourceHints] = None,
+        lightweight: bool = False,
+        deterministic: bool = True,
+        seed_parameter: typing.Optional[str] = None,
+        outputs: typing.Optional[list[str]] = None,
+        retry: typing.Optional[RetryPolicy] = None,
+        registry: typing.Optional[MethodRegistry] = None,
+        replace: bool = False,
     ) -> AnyCallable:
-        """Decorator to register methods as block templates."""
+        """
+        Decorator to register methods as block templates.
+
+        Each `version` of a method is kept: blocks use the latest one, unless their `method_id` is
+        `"name@version"`. Registering the same version again replaces it.
+
+        The returned function validates its calls like the blocks of a workflow do, according to `validation`
+        (default to `MethodManager.default_validation`).
+
+        Generator and async generator methods are streaming methods: downstream blocks can consume the chunks they
+        yield as they are produced, through streaming connections.
+
+        `resources` tells the cluster what the method needs (threads, memory, CPU or IO bound, priority, retries,
+        workers), so that its tasks are placed on workers able to run them.
+
+        `lightweight` methods (constants, small reshapes...) are fused with the lightweight blocks they feed or are fed
+        by, so that a chain of them runs as a single task.
+
+        Blocks calling a `deterministic` method with the same parameters and the same upstream blocks run only once
+        per workflow. Methods returning a different result at each call (random draws, current time, external state)
+        must be registered with `deterministic=False`. Random methods taking a seed may name it `seed_parameter`: the
+        blocks giving it a value are deterministic again.
+
+        Methods returning a mapping or a named tuple may declare their `outputs` (default to the fields of their
+        NamedTuple or TypedDict return annotation): a connection whose `source_output_name` is one of them only gets
+        this part of the result.
+
+        Methods prone to transient failures (network, busy services) may declare a `retry` policy: in a workflow,
+        their failed calls are retried before the failure reaches the scheduler.
+
+        The method is added to `registry` (default to the registry of the process). Registering a method under the
+        name and version of a method defined by another function raises a `MethodConflictError`, unless `replace` is
+        set. Registering the same function again (e.g. when its module is reloaded) replaces it.
+        """
 
         def wrapper(func: AnyCallable) -> AnyCallable:
             method_name = name or func.__name__
-            method_version = version or "0.1.0"
-            sig = inspect.signature(func)
-            code = inspect.getsource(func)
-            code = "\n".join([line for line in code.splitlines() if not line.startswith('@MethodManager')])
-
+            method_version = version or DEFAULT_VERSION
 
             # Register method with automatic input/output discovery
-            cls._registry[method_name] = MethodInfo(
-                id=deterministic_uuid_v4(method_name + method_version),
+            method_info = MethodInfo(
+                id=compute_method_id(method_name, method_version),
                 version=method_version,
+                tags=tags or [],
                 name=method_name,
                 original_name=func.__name__,
                 description=description or func.__doc__ or "",
                 method=func,
-                method_code=code,
-                signature=sig,
+                validation=validation,
+                streaming=inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func),
+                resources=resources or ResourceHints(),
+                lightweight=lightweight,
+                deterministic=deterministic,
+                seed_parameter=seed_parameter,
+                outputs=outputs,
+                retry=retry,
                 # inputs={k: v.annotation for k, v in sig.parameters.items()},
                 # output=sig.return_annotation,
             )
+            (registry if registry is not None else cls._registry).add(method_info, replace=replace)
 
             @wraps(func)
             def inner(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-                return validate_call(func)(*args, **kwargs)
+                return method_info.get_callable()(*args, **kwargs)
 
             return inner
 
@@ -84,9 +276,7 @@ class MethodManager:
     @classmethod
     def get_block_template(cls, *, method_name: str, block_modifications: typing.Optional[AnyDict] = None) -> Block:
         """Generate a block instance for a registered method."""
-        method_info = cls._registry.get(method_name)
-        if not method_info:
-            raise NotRegisteredError(method_name)
+        cls.get_method_info(method_name)
 
         # Automatically set up the block
         block_modifications = block_modifications or {}
@@ -101,12 +291,65 @@ class MethodManager:
 
     @classmethod
     def get_method_info(cls, method_name: str) -> MethodInfo:
-        """Retrieve method information."""
-        method_info = cls._registry.get(method_name)
-        if not method_info:
-            raise NotRegisteredError(method_name)
-        return method_info
+        """
+        Retrieve method information, by name (latest version), `"name@version"` or id, from the methods in use (see
+        `use`) or the registry of the process.
+        """
+        methods = cls._active.get()
+        return (methods if methods is not None else cls._registry).get(method_name)
+
+    @classmethod
+    @contextmanager
+    def use(cls, methods: MethodSource) -> typing.Iterator[MethodSource]:
+        """
+        Look the methods up in a registry or a snapshot (e.g. the one of a tenant) instead of the registry of the
+        process, in the current thread or task only.
+
+        Parameters:
+            methods (MethodSource): The methods.
+
+        Yields:
+            MethodSource: The methods.
+        """
+        token = cls._active.set(methods)
+        try:
+            yield methods
+        finally:
+            cls._active.reset(token)
 
     @classmethod
-    def get_registry(cls):
+    def discover(cls, group: str = ENTRY_POINT_GROUP) -> int:
+        """Declare the methods published by the installed packages, see `MethodRegistry.discover`."""
+        return cls._registry.discover(group)
+
+    @classmethod
+    def load_manifest(cls, path: typing.Union[str, Path]) -> int:
+        """Declare the methods listed in a JSON manifest, see `MethodRegistry.load_manifest`."""
+        return cls._registry.load_manifest(path)
+
+    @classmethod
+    def preload(cls, method_names: typing.Optional[typing.Iterable[str]] = None) -> None:
+        """
+        Import the methods and build their validators ahead of their first call (e.g. when a worker starts).
+
+        Parameters:
+            method_names (typing.Optional[typing.Iterable[str]]): The methods (default to all the versions of all the
+                methods).
+        """
+        for method_name in method_names if method_names is not None else cls._registry.find():
+            cls.get_method_info(method_name).get_callable()
+
+    @classmethod
+    def set_default_validation(cls, validation: ValidationMode) -> None:
+        """Set the validation mode of the methods registered without an explicit one."""
+        cls.default_validation = validation
+
+    @classmethod
+    def get_registry(cls) -> MethodRegistry:
         return cls._registry
+
+    @classmethod
+    def snapshot(cls) -> RegistrySnapshot:
+        """Returns an immutable view of the methods in use, see `MethodRegistry.snapshot`."""
+        methods = cls._active.get()
+        return (methods if methods is not None else cls._registry).snapshot()
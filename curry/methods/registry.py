@@ -0,0 +1,464 @@
+import importlib
+import importlib.metadata
+import inspect
+import logging
+import threading
+import typing
+from pathlib import Path
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic.types import UUID4
+
+from curry.utils.string.uuid import deterministic_uuid_v4
+from curry.utils.typing import AnyDict
+
+if typing.TYPE_CHECKING:
+    from curry.methods.manager import MethodInfo
+
+logger = logging.getLogger("curry.methods.registry")
+
+# The entry point group packages declare their methods in, see `MethodRegistry.discover`
+ENTRY_POINT_GROUP = "curry.methods"
+
+DEFAULT_VERSION = "0.1.0"
+
+
+class NotRegisteredError(Exception):
+    def __init__(self, method_name: str):
+        super().__init__(f"Method '{method_name}' is not registered.")
+
+
+class MethodLoadError(Exception):
+    """
+    Exception raised when a method declared by an entry point or a manifest cannot be imported.
+
+    Args:
+        method_name (str): The name of the method.
+        target (str): The object the method was declared with.
+        reason (str): Why it could not be imported.
+
+    """
+
+    def __init__(self, method_name: str, target: str, reason: str):
+        self.method_name = method_name
+        self.target = target
+        self.message = f"Method '{method_name}' cannot be loaded from '{target}': {reason}"
+        super().__init__(self.message)
+
+
+class MethodConflictError(Exception):
+    """
+    Exception raised when a method is registered under the name and version of another method.
+
+    Args:
+        method_name (str): The name of the method.
+        version (str): The version of the method.
+        registered (str): The origin of the registered method, as `"module:function"`.
+        conflicting (str): The origin of the rejected method.
+
+    """
+
+    def __init__(self, method_name: str, version: str, registered: str, conflicting: str):
+        self.method_name = method_name
+        self.version = version
+        self.registered = registered
+        self.conflicting = conflicting
+        self.message = (
+            f"Method '{method_name}@{version}' is already registered from '{registered}', cannot register "
+            f"'{conflicting}' (pass `replace=True` to override it)"
+        )
+        super().__init__(self.message)
+
+
+def compute_method_id(name: str, version: str) -> UUID4:
+    """The id of a method: the same name and version always get the same id."""
+    return deterministic_uuid_v4(name + version)
+
+
+def version_key(version: str) -> tuple[tuple[int, typing.Union[int, str]], ...]:
+    """Sort key of semver-like versions: numeric parts are compared as numbers (`0.10.0` > `0.9.0`)."""
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in version.replace("-", ".").split("."))
+
+
+class MethodSpec(BaseModel):
+    """
+    A method known by its metadata only, imported the first time it is used.
+
+    Attributes:
+        name (str): The name blocks use to refer to the method.
+        target (str): The function, as `"package.module:function"`.
+        version (str): The version of the method.
+        tags (list[str]): Tags to search the method by.
+        description (typing.Optional[str]): A description of the method (default to the docstring of the function).
+        options (AnyDict): The other arguments of `MethodManager.register` (`lightweight`, `resources`...), used when
+            the function is not registered by its own module.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    target: str
+    version: str = DEFAULT_VERSION
+    tags: list[str] = []
+    description: typing.Optional[str] = None
+    options: AnyDict = Field(default_factory=dict)
+
+    @property
+    def id(self) -> UUID4:
+        return compute_method_id(self.name, self.version)
+
+
+RegistryEntry = typing.Union["MethodInfo", MethodSpec]
+
+_MANIFEST_ADAPTER = TypeAdapter(list[MethodSpec])
+
+
+def entry_origin(entry: RegistryEntry) -> str:
+    """Where a method comes from, as `"module:function"`: re-registering the same origin is not a conflict."""
+    if isinstance(entry, MethodSpec):
+        return entry.target
+    function = inspect.unwrap(entry.method)
+    return f"{getattr(function, '__module__', '')}:{getattr(function, '__qualname__', repr(function))}"
+
+
+class _RegistryState:
+    """The indexes of a registry. A published state is never mutated: writers copy it first."""
+
+    def __init__(self) -> None:
+        self.methods: dict[str, dict[str, RegistryEntry]] = {}
+        self.latest: dict[str, RegistryEntry] = {}
+        self.ids: dict[str, tuple[str, str]] = {}
+        self.tags: dict[str, set[tuple[str, str]]] = {}
+
+    def copy(self) -> "_RegistryState":
+        state = _RegistryState()
+        state.methods = {name: dict(versions) for name, versions in self.methods.items()}
+        state.latest = dict(self.latest)
+        state.ids = dict(self.ids)
+        state.tags = {tag: set(methods) for tag, methods in self.tags.items()}
+        return state
+
+    def find(self, method_id: str) -> typing.Optional[RegistryEntry]:
+        if method_id in self.latest:
+            return self.latest[method_id]
+        name, separator, version = method_id.rpartition("@")
+        if separator:
+            return self.methods.get(name, {}).get(version)
+        key = self.ids.get(method_id)
+        return self.methods[key[0]][key[1]] if key is not None else None
+
+    def add(self, entry: RegistryEntry) -> None:
+        versions = self.methods.setdefault(entry.name, {})
+        previous = versions.get(entry.version)
+        if previous is not None:
+            for tag in previous.tags:
+                self.tags[tag].discard((entry.name, entry.version))
+        versions[entry.version] = entry
+        self.latest[entry.name] = versions[max(versions, key=version_key)]
+        self.ids[str(entry.id)] = (entry.name, entry.version)
+        for tag in entry.tags:
+            self.tags.setdefault(tag, set()).add((entry.name, entry.version))
+
+    def remove(self, entry: RegistryEntry) -> None:
+        versions = self.methods[entry.name]
+        del versions[entry.version]
+        del self.ids[str(entry.id)]
+        for tag in entry.tags:
+            self.tags[tag].discard((entry.name, entry.version))
+        if versions:
+            self.latest[entry.name] = versions[max(versions, key=version_key)]
+        else:
+            del self.methods[entry.name], self.latest[entry.name]
+
+
+class RegistrySnapshot:
+    """
+    An immutable view of a `MethodRegistry`: the methods registered after the snapshot was taken are not visible.
+
+    Workflows are built against a snapshot, so that concurrent registrations cannot change the methods of a run while
+    its graph is built. Declared methods are still imported by the registry the first time they are retrieved.
+
+    Args:
+        registry (MethodRegistry): The registry the snapshot was taken from.
+        state (_RegistryState): Its indexes at the time, never mutated.
+
+    """
+
+    def __init__(self, registry: "MethodRegistry", state: _RegistryState):
+        self.registry = registry
+        self._state = state
+        self._loaded: dict[tuple[str, str], MethodInfo] = {}
+
+    def __len__(self) -> int:
+        return sum(len(versions) for versions in self._state.methods.values())
+
+    def __contains__(self, method_id: object) -> bool:
+        return isinstance(method_id, str) and self._state.find(method_id) is not None
+
+    def snapshot(self) -> "RegistrySnapshot":
+        """Returns the snapshot itself, see `MethodRegistry.snapshot`."""
+        return self
+
+    def get(self, method_id: str) -> "MethodInfo":
+        """
+        Retrieve a method, importing it if needed.
+
+        Parameters:
+            method_id (str): The name of the method (its latest version), `"name@version"` or the id of the method.
+
+        Returns:
+            MethodInfo: The method.
+
+        Raises:
+            NotRegisteredError: If no method matches.
+            MethodLoadError: If the method cannot be imported.
+        """
+        entry = self._state.latest.get(method_id) or self._state.find(method_id)
+        if entry is None:
+            raise NotRegisteredError(method_id)
+        if isinstance(entry, MethodSpec):
+            key = (entry.name, entry.version)
+            loaded = self._loaded.get(key)
+            if loaded is None:
+                loaded = self._loaded[key] = self.registry._load(entry)
+            return loaded
+        return entry
+
+    def versions(self, name: str) -> list[str]:
+        """The registered versions of a method, from the oldest to the latest."""
+        return sorted(self._state.methods.get(name, {}), key=version_key)
+
+    def find(self, *tags: str, name: typing.Optional[str] = None) -> list[str]:
+        """
+        Search the methods without importing them.
+
+        Parameters:
+            *tags (str): The tags the methods must all have.
+            name (typing.Optional[str]): The name of the methods.
+
+        Returns:
+            list[str]: The matching methods, as `"name@version"` ids usable by blocks.
+        """
+        if tags:
+            matches = set.intersection(*(self._state.tags.get(tag, set()) for tag in tags))
+        else:
+            matches = {
+                (method_name, version) for method_name, versions in self._state.methods.items() for version in versions
+            }
+        return [
+            f"{method_name}@{version}"
+            for method_name, version in sorted(matches, key=lambda match: (match[0], version_key(match[1])))
+            if name is None or method_name == name
+        ]
+
+
+class MethodRegistry:
+    """
+    The registered methods, indexed by name, version, id and tags.
+
+    A method may be registered in several versions: blocks refer to it by name (the latest version), by
+    `"name@version"` or by id. Methods discovered through entry points or listed in a manifest are only imported the
+    first time they are retrieved, so that the registry of a server exposing many methods is built without importing
+    them.
+
+    `MethodManager` holds the registry of the process. A server running the workflows of several tenants can give
+    each of them its own registry (e.g. a `fork` of the process one), register their methods with `register` and
+    submit their workflows with `methods=`.
+
+    The registry is safe to use from several threads. Lookups read an immutable snapshot of the indexes without
+    locking. Registrations are serialized and copy the indexes when a snapshot of them has been handed out, so that
+    consecutive registrations (e.g. at import time) only copy them once. Registering a method under the name and
+    version of a method coming from another function raises a `MethodConflictError`, unless `replace` is set.
+    """
+
+    def __init__(self) -> None:
+        self._working = _RegistryState()
+        # The snapshot readers use, `None` when the working state was modified since it was published
+        self._published: typing.Optional[RegistrySnapshot] = None
+        # Whether the working state is referenced by a published snapshot, and must be copied before being modified
+        self._shared = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def __contains__(self, method_id: object) -> bool:
+        return method_id in self.snapshot()
+
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        Returns an immutable view of the registered methods, see `RegistrySnapshot`.
+
+        Returns:
+            RegistrySnapshot: The methods registered so far.
+        """
+        snapshot = self._published
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._published
+                if snapshot is None:
+                    snapshot = self._published = RegistrySnapshot(self, self._working)
+                    self._shared = True
+        return snapshot
+
+    def fork(self) -> "MethodRegistry":
+        """
+        Create a registry starting with the methods of this one, the methods registered afterwards in either of them
+        being invisible to the other.
+
+        Returns:
+            MethodRegistry: The new registry.
+        """
+        registry = MethodRegistry()
+        registry._working = self.snapshot()._state
+        registry._shared = True
+        return registry
+
+    def register(self, **options: typing.Any) -> typing.Callable[..., typing.Any]:
+        """
+        Decorator registering a method in this registry, see `MethodManager.register` for the options.
+        """
+        from curry.methods.manager import MethodManager
+
+        return typing.cast(typing.Callable[..., typing.Any], MethodManager.register(registry=self, **options))
+
+    def add(self, entry: RegistryEntry, replace: bool = False) -> None:
+        """
+        Add a method, or the metadata of a method to import later.
+
+        Parameters:
+            entry (RegistryEntry): The method.
+            replace (bool): Whether to replace the same version of the method when it comes from another function.
+
+        Raises:
+            MethodConflictError: If the same version of the method is already registered from another function.
+        """
+        with self._lock:
+            previous = self._working.find(f"{entry.name}@{entry.version}")
+            if previous is not None:
+                if isinstance(previous, MethodSpec) and not isinstance(entry, MethodSpec):
+                    # A method imported after being declared keeps the tags it was declared with
+                    entry.tags = [*entry.tags, *(tag for tag in previous.tags if tag not in entry.tags)]
+                elif not replace and entry_origin(previous) != entry_origin(entry):
+                    raise MethodConflictError(entry.name, entry.version, entry_origin(previous), entry_origin(entry))
+                elif isinstance(entry, MethodSpec):
+                    # Declaring a method already imported from the same function keeps it imported
+                    return
+            self._writable().add(entry)
+
+    def get(self, method_id: str) -> "MethodInfo":
+        """
+        Retrieve a method from the latest snapshot, importing it if needed, see `RegistrySnapshot.get`.
+        """
+        return self.snapshot().get(method_id)
+
+    def versions(self, name: str) -> list[str]:
+        """The registered versions of a method, from the oldest to the latest."""
+        return self.snapshot().versions(name)
+
+    def find(self, *tags: str, name: typing.Optional[str] = None) -> list[str]:
+        """
+        Search the methods without importing them, see `RegistrySnapshot.find`.
+        """
+        return self.snapshot().find(*tags, name=name)
+
+    def discover(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """
+        Declare the methods published by the installed packages, without importing them.
+
+        Packages list their methods in the `curry.methods` entry point group, named after the method:
+
+            [project.entry-points."curry.methods"]
+            my_method = "my_package.methods:my_method"
+
+        Parameters:
+            group (str): The entry point group.
+
+        Returns:
+            int: The number of declared methods.
+        """
+        entry_points = importlib.metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            selected = entry_points.select(group=group)
+        else:  # python < 3.10
+            selected = typing.cast(typing.Mapping[str, typing.Any], entry_points).get(group, [])
+        count = 0
+        with self._lock:
+            for entry_point in selected:
+                # Methods already registered (e.g. by an imported module) are not overridden by a bare declaration
+                if entry_point.name not in self._working.methods:
+                    self.add(MethodSpec(name=entry_point.name, target=entry_point.value))
+                    count += 1
+        logger.debug("Discovered %d methods in the entry point group '%s'", count, group)
+        return count
+
+    def load_manifest(self, path: typing.Union[str, Path]) -> int:
+        """
+        Declare the methods listed in a JSON manifest, without importing them.
+
+        The manifest is a list of `MethodSpec`, e.g.
+        `[{"name": "load_data", "target": "my_package.io:load_data", "version": "1.2.0", "tags": ["io"]}]`.
+
+        Parameters:
+            path (typing.Union[str, Path]): The manifest file.
+
+        Returns:
+            int: The number of declared methods.
+
+        Raises:
+            MethodConflictError: If a method of the manifest is already registered from another function.
+        """
+        specs = _MANIFEST_ADAPTER.validate_json(Path(path).read_bytes())
+        with self._lock:
+            for spec in specs:
+                self.add(spec)
+        logger.debug("Loaded %d methods from the manifest %s", len(specs), path)
+        return len(specs)
+
+    def _writable(self) -> _RegistryState:
+        """The working state, copied first if a snapshot refers to it. The lock must be held."""
+        if self._shared:
+            self._working = self._working.copy()
+            self._shared = False
+        self._published = None
+        return self._working
+
+    def _load(self, spec: MethodSpec) -> "MethodInfo":
+        from curry.methods.manager import MethodManager
+
+        with self._lock:
+            # The method may have been imported since the snapshot the spec comes from was taken
+            entry = self._working.find(f"{spec.name}@{spec.version}")
+            if entry is not None and not isinstance(entry, MethodSpec):
+                return entry
+
+            module_name, _, attribute = spec.target.partition(":")
+            try:
+                target: typing.Any = importlib.import_module(module_name)
+                for part in filter(None, attribute.split(".")):
+                    target = getattr(target, part)
+            except (ImportError, AttributeError) as error:
+                raise MethodLoadError(spec.name, spec.target, str(error)) from error
+
+            # Importing the module usually registered the method through its decorator, possibly in another version
+            function = inspect.unwrap(target)
+            registered = [
+                info
+                for info in self._working.methods.get(spec.name, {}).values()
+                if not isinstance(info, MethodSpec) and info.method is function
+            ]
+            if registered:
+                if isinstance(self._working.find(f"{spec.name}@{spec.version}"), MethodSpec):
+                    self._writable().remove(spec)
+                return registered[-1]
+            logger.debug("Registering method '%s' from %s", spec.name, spec.target)
+            MethodManager.register(
+                name=spec.name,
+                version=spec.version,
+                description=spec.description,
+                tags=spec.tags,
+                registry=self,
+                replace=True,
+                **spec.options,
+            )(function)
+            return typing.cast("MethodInfo", self._working.methods[spec.name][spec.version])
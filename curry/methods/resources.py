@@ -0,0 +1,160 @@
+import enum
+import logging
+import typing
+
+from dask.utils import parse_bytes
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from curry.utils.typing import AnyDict
+
+logger = logging.getLogger("curry.methods.resources")
+
+# Names of the abstract resources workers can declare, see `worker_resources`
+CPU_RESOURCE = "cpu"
+MEMORY_RESOURCE = "memory"
+IO_RESOURCE = "io"
+
+
+class WorkloadKind(str, enum.Enum):
+    """
+    What bounds the duration of a method.
+
+    - `CPU`: the method computes, it holds `threads` CPU slots of a worker.
+    - `IO`: the method mostly waits (disk, network, database), it holds one IO slot of a worker.
+    """
+
+    CPU = "cpu"
+    IO = "io"
+
+
+class ResourceHints(BaseModel):
+    """
+    What a method needs to run, turned into Dask annotations of the tasks of its blocks.
+
+    Resources are only requested from clusters whose workers declare them (see `worker_resources`): a task requiring
+    a resource no worker has would never run.
+
+    Attributes:
+        threads (int): The number of threads the method uses.
+        memory (typing.Optional[int]): The peak memory of the method, in bytes (strings like `"16GB"` are accepted).
+        kind (typing.Optional[WorkloadKind]): Whether the method is CPU or IO bound.
+        priority (int): Tasks with a higher priority run first.
+        retries (int): How many times a failed task is retried (e.g. after its worker was killed).
+        workers (typing.Optional[list[str]]): The addresses or names of the workers allowed to run the method.
+        allow_other_workers (bool): Whether other workers may run the method when the `workers` are busy.
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    threads: int = Field(default=1, gt=0)
+    memory: typing.Optional[int] = Field(default=None, gt=0)
+    kind: typing.Optional[WorkloadKind] = None
+    priority: int = 0
+    retries: int = Field(default=0, ge=0)
+    workers: typing.Optional[list[str]] = None
+    allow_other_workers: bool = False
+
+    @field_validator("memory", mode="before")
+    @classmethod
+    def parse_memory(cls, value: typing.Any) -> typing.Any:
+        return parse_bytes(value) if isinstance(value, str) else value
+
+    def resources(self) -> dict[str, float]:
+        """
+        Returns the abstract resources held by a task of the method.
+
+        Returns:
+            dict[str, float]: The quantity of each resource, indexed by resource name.
+        """
+        resources: dict[str, float] = {}
+        if self.kind is WorkloadKind.CPU:
+            resources[CPU_RESOURCE] = self.threads
+        elif self.kind is WorkloadKind.IO:
+            resources[IO_RESOURCE] = 1
+        if self.memory is not None:
+            resources[MEMORY_RESOURCE] = self.memory
+        return resources
+
+    def to_annotations(self, available_resources: typing.Optional[typing.Collection[str]] = None) -> AnyDict:
+        """
+        Translate the hints into the keyword arguments of `dask.annotate`.
+
+        Parameters:
+            available_resources (typing.Optional[typing.Collection[str]]): The resources declared by the workers of the
+                cluster (default to none: only the priority, retries and worker restrictions are kept).
+
+        Returns:
+            AnyDict: The annotations, empty if the hints are the defaults.
+        """
+        annotations: AnyDict = {}
+        available_resources = available_resources or ()
+        resources = {name: value for name, value in self.resources().items() if name in available_resources}
+        if resources:
+            annotations["resources"] = resources
+        for name in self.resources().keys() - resources.keys():
+            logger.debug("No worker declares the resource '%s', it is not requested", name)
+        if self.priority:
+            annotations["priority"] = self.priority
+        if self.retries:
+            annotations["retries"] = self.retries
+        if self.workers:
+            annotations["workers"] = self.workers
+            annotations["allow_other_workers"] = self.allow_other_workers
+        return annotations
+
+    @classmethod
+    def combine(cls, hints: typing.Iterable["ResourceHints"]) -> "ResourceHints":
+        """
+        Merge the hints of methods running at the same time in one task (e.g. a streaming pipeline).
+
+        Threads and memory add up, the highest priority and retries are kept, and the task is CPU bound if any of the
+        methods is.
+
+        Parameters:
+            hints (typing.Iterable[ResourceHints]): The hints of the methods.
+
+        Returns:
+            ResourceHints: The hints of the task.
+        """
+        hints = list(hints)
+        if not hints:
+            return cls()
+        kinds = {hint.kind for hint in hints}
+        workers = [hint.workers for hint in hints if hint.workers]
+        memories = [hint.memory for hint in hints if hint.memory is not None]
+        return cls(
+            threads=sum(hint.threads for hint in hints),
+            memory=sum(memories) if memories else None,
+            kind=next((kind for kind in (WorkloadKind.CPU, WorkloadKind.IO) if kind in kinds), None),
+            priority=max(hint.priority for hint in hints),
+            retries=max(hint.retries for hint in hints),
+            workers=sorted(set(workers[0]).intersection(*workers[1:])) if workers else None,
+            allow_other_workers=all(hint.allow_other_workers for hint in hints if hint.workers),
+        )
+
+
+def worker_resources(
+    cpu: typing.Optional[int] = None,
+    memory: typing.Optional[typing.Union[int, str]] = None,
+    io: typing.Optional[int] = None,
+) -> dict[str, float]:
+    """
+    Build the resources a worker declares, e.g. `LocalCluster(resources=worker_resources(cpu=4, memory="16GB", io=8))`
+    or `dask worker --resources "cpu=4,memory=16e9,io=8"`.
+
+    Args:
+        cpu (typing.Optional[int]): The number of CPU slots, usually the number of cores of the worker.
+        memory (typing.Optional[typing.Union[int, str]]): The memory the blocks can use, in bytes or as a string.
+        io (typing.Optional[int]): The number of IO bound methods the worker runs at once.
+
+    Returns:
+        dict[str, float]: The resources of the worker.
+    """
+    resources: dict[str, float] = {}
+    if cpu is not None:
+        resources[CPU_RESOURCE] = cpu
+    if memory is not None:
+        resources[MEMORY_RESOURCE] = parse_bytes(memory) if isinstance(memory, str) else memory
+    if io is not None:
+        resources[IO_RESOURCE] = io
+    return resources
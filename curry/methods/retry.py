@@ -0,0 +1,85 @@
+import logging
+import time
+import typing
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+logger = logging.getLogger("curry.methods.retry")
+
+
+class RetryPolicy(BaseModel):
+    """
+    How the calls of a method are retried when they fail (flaky network, busy database...).
+
+    The retries happen inside the task, on any scheduler. They complement `ResourceHints.retries`, which makes a
+    `distributed` scheduler run the task again when its worker dies.
+
+    Attributes:
+        max_attempts (int): The maximum number of calls, the first one included.
+        delay (float): The wait before the first retry, in seconds.
+        backoff (float): The factor applied to the wait after each retry.
+        max_delay (typing.Optional[float]): The longest wait between two calls, in seconds.
+        retry_on (tuple[type[Exception], ...]): The exceptions worth a retry, the other ones are raised immediately.
+        give_up_on (tuple[type[Exception], ...]): The exceptions raised immediately even when they match `retry_on`,
+            default to the invalid arguments (`ValidationError`, `TypeError`) that fail the same way on every call.
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    max_attempts: int = Field(default=3, ge=1)
+    delay: float = Field(default=0.0, ge=0)
+    backoff: float = Field(default=2.0, ge=1)
+    max_delay: typing.Optional[float] = Field(default=None, ge=0)
+    retry_on: tuple[type[Exception], ...] = (Exception,)
+    give_up_on: tuple[type[Exception], ...] = (ValidationError, TypeError)
+
+    def delays(self) -> list[float]:
+        """
+        Returns the waits before each retry, in seconds.
+        """
+        delays = []
+        delay = self.delay
+        for _ in range(self.max_attempts - 1):
+            delays.append(delay if self.max_delay is None else min(delay, self.max_delay))
+            delay *= self.backoff
+        return delays
+
+    def wrap(self, method: typing.Callable[..., typing.Any], name: str) -> "RetryingCall":
+        """
+        Wrap a method so that its failed calls are retried.
+
+        Parameters:
+            method (typing.Callable[..., typing.Any]): The method.
+            name (str): The name of the method, for the logs.
+
+        Returns:
+            RetryingCall: The wrapped method.
+        """
+        return RetryingCall(self, method, name)
+
+
+class RetryingCall:
+    """Picklable callable retrying a method according to a `RetryPolicy`, so that it can run on any Dask worker."""
+
+    def __init__(self, policy: RetryPolicy, method: typing.Callable[..., typing.Any], name: str):
+        self.policy = policy
+        self.method = method
+        self.name = name
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        for attempt, delay in enumerate(self.policy.delays(), start=1):
+            try:
+                return self.method(*args, **kwargs)
+            except self.policy.retry_on as error:
+                if isinstance(error, self.policy.give_up_on):
+                    raise
+                logger.warning(
+                    "Attempt %d/%d of %s failed (%r), retrying in %.2fs",
+                    attempt,
+                    self.policy.max_attempts,
+                    self.name,
+                    error,
+                    delay,
+                )
+            time.sleep(delay)
+        return self.method(*args, **kwargs)
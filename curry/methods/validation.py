@@ -0,0 +1,68 @@
+import enum
+import functools
+import typing
+
+from pydantic import ConfigDict, validate_call
+
+from curry.utils.typing import AnyCallable
+
+
+class ValidationMode(str, enum.Enum):
+    """
+    How the calls of a registered method are validated by pydantic.
+
+    Attributes:
+        OFF: No validation, the method is called as is.
+        BOUNDARY: The arguments are validated (and coerced) before the call.
+        FULL: The arguments and the returned value are validated.
+    """
+
+    OFF = "off"
+    BOUNDARY = "boundary"
+    FULL = "full"
+
+
+class ValidatedMethod:
+    """
+    Callable validating the calls of a method according to a validation mode.
+
+    The pydantic validator is built on the first call and then reused. It is not pickled: a copy sent to a Dask
+    worker builds its own validator once, on its first call.
+
+    Args:
+        method (AnyCallable): The method to validate.
+        mode (ValidationMode): The validation mode, it should not be `OFF`.
+
+    """
+
+    def __init__(self, method: AnyCallable, mode: ValidationMode):
+        functools.update_wrapper(self, method)
+        self.method = method
+        self.mode = mode
+        self._validated_method: typing.Optional[AnyCallable] = None
+
+    def build(self) -> AnyCallable:
+        """
+        Build the pydantic validator of the method, if not already done.
+
+        Returns:
+            AnyCallable: The validating function.
+        """
+        if self._validated_method is None:
+            # Types pydantic does not know (arrays, data frames...) are checked with `isinstance`
+            self._validated_method = validate_call(
+                config=ConfigDict(arbitrary_types_allowed=True), validate_return=self.mode is ValidationMode.FULL
+            )(self.method)
+        return self._validated_method
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        validated_method = self._validated_method or self.build()
+        return validated_method(*args, **kwargs)
+
+    def __getstate__(self) -> dict[str, typing.Any]:
+        state = self.__dict__.copy()
+        state["_validated_method"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, typing.Any]) -> None:
+        self.__dict__.update(state)
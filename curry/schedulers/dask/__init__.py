@@ -1,5 +1,24 @@
-from .client import default_local_client
+from .autoscaling import AutoscalingPolicy, FixedPolicy, ScalingDecision, ShapePolicy, WorkflowShape, workflow_shape
+from .client import DEFAULT_SCHEDULER_ADDRESS, default_local_client
+from .fake_jobqueue import FakeJobQueueCluster
 from .local_cluster import local_cluster as local_cluster
+from .manager import ClusterManager, ClusterPoolNotFoundError
+from .slurm import MissingJobQueueError
 from .slurm import cluster as slurm_cluster
 
-__all__ = ["default_local_client", "local_cluster", "slurm_cluster"]
+__all__ = [
+    "DEFAULT_SCHEDULER_ADDRESS",
+    "AutoscalingPolicy",
+    "ClusterManager",
+    "ClusterPoolNotFoundError",
+    "FakeJobQueueCluster",
+    "FixedPolicy",
+    "MissingJobQueueError",
+    "ScalingDecision",
+    "ShapePolicy",
+    "WorkflowShape",
+    "default_local_client",
+    "local_cluster",
+    "slurm_cluster",
+    "workflow_shape",
+]
@@ -0,0 +1,139 @@
+import abc
+import math
+import typing
+
+from pydantic import BaseModel, Field
+
+from curry.flow import CompiledWorkflow
+
+
+class WorkflowShape(BaseModel):
+    """
+    How much parallelism a workflow offers.
+
+    Attributes:
+        block_count (int): The number of blocks.
+        total_work (float): The sum of the durations of the blocks (one per block when durations are unknown).
+        critical_path_length (float): The duration of the longest chain of blocks, the shortest possible makespan.
+        width (int): The largest number of blocks sharing the same depth, that can run at the same time.
+    """
+
+    block_count: int
+    total_work: float
+    critical_path_length: float
+    width: int
+
+    @property
+    def average_parallelism(self) -> float:
+        """The number of workers needed to finish in the critical path length, if work was perfectly balanced."""
+        return self.total_work / self.critical_path_length if self.critical_path_length > 0 else 0.0
+
+
+def workflow_shape(
+    workflow: CompiledWorkflow, durations: typing.Optional[typing.Mapping[str, float]] = None
+) -> WorkflowShape:
+    """
+    Measure the critical path and the width of a workflow, in O(V+E).
+
+    Args:
+        workflow (CompiledWorkflow): The compiled workflow.
+        durations (typing.Optional[typing.Mapping[str, float]]): The expected duration of the blocks, indexed by block
+            id (default to one per block, the critical path is then counted in blocks).
+
+    Returns:
+        WorkflowShape: The shape of the workflow.
+    """
+    depths: dict[str, int] = {}
+    finish_times: dict[str, float] = {}
+    for block_id in workflow.order:
+        parent_ids = workflow.parents[block_id]
+        duration = durations.get(block_id, 1.0) if durations is not None else 1.0
+        depths[block_id] = max((depths[parent_id] + 1 for parent_id in parent_ids), default=0)
+        finish_times[block_id] = max((finish_times[parent_id] for parent_id in parent_ids), default=0.0) + duration
+
+    level_sizes: dict[int, int] = {}
+    for depth in depths.values():
+        level_sizes[depth] = level_sizes.get(depth, 0) + 1
+    return WorkflowShape(
+        block_count=len(workflow),
+        total_work=sum(durations.get(block_id, 1.0) for block_id in workflow.order)
+        if durations is not None
+        else float(len(workflow)),
+        critical_path_length=max(finish_times.values(), default=0.0),
+        width=max(level_sizes.values(), default=0),
+    )
+
+
+class ScalingDecision(BaseModel):
+    """
+    The bounds of the number of workers of an adaptive cluster.
+
+    Attributes:
+        minimum (int): The number of workers kept, even when idle.
+        maximum (int): The largest number of workers requested.
+    """
+
+    minimum: int = Field(ge=0)
+    maximum: int = Field(ge=0)
+
+
+class AutoscalingPolicy(abc.ABC):
+    """
+    Decide how many workers a cluster needs to run a workflow.
+    """
+
+    @abc.abstractmethod
+    def decide(self, shape: WorkflowShape) -> ScalingDecision:
+        """
+        Pick the bounds of the number of workers for a workflow.
+
+        Parameters:
+            shape (WorkflowShape): The shape of the workflow.
+
+        Returns:
+            ScalingDecision: The number of workers.
+        """
+
+
+class FixedPolicy(AutoscalingPolicy):
+    """
+    Always use the same number of workers.
+
+    Args:
+        workers (int): The number of workers.
+
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def decide(self, shape: WorkflowShape) -> ScalingDecision:
+        return ScalingDecision(minimum=self.workers, maximum=self.workers)
+
+
+class ShapePolicy(AutoscalingPolicy):
+    """
+    Size the cluster after the parallelism of the workflow.
+
+    The cluster keeps enough workers to finish in about the critical path length (the total work divided by the
+    critical path length), and may grow up to the width of the workflow: more workers would stay idle.
+
+    Args:
+        min_workers (int): The smallest number of workers.
+        max_workers (int): The largest number of workers.
+        blocks_per_worker (int): The number of blocks a worker runs at the same time (its threads).
+
+    """
+
+    def __init__(self, min_workers: int = 1, max_workers: int = 10, blocks_per_worker: int = 1):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.blocks_per_worker = blocks_per_worker
+
+    def _clamp(self, workers: float) -> int:
+        return min(max(math.ceil(workers / self.blocks_per_worker), self.min_workers), self.max_workers)
+
+    def decide(self, shape: WorkflowShape) -> ScalingDecision:
+        minimum = self._clamp(shape.average_parallelism)
+        maximum = max(self._clamp(shape.width), minimum)
+        return ScalingDecision(minimum=minimum, maximum=maximum)
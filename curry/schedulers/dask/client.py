@@ -0,0 +1,27 @@
+import typing
+
+from distributed import Client, default_client
+
+# The address of the scheduler launched by `make run-local-dask-scheduler`
+DEFAULT_SCHEDULER_ADDRESS = "tcp://127.0.0.1:18000"
+
+
+def default_local_client(address: str = DEFAULT_SCHEDULER_ADDRESS, **kwargs: typing.Any) -> Client:
+    """
+    Connect to the local scheduler, reusing the default client when it is already connected to it.
+
+    Args:
+        address (str): The address of the scheduler.
+        **kwargs (typing.Any): The options of the `Client`.
+
+    Returns:
+        Client: The client.
+    """
+    try:
+        client = default_client()
+    except ValueError:
+        pass
+    else:
+        if client.scheduler is not None and client.scheduler.address == address and client.status == "running":
+            return typing.cast(Client, client)
+    return Client(address=address, **kwargs)
@@ -0,0 +1,57 @@
+import logging
+import time
+import typing
+
+from distributed import LocalCluster
+
+logger = logging.getLogger("curry.schedulers.dask.fake_jobqueue")
+
+
+class FakeJobQueueCluster(LocalCluster):
+    """
+    A `LocalCluster` behaving like a job-queue cluster (`dask_jobqueue`), to exercise the autoscaling on a single box.
+
+    Every worker stands for a job: starting it is recorded as a submission (`sbatch`), retiring it as a cancellation
+    (`scancel`), and the jobs can wait `queue_delay` seconds in the queue before their worker starts.
+
+    Args:
+        queue_delay (float): How long a job waits in the queue, in seconds.
+        **kwargs (typing.Any): The options of the `LocalCluster` (default to no worker, one thread per worker and
+            in-process workers).
+
+    """
+
+    def __init__(self, queue_delay: float = 0.0, **kwargs: typing.Any):
+        self.queue_delay = queue_delay
+        self.submitted_jobs: list[str] = []
+        self.cancelled_jobs: list[str] = []
+        kwargs.setdefault("n_workers", 0)
+        kwargs.setdefault("threads_per_worker", 1)
+        kwargs.setdefault("processes", False)
+        super().__init__(**kwargs)
+
+    def job_script(self) -> str:
+        """The script a job would run, like `dask_jobqueue` clusters."""
+        return f"#!/usr/bin/env bash\ndask worker {self.scheduler_address} --nthreads 1\n"
+
+    def new_worker_spec(self) -> dict[typing.Union[str, int], dict[str, typing.Any]]:
+        spec: dict[typing.Union[str, int], dict[str, typing.Any]] = super().new_worker_spec()
+        if self.queue_delay:
+            time.sleep(self.queue_delay)
+        for name in spec:
+            logger.debug("Submitted the job of worker %s", name)
+            self.submitted_jobs.append(str(name))
+        return spec
+
+    async def scale_down(self, workers: typing.Iterable[str]) -> None:
+        workers = list(workers)
+        for name in workers:
+            if name in self.worker_spec:
+                logger.debug("Cancelled the job of worker %s", name)
+                self.cancelled_jobs.append(str(name))
+        await super().scale_down(workers)
+
+    @property
+    def running_jobs(self) -> int:
+        """The number of jobs submitted and not cancelled."""
+        return len(self.worker_spec)
@@ -0,0 +1,30 @@
+import typing
+
+from distributed import LocalCluster
+
+from curry.schedulers.dask.autoscaling import AutoscalingPolicy
+from curry.schedulers.dask.manager import ClusterManager
+
+LOCAL_POOL_NAME = "local"
+
+
+def local_cluster(
+    policy: typing.Optional[AutoscalingPolicy] = None,
+    warm_workers: int = 1,
+    name: str = LOCAL_POOL_NAME,
+    **kwargs: typing.Any,
+) -> ClusterManager:
+    """
+    Get the warm pool of workers of a `LocalCluster`, started on first use.
+
+    Args:
+        policy (typing.Optional[AutoscalingPolicy]): Sizes the cluster for a workflow (default to `ShapePolicy`).
+        warm_workers (int): The number of workers kept between runs.
+        name (str): The name of the pool.
+        **kwargs (typing.Any): The options of the `LocalCluster` (e.g. `threads_per_worker`, `resources`).
+
+    Returns:
+        ClusterManager: The pool.
+    """
+    kwargs.setdefault("n_workers", 0)
+    return ClusterManager.get(name, factory=lambda: LocalCluster(**kwargs), policy=policy, warm_workers=warm_workers)
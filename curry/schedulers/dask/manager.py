@@ -0,0 +1,228 @@
+import logging
+import threading
+import typing
+from uuid import uuid4
+
+from distributed import Client
+from distributed.deploy import Cluster
+
+from curry.block import Block
+from curry.flow import CompiledWorkflow, DurationHistory, compile_workflow, submit_workflow
+from curry.methods import MethodManager, MethodSource
+from curry.schedulers.dask.autoscaling import (
+    AutoscalingPolicy,
+    ScalingDecision,
+    ShapePolicy,
+    workflow_shape,
+)
+from curry.utils.typing import AnyDict
+
+logger = logging.getLogger("curry.schedulers.dask.manager")
+
+ClusterFactory = typing.Callable[[], Cluster]
+
+
+class ClusterPoolNotFoundError(KeyError):
+    """
+    Exception raised when a pool of workers is retrieved by name before it was created.
+
+    Args:
+        name (str): The name of the pool.
+
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.message = f"No cluster pool named '{name}'"
+        super().__init__(self.message)
+
+
+class ClusterManager:
+    """
+    A pool of workers kept warm between runs, resized for each workflow by an autoscaling policy.
+
+    The cluster is only created on first use. Before a run, the policy picks the bounds of the number of workers from
+    the shape of the workflow and the cluster adapts within them; after the run, it shrinks back to `warm_workers`
+    idle workers instead of being closed, so that the next run does not wait for workers to start.
+
+    The decisions are kept by run: concurrent runs only grow the cluster, which shrinks once no run is active.
+
+    Managers are named: `ClusterManager.get` returns the same pool to every caller.
+
+    Args:
+        factory (ClusterFactory): Creates the cluster (e.g. a `LocalCluster` or a `SLURMCluster`).
+        policy (typing.Optional[AutoscalingPolicy]): Sizes the cluster for a workflow (default to `ShapePolicy`).
+        warm_workers (int): The number of workers kept between runs.
+        name (str): The name of the pool.
+
+    """
+
+    _pools: typing.ClassVar[dict[str, "ClusterManager"]] = {}
+
+    def __init__(
+        self,
+        factory: ClusterFactory,
+        policy: typing.Optional[AutoscalingPolicy] = None,
+        warm_workers: int = 1,
+        name: str = "default",
+    ):
+        self.factory = factory
+        self.policy = policy or ShapePolicy()
+        self.warm_workers = warm_workers
+        self.name = name
+        self.decisions: dict[str, ScalingDecision] = {}
+        # The bounds the cluster adapts within while runs are active
+        self._bounds: typing.Optional[ScalingDecision] = None
+        self._lock = threading.Lock()
+        self._cluster: typing.Optional[Cluster] = None
+        self._client: typing.Optional[Client] = None
+
+    @classmethod
+    def get(
+        cls,
+        name: str,
+        factory: typing.Optional[ClusterFactory] = None,
+        policy: typing.Optional[AutoscalingPolicy] = None,
+        warm_workers: int = 1,
+    ) -> "ClusterManager":
+        """
+        Retrieve a pool by name, creating it on first use.
+
+        Raises:
+            ClusterPoolNotFoundError: If the pool does not exist and no factory is given.
+        """
+        pool = cls._pools.get(name)
+        if pool is None:
+            if factory is None:
+                raise ClusterPoolNotFoundError(name)
+            pool = cls._pools[name] = cls(factory, policy=policy, warm_workers=warm_workers, name=name)
+        return pool
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close all the pools."""
+        for pool in list(cls._pools.values()):
+            pool.close()
+
+    @property
+    def started(self) -> bool:
+        """Whether the cluster was created."""
+        return self._cluster is not None
+
+    @property
+    def cluster(self) -> Cluster:
+        """The cluster, created on first access with `warm_workers` workers."""
+        if self._cluster is None:
+            logger.info("Starting the cluster of the pool '%s'", self.name)
+            self._cluster = self.factory()
+            self._cluster.adapt(minimum=self.warm_workers, maximum=max(self.warm_workers, 1))
+        return self._cluster
+
+    @property
+    def client(self) -> Client:
+        """A client of the cluster, created on first access."""
+        if self._client is None:
+            self._client = Client(self.cluster, set_as_default=False)
+        return self._client
+
+    def prepare(
+        self,
+        workflow: CompiledWorkflow,
+        durations: typing.Optional[typing.Mapping[str, float]] = None,
+        run_id: typing.Optional[str] = None,
+    ) -> ScalingDecision:
+        """
+        Resize the cluster for a workflow. The cluster only grows while other runs are active.
+
+        Parameters:
+            workflow (CompiledWorkflow): The workflow about to run.
+            durations (typing.Optional[typing.Mapping[str, float]]): The expected durations of the blocks, indexed by
+                block id, to weight the critical path.
+            run_id (typing.Optional[str]): The id of the run, to give to `release` once it is over (default to a
+                random uuid).
+
+        Returns:
+            ScalingDecision: The bounds picked for the workflow.
+        """
+        shape = workflow_shape(workflow, durations)
+        decision = self.policy.decide(shape)
+        decision = ScalingDecision(
+            minimum=max(decision.minimum, self.warm_workers), maximum=max(decision.maximum, self.warm_workers)
+        )
+        with self._lock:
+            self.decisions[run_id or str(uuid4())] = decision
+            bounds = decision
+            if self._bounds is not None:
+                # Other runs are active, the cluster is not shrunk under them
+                bounds = ScalingDecision(
+                    minimum=max(decision.minimum, self._bounds.minimum),
+                    maximum=max(decision.maximum, self._bounds.maximum),
+                )
+            self._bounds = bounds
+            logger.info(
+                "Scaling the pool '%s' to %d-%d workers (critical path %.1f, width %d)",
+                self.name,
+                bounds.minimum,
+                bounds.maximum,
+                shape.critical_path_length,
+                shape.width,
+            )
+            self.cluster.adapt(minimum=bounds.minimum, maximum=bounds.maximum)
+        return decision
+
+    def release(self, run_id: typing.Optional[str] = None) -> None:
+        """
+        Forget the decision of a run, and let the cluster shrink back to its warm workers once no run is active.
+
+        Parameters:
+            run_id (typing.Optional[str]): The id given to `prepare` (default to releasing all the runs).
+        """
+        with self._lock:
+            if run_id is None:
+                self.decisions.clear()
+            else:
+                self.decisions.pop(run_id, None)
+            if self.decisions:
+                return
+            if self._cluster is not None:
+                maximum = self._bounds.maximum if self._bounds is not None else self.warm_workers
+                self._cluster.adapt(minimum=self.warm_workers, maximum=max(maximum, self.warm_workers, 1))
+            self._bounds = None
+
+    def submit(self, blocks: typing.Union[list[Block], CompiledWorkflow], **kwargs: typing.Any) -> AnyDict:
+        """
+        Resize the cluster for a workflow, compute it on the cluster and release the workers.
+
+        Parameters:
+            blocks (typing.Union[list[Block], CompiledWorkflow]): The blocks, or a compiled workflow.
+            **kwargs (typing.Any): The options of `submit_workflow`, its `durations` also weight the critical path
+                of the workflow.
+
+        Returns:
+            AnyDict: The result of `submit_workflow`.
+        """
+        workflow = blocks if isinstance(blocks, CompiledWorkflow) else compile_workflow(blocks)
+        durations: typing.Optional[DurationHistory] = kwargs.get("durations")
+        methods: typing.Optional[MethodSource] = kwargs.get("methods")
+        with MethodManager.use(methods if methods is not None else MethodManager.snapshot()):
+            expected_durations = durations.block_durations(workflow) if durations is not None else None
+        run_id = kwargs.get("run_id") or str(uuid4())
+        self.prepare(workflow, expected_durations, run_id=run_id)
+        try:
+            with self.client.as_current():
+                return submit_workflow(workflow, **kwargs)
+        finally:
+            self.release(run_id)
+
+    def close(self) -> None:
+        """
+        Close the client and the cluster.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._cluster is not None:
+            self._cluster.close()
+            self._cluster = None
+        if self._pools.get(self.name) is self:
+            del self._pools[self.name]
@@ -5,7 +5,58 @@ srun -n 1 dynamic_workload.py
 ```
 """
 
-from dask_jobqueue.slurm import SLURMCluster
+import typing
 
-cluster = SLURMCluster()
-cluster.adapt(minimum=1, maximum=10)  # Tells Dask to call `srun -n 1 ...` when it needs new workers
+from distributed.deploy import Cluster
+
+from curry.schedulers.dask.autoscaling import AutoscalingPolicy
+from curry.schedulers.dask.manager import ClusterManager
+
+SLURM_POOL_NAME = "slurm"
+
+
+class MissingJobQueueError(ImportError):
+    """
+    Exception raised when a job-queue cluster is created without `dask_jobqueue` installed.
+
+    Args:
+        scheduler (str): The name of the job scheduler.
+
+    """
+
+    def __init__(self, scheduler: str):
+        self.scheduler = scheduler
+        self.message = f"The {scheduler} cluster requires `dask_jobqueue`, install it with `pip install dask-jobqueue`"
+        super().__init__(self.message)
+
+
+def _slurm_cluster(**kwargs: typing.Any) -> Cluster:
+    try:
+        from dask_jobqueue.slurm import SLURMCluster
+    except ImportError as error:
+        raise MissingJobQueueError("SLURM") from error
+    return typing.cast(Cluster, SLURMCluster(**kwargs))
+
+
+def cluster(
+    policy: typing.Optional[AutoscalingPolicy] = None,
+    warm_workers: int = 1,
+    name: str = SLURM_POOL_NAME,
+    **kwargs: typing.Any,
+) -> ClusterManager:
+    """
+    Get the warm pool of workers of a `SLURMCluster`, created on first use.
+
+    Dask calls `srun -n 1 ...` when the autoscaling policy needs new workers, and cancels the jobs of idle workers
+    beyond the warm ones.
+
+    Args:
+        policy (typing.Optional[AutoscalingPolicy]): Sizes the cluster for a workflow (default to `ShapePolicy`).
+        warm_workers (int): The number of workers (jobs) kept between runs.
+        name (str): The name of the pool.
+        **kwargs (typing.Any): The options of the `SLURMCluster` (e.g. `queue`, `cores`, `memory`, `walltime`).
+
+    Returns:
+        ClusterManager: The pool.
+    """
+    return ClusterManager.get(name, factory=lambda: _slurm_cluster(**kwargs), policy=policy, warm_workers=warm_workers)
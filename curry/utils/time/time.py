@@ -1,4 +1,11 @@
 import datetime
+import typing
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_list_like
+
+from curry.utils.typing import AnyDict
 
 
 def convert_period_to_wrapping_months(start_datetime: datetime.datetime, end_datetime: datetime.datetime) -> list:
@@ -17,3 +24,157 @@ def convert_period_to_wrapping_months(start_datetime: datetime.datetime, end_dat
 
 def convert_month_to_str(month_start: datetime.datetime) -> str:
     return f"{month_start.strftime('%Y-%m')}"
+
+
+Granularity = typing.Literal["day", "week", "month", "year"]
+
+# The numpy datetime unit and the number of units of each granularity
+_GRANULARITY_UNITS: dict[str, tuple[str, int]] = {
+    "day": ("D", 1),
+    "week": ("D", 7),
+    "month": ("M", 1),
+    "year": ("Y", 1),
+}
+
+# 1970-01-01, the epoch of numpy dates, is a Thursday: weeks start on the Monday 3 days before
+_EPOCH_WEEKDAY = 3
+
+DatetimeLike = typing.Union[str, datetime.datetime, np.datetime64, pd.Timestamp]
+DatetimesLike = typing.Union[DatetimeLike, typing.Sequence[DatetimeLike], np.ndarray, pd.Index, pd.Series]
+
+
+def _to_datetime_index(values: DatetimesLike, tz: typing.Optional[str]) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(pd.to_datetime(typing.cast(typing.Any, values if is_list_like(values) else [values])))
+    if tz is not None:
+        index = index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+    return index
+
+
+def _floor_units(index: pd.DatetimeIndex, granularity: Granularity) -> np.ndarray:
+    """The partitions of naive dates, as numbers of numpy units since the epoch (of days, for the weeks)."""
+    unit, _ = _GRANULARITY_UNITS[granularity]
+    units = index.to_numpy().astype(f"datetime64[{unit}]").astype(np.int64)
+    if granularity == "week":
+        units -= (units + _EPOCH_WEEKDAY) % 7
+    return units
+
+
+def _unit_labels(units: np.ndarray, granularity: Granularity) -> np.ndarray:
+    unit, _ = _GRANULARITY_UNITS[granularity]
+    dates = units.astype(f"datetime64[{unit}]")
+    if granularity == "week":
+        calendar = pd.DatetimeIndex(dates.astype("datetime64[ns]")).isocalendar()
+        years = calendar["year"].to_numpy(dtype=np.int64).astype(str)
+        weeks = np.char.zfill(calendar["week"].to_numpy(dtype=np.int64).astype(str), 2)
+        return np.char.add(np.char.add(years, "-W"), weeks)
+    return typing.cast(np.ndarray, np.datetime_as_string(dates, unit=typing.cast(typing.Any, unit)))
+
+
+def _labels(units: np.ndarray, granularity: Granularity) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The labels of every partition between the first and the last ones, and the position of the label of each one:
+    the thousands of periods of a split share a few hundred labels, formatted only once.
+    """
+    _, step = _GRANULARITY_UNITS[granularity]
+    if not len(units):
+        return np.array([], dtype=str), np.array([], dtype=np.int64)
+    lowest = units.min()
+    return _unit_labels(np.arange(lowest, units.max() + 1, step), granularity), (units - lowest) // step
+
+
+def format_periods(period_starts: DatetimesLike, granularity: Granularity = "month") -> np.ndarray:
+    """
+    Vectorised `convert_month_to_str`: the labels of periods, `2024-03-17` (day), `2024-W11` (ISO week), `2024-03`
+    (month) or `2024` (year).
+
+    Args:
+        period_starts (DatetimesLike): The starts of the periods (or any date in them).
+        granularity (Granularity): The kind of periods.
+
+    Returns:
+        np.ndarray: The labels.
+    """
+    index = _to_datetime_index(period_starts, None)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    labels, positions = _labels(_floor_units(index, granularity), granularity)
+    return typing.cast(np.ndarray, labels[positions])
+
+
+def split_periods(
+    starts: DatetimesLike,
+    ends: DatetimesLike,
+    granularity: Granularity = "month",
+    tz: typing.Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Vectorised `convert_period_to_wrapping_months`: split many periods at once into the calendar days, weeks (from
+    Monday), months or years wrapping them.
+
+    As with `convert_period_to_wrapping_months`, the partition containing the end of a period is included, and a
+    period ending before it starts has no partition. The boundaries are computed on the wall clock of the time zone:
+    a month of `Europe/Paris` starts at midnight in Paris, whatever the daylight saving time.
+
+    Args:
+        starts (DatetimesLike): The starts of the periods.
+        ends (DatetimesLike): The ends of the periods, as many as `starts`.
+        granularity (Granularity): The kind of partitions.
+        tz (typing.Optional[str]): The time zone of the partitions. Naive dates are considered in this time zone and
+            aware ones are converted to it (default to the time zone of the dates, naive dates giving naive
+            partitions).
+
+    Returns:
+        pd.DataFrame: One row per partition, ordered by period then start, with the columns `period` (the position
+            of the period in `starts`), `start` and `end` (the partition is `[start, end)`) and `label` (see
+            `format_periods`, as a categorical column).
+    """
+    start_index, end_index = _to_datetime_index(starts, tz), _to_datetime_index(ends, tz)
+    zone = start_index.tz
+    if zone is not None:
+        # The boundaries are computed on the local wall clock, then localized back
+        start_index, end_index = start_index.tz_localize(None), end_index.tz_convert(zone).tz_localize(None)
+
+    unit, step = _GRANULARITY_UNITS[granularity]
+    first, last = _floor_units(start_index, granularity), _floor_units(end_index, granularity)
+    counts = np.where(end_index < start_index, 0, (last - first) // step + 1)
+
+    # Every partition is its period first partition plus its rank in the period
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    partition_units = np.repeat(first, counts) + offsets * step
+
+    boundaries = []
+    for values in (partition_units, partition_units + step):
+        index = pd.DatetimeIndex(values.astype(f"datetime64[{unit}]").astype("datetime64[ns]"))
+        if zone is not None:
+            # A boundary falling in a repeated hour is its first occurrence, in a skipped hour the end of the gap
+            index = index.tz_localize(zone, ambiguous=np.ones(len(index), dtype=bool), nonexistent="shift_forward")
+        boundaries.append(index)
+    labels, positions = _labels(partition_units, granularity)
+    return pd.DataFrame({
+        "period": np.repeat(np.arange(len(counts)), counts),
+        "start": boundaries[0],
+        "end": boundaries[1],
+        "label": pd.Categorical.from_codes(positions, categories=pd.Index(labels)),
+    })
+
+
+def period_partitions(
+    starts: DatetimesLike,
+    ends: DatetimesLike,
+    granularity: Granularity = "month",
+    tz: typing.Optional[str] = None,
+) -> list[AnyDict]:
+    """
+    Split periods like `split_periods`, as a list a mapped block can iterate over (see `BlockMapping`): each element
+    is a partition, as a `{"period", "start", "end", "label"}` dict.
+
+    Args:
+        starts (DatetimesLike): The starts of the periods.
+        ends (DatetimesLike): The ends of the periods.
+        granularity (Granularity): The kind of partitions.
+        tz (typing.Optional[str]): The time zone of the partitions.
+
+    Returns:
+        list[AnyDict]: The partitions, ordered by period then start.
+    """
+    return typing.cast(list[AnyDict], split_periods(starts, ends, granularity, tz).to_dict("records"))
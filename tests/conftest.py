@@ -0,0 +1,14 @@
+import typing
+
+import pytest
+from distributed import Client, LocalCluster
+
+
+@pytest.fixture(scope="module")
+def client() -> typing.Iterator[Client]:
+    """A client of a small in-process cluster, shared by the tests of a module."""
+    with (
+        LocalCluster(n_workers=1, threads_per_worker=4, processes=False, dashboard_address=None) as cluster,
+        Client(cluster, set_as_default=False) as client,
+    ):
+        yield client
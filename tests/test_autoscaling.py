@@ -0,0 +1,157 @@
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import DurationHistory, compile_workflow
+from curry.methods import MethodRegistry
+from curry.schedulers.dask import (
+    AutoscalingPolicy,
+    ClusterManager,
+    ClusterPoolNotFoundError,
+    FakeJobQueueCluster,
+    FixedPolicy,
+    ScalingDecision,
+    ShapePolicy,
+    WorkflowShape,
+    default_local_client,
+    local_cluster,
+    workflow_shape,
+)
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+@methods.register(name="total")
+def total(first: int, second: int) -> int:
+    return first + second
+
+
+def workflow_blocks() -> list[Block]:
+    # Three sources feeding two levels of sums
+    return [
+        *(Block(id=block_id, method_id="value", parameters={"value": 1}) for block_id in ("a", "b", "c")),
+        Block(
+            id="d",
+            method_id="total",
+            connections=[
+                BlockConnection(source_block_id="a", self_input_name="first"),
+                BlockConnection(source_block_id="b", self_input_name="second"),
+            ],
+        ),
+        Block(
+            id="e",
+            method_id="total",
+            connections=[
+                BlockConnection(source_block_id="d", self_input_name="first"),
+                BlockConnection(source_block_id="c", self_input_name="second"),
+            ],
+        ),
+    ]
+
+
+def test_workflow_shape():
+    workflow = compile_workflow(workflow_blocks())
+
+    shape = workflow_shape(workflow)
+    assert (shape.block_count, shape.total_work, shape.critical_path_length, shape.width) == (5, 5.0, 3.0, 3)
+    assert shape.average_parallelism == pytest.approx(5 / 3)
+
+    weighted = workflow_shape(workflow, {"c": 10.0})
+    assert weighted.critical_path_length == 11.0
+    assert weighted.total_work == 14.0
+
+
+def test_policies():
+    shape = WorkflowShape(block_count=100, total_work=100.0, critical_path_length=10.0, width=40)
+
+    assert FixedPolicy(3).decide(shape) == ScalingDecision(minimum=3, maximum=3)
+    assert ShapePolicy(max_workers=20).decide(shape) == ScalingDecision(minimum=10, maximum=20)
+    assert ShapePolicy(blocks_per_worker=4).decide(shape) == ScalingDecision(minimum=3, maximum=10)
+    assert ShapePolicy(min_workers=2).decide(
+        WorkflowShape(block_count=1, total_work=1.0, critical_path_length=1.0, width=1)
+    ) == ScalingDecision(minimum=2, maximum=2)
+
+
+def test_policies_must_decide():
+    with pytest.raises(TypeError):
+        AutoscalingPolicy()
+
+
+def test_cluster_pools_are_resized_for_each_workflow():
+    with pytest.raises(ClusterPoolNotFoundError):
+        ClusterManager.get("tests")
+
+    pool = ClusterManager.get(
+        "tests", factory=lambda: FakeJobQueueCluster(dashboard_address=None), policy=FixedPolicy(2), warm_workers=0
+    )
+    try:
+        assert ClusterManager.get("tests") is pool
+        assert not pool.started
+
+        durations = DurationHistory()
+        assert pool.submit(workflow_blocks(), methods=methods, durations=durations)["result"] == 3
+        # The durations of the blocks are looked up in the registry of the workflow
+        assert pool.submit(workflow_blocks(), methods=methods, durations=durations)["result"] == 3
+        assert pool.started
+        assert pool.cluster.submitted_jobs
+        assert pool.decisions == {}
+        assert pool.prepare(compile_workflow(workflow_blocks())) == ScalingDecision(minimum=2, maximum=2)
+    finally:
+        pool.close()
+    assert not pool.started
+    with pytest.raises(ClusterPoolNotFoundError):
+        ClusterManager.get("tests")
+
+
+class WidthPolicy(AutoscalingPolicy):
+    def decide(self, shape: WorkflowShape) -> ScalingDecision:
+        return ScalingDecision(minimum=1, maximum=shape.width)
+
+
+class RecordingCluster:
+    def __init__(self) -> None:
+        self.bounds: list[tuple[int, int]] = []
+
+    def adapt(self, minimum: int, maximum: int) -> None:
+        self.bounds.append((minimum, maximum))
+
+    def close(self) -> None:
+        pass
+
+
+def test_concurrent_runs_keep_their_own_decision():
+    pool = ClusterManager(RecordingCluster, policy=WidthPolicy(), warm_workers=0)
+    wide = compile_workflow(workflow_blocks())
+    narrow = compile_workflow([Block(id="a", method_id="value", parameters={"value": 1})])
+
+    assert pool.prepare(wide, run_id="wide") == ScalingDecision(minimum=1, maximum=3)
+    assert pool.prepare(narrow, run_id="narrow") == ScalingDecision(minimum=1, maximum=1)
+    assert pool.decisions == {
+        "wide": ScalingDecision(minimum=1, maximum=3),
+        "narrow": ScalingDecision(minimum=1, maximum=1),
+    }
+
+    # The cluster starts with its warm workers, and is not shrunk while the narrow run is active
+    pool.release("wide")
+    assert pool.cluster.bounds == [(0, 1), (1, 3), (1, 3)]
+    pool.release("narrow")
+    assert pool.cluster.bounds[-1] == (0, 3)
+    assert pool.decisions == {}
+
+
+def test_local_cluster_pools_start_on_first_use():
+    pool = local_cluster(name="tests-local", dashboard_address=None)
+    try:
+        assert local_cluster(name="tests-local") is pool
+        assert not pool.started
+    finally:
+        pool.close()
+
+
+def test_default_local_client_reuses_the_connected_client(client):
+    with client.as_current():
+        assert default_local_client(client.scheduler.address) is client
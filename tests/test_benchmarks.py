@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.run import compare, count_tasks
+from benchmarks.workflows import SHAPES
+from curry.flow import CompiledWorkflow, submit_workflow
+
+
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_benchmark_workflows_run(shape):
+    workflow = CompiledWorkflow.from_json(SHAPES[shape](40))
+
+    results = submit_workflow(workflow)["results"]
+
+    assert len(workflow) == 40
+    assert set(results) == set(workflow.sinks)
+
+
+def test_lightweight_chains_need_fewer_tasks():
+    counts = count_tasks("chain", 100)
+
+    assert counts["blocks"] == 100
+    assert counts["fused"] < counts["unfused"]
+
+
+def test_compare_reports_the_regressions():
+    previous = {"benchmarks": {"chain": {"build": {"mean": 1.0}, "compute": {"mean": 1.0}}}}
+    current = {"benchmarks": {"chain": {"build": {"mean": 1.1}, "compute": {"mean": 2.0}}, "new": {}}}
+
+    assert compare(previous, current) == ["chain/compute: 1000.0 ms -> 2000.0 ms"]
@@ -0,0 +1,136 @@
+import copy
+import pickle
+
+import pytest
+from pydantic import ValidationError
+
+from curry.block import DEFAULT_PRODUCERS, Block, BlockConnection, BlockProducer, dump_blocks, load_blocks, produce_many
+from curry.methods import MethodManager, MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+def counting_producer(calls: list[str], **kwargs) -> BlockProducer:
+    def render(block: Block) -> str:
+        calls.append(block.id)
+        return f"<b>{block.parameters.get('value')}</b>"
+
+    return BlockProducer(format_name="html", func=render, **kwargs)
+
+
+def test_load_and_dump_blocks():
+    blocks = [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="value", connections=[BlockConnection(source_block_id="a", self_input_name="value")]),
+    ]
+
+    assert load_blocks(dump_blocks(blocks)) == blocks
+    assert load_blocks([block.model_dump() for block in blocks]) == blocks
+    with pytest.raises(ValidationError):
+        load_blocks('[{"id": "a"}]')
+
+
+def render_method_id(block: Block) -> str:
+    return block.method_id
+
+
+def test_blocks_are_picklable():
+    block = Block(id="a", method_id="value", parameters={"value": 1})
+
+    loaded = pickle.loads(pickle.dumps(block))  # noqa: S301 the data is pickled by the test
+
+    assert loaded == block
+    assert loaded.producers is DEFAULT_PRODUCERS
+
+    block.register_producer(BlockProducer(format_name="text", func=render_method_id))
+    loaded = pickle.loads(pickle.dumps(block))  # noqa: S301 the data is pickled by the test
+    assert loaded.produce("text") == "value"
+    assert "text" not in DEFAULT_PRODUCERS
+
+
+def test_producer_outputs_are_cached_until_a_field_changes():
+    calls: list[str] = []
+    block = Block(id="a", method_id="value", parameters={"value": 1})
+    block.register_producer(counting_producer(calls))
+
+    assert block.produce("html") == "<b>1</b>"
+    assert block.produce("html") == "<b>1</b>"
+    assert calls == ["a"]
+
+    block.parameters = {"value": 2}
+    assert block.produce("html") == "<b>2</b>"
+
+    block.parameters["value"] = 3
+    block.invalidate_produced()
+    assert block.produce("html") == "<b>3</b>"
+    assert calls == ["a", "a", "a"]
+
+
+def test_registered_producers_only_apply_to_their_block():
+    block = Block(method_id="value")
+    other = Block(method_id="value")
+
+    block.register_producer(BlockProducer(format_name="text", func=lambda block: block.method_id))
+
+    assert block.has_producer("text") and not other.has_producer("text")
+    assert block.produce("text") == "value"
+    assert other.producers is DEFAULT_PRODUCERS
+    assert "text" not in DEFAULT_PRODUCERS
+
+
+def test_the_python_source_is_read_from_the_registry_each_time():
+    block = Block(method_id="value")
+    registry = MethodRegistry()
+
+    with MethodManager.use(methods):
+        assert "return value" in block.produce("python_source")
+
+    @registry.register(name="value")
+    def other_value(value: int) -> int:
+        return value + 1
+
+    with MethodManager.use(registry):
+        assert "return value + 1" in block.produce("python_source")
+
+
+def test_produce_many_uses_the_batch_producer():
+    calls: list[str] = []
+    batches: list[list[str]] = []
+
+    def render_batch(blocks):
+        batches.append([block.id for block in blocks])
+        return [f"<i>{block.id}</i>" for block in blocks]
+
+    producer = counting_producer(calls, batch_func=render_batch)
+    blocks = [Block(id=str(index), method_id="value", parameters={"value": index}) for index in range(3)]
+    for block in blocks:
+        block.register_producer(producer)
+    assert blocks[1].produce("html") == "<b>1</b>"
+
+    assert produce_many(blocks, "html") == ["<i>0</i>", "<b>1</b>", "<i>2</i>"]
+    assert batches == [["0", "2"]]
+    # The outputs of the batch are cached like the others
+    assert produce_many(blocks, "html") == ["<i>0</i>", "<b>1</b>", "<i>2</i>"]
+    assert batches == [["0", "2"]]
+
+
+def test_copies_do_not_share_the_cached_outputs():
+    calls: list[str] = []
+    block = Block(id="a", method_id="value", parameters={"value": 1})
+    block.register_producer(counting_producer(calls))
+    block.produce("html")
+
+    for block_copy in (copy.copy(block), copy.deepcopy(block), block.model_copy()):
+        assert block_copy.produced == {}
+        assert block_copy.producers is block.producers
+        block_copy.produce("html")
+        assert block.produced == {"html": "<b>1</b>"}
+
+    deep_copy = copy.deepcopy(block)
+    deep_copy.parameters["value"] = 2
+    assert block.parameters == {"value": 1}
@@ -0,0 +1,101 @@
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import CacheMissError, ResultCache, compile_workflow, submit_workflow
+from curry.flow.fingerprint import canonicalize_parameters, compute_block_keys
+from curry.methods import MethodManager, MethodRegistry
+
+methods = MethodRegistry()
+calls: list[str] = []
+
+
+@methods.register(name="load")
+def load(size: int) -> list[int]:
+    calls.append("load")
+    return list(range(size))
+
+
+@methods.register(name="total")
+def total(data: list[int]) -> int:
+    calls.append("total")
+    return sum(data)
+
+
+@methods.register(name="draw", deterministic=False)
+def draw(size: int) -> int:
+    return size
+
+
+def workflow_blocks(size: int = 5) -> list[Block]:
+    return [
+        Block(id="load", method_id="load", parameters={"size": size}),
+        Block(
+            id="total",
+            method_id="total",
+            connections=[BlockConnection(source_block_id="load", self_input_name="data")],
+        ),
+    ]
+
+
+def test_result_cache_stores_and_evicts_results(tmp_path):
+    cache = ResultCache(tmp_path, max_size=10_000)
+
+    cache.put("abc", [1, 2, 3])
+
+    assert "abc" in cache
+    assert cache.get("abc") == [1, 2, 3]
+    assert cache.stats.writes == 1
+    with pytest.raises(CacheMissError):
+        cache.get("missing")
+
+    cache.put("def", list(range(1000)))
+    cache.max_size = cache.size() - 1
+    cache.evict()
+    assert "abc" not in cache and "def" in cache
+    assert cache.stats.evictions == 1
+
+    cache.clear()
+    assert cache.size() == 0 and "def" not in cache
+
+
+def test_wrapped_method_stores_its_result(tmp_path):
+    cache = ResultCache(tmp_path)
+
+    assert cache.wrap(lambda value: value * 2, "key")(value=21) == 42
+    assert cache.get("key") == 42
+
+
+def test_canonicalize_parameters_ignores_the_key_order():
+    assert canonicalize_parameters({"a": 1, "b": [1, 2]}) == canonicalize_parameters({"b": [1, 2], "a": 1})
+
+
+def test_block_keys_follow_the_content_of_the_blocks():
+    with MethodManager.use(methods):
+        keys = compute_block_keys(compile_workflow(workflow_blocks()), ["load", "total"])
+        same_keys = compute_block_keys(compile_workflow(workflow_blocks()), ["load", "total"])
+        other_keys = compute_block_keys(compile_workflow(workflow_blocks(size=6)), ["load", "total"])
+        draws = compile_workflow([
+            Block(id="first", method_id="draw", parameters={"size": 1}),
+            Block(id="second", method_id="draw", parameters={"size": 1}),
+        ])
+        draw_keys = compute_block_keys(draws, draws.order)
+
+    assert keys == same_keys
+    # Changing a parameter changes the key of the block and of its descendants
+    assert keys["load"] != other_keys["load"] and keys["total"] != other_keys["total"]
+    # Blocks of non deterministic methods never share a key
+    assert draw_keys["first"] != draw_keys["second"]
+
+
+def test_submit_workflow_reuses_the_cached_results(tmp_path):
+    cache = ResultCache(tmp_path)
+    calls.clear()
+
+    assert submit_workflow(workflow_blocks(), cache=cache, methods=methods)["result"] == 10
+    assert submit_workflow(workflow_blocks(), cache=cache, methods=methods)["result"] == 10
+    assert calls == ["load", "total"]
+    assert cache.stats.hits == 1
+
+    # Only the blocks whose content changed are computed again
+    assert submit_workflow(workflow_blocks(size=6), cache=cache, methods=methods)["result"] == 15
+    assert calls == ["load", "total", "load", "total"]
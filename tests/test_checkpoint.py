@@ -0,0 +1,99 @@
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import (
+    CheckpointNotFoundError,
+    CheckpointStore,
+    RunFailedError,
+    compile_workflow,
+    resume_workflow,
+    submit_workflow,
+)
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+calls: list[str] = []
+broken: set[str] = set()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    calls.append(f"value:{value}")
+    return value
+
+
+@methods.register(name="fragile")
+def fragile(data: int) -> int:
+    calls.append("fragile")
+    if "fragile" in broken:
+        raise RuntimeError("unavailable")
+    return data * 10
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+    broken.clear()
+
+
+def workflow_blocks() -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="fragile", connections=[BlockConnection(source_block_id="a", self_input_name="data")]),
+        Block(id="c", method_id="value", parameters={"value": 2}),
+    ]
+
+
+def test_checkpoint_store_keeps_the_runs(tmp_path):
+    store = CheckpointStore(tmp_path)
+    workflow = compile_workflow(workflow_blocks())
+
+    run = store.start(workflow, ["b"], "run")
+    assert (run.status, run.targets, run.attempts) == ("running", ["b"], 1)
+    assert store.finish("run", RuntimeError("unavailable")).status == "failed"
+    assert store.get("run").error == "RuntimeError('unavailable')"
+
+    assert store.start(workflow, ["b", "c"], "run").attempts == 2
+    store.finish("run")
+    assert [run.run_id for run in store.runs("finished")] == ["run"]
+    assert store.runs("failed") == []
+    loaded, targets = store.load("run")
+    assert loaded.order == workflow.order and targets == ["b", "c"]
+
+    store.delete("run")
+    with pytest.raises(CheckpointNotFoundError):
+        store.get("run")
+
+
+def test_failed_runs_are_resumed_from_their_checkpoint(tmp_path):
+    store = CheckpointStore(tmp_path)
+    broken.add("fragile")
+
+    with pytest.raises(RunFailedError) as error_info:
+        submit_workflow(workflow_blocks(), checkpoints=store, methods=methods, fuse=False)
+    run_id = error_info.value.run_id
+    assert isinstance(error_info.value.__cause__, RuntimeError)
+    assert store.get(run_id).status == "failed"
+    assert calls.count("value:1") == 1 and calls.count("fragile") == 1
+
+    calls.clear()
+    broken.clear()
+    assert resume_workflow(run_id, store, methods=methods, fuse=False)["results"] == {"b": 10, "c": 2}
+    # The finished blocks are not computed again (`c` may have been cancelled by the failure)
+    assert "fragile" in calls and "value:1" not in calls
+    assert store.get(run_id).status == "finished"
+    assert store.get(run_id).attempts == 2
+
+
+def test_resumed_runs_can_compute_other_targets(tmp_path):
+    store = CheckpointStore(tmp_path)
+    run_id = submit_workflow(workflow_blocks(), targets=["c"], checkpoints=store, methods=methods)["run_id"]
+
+    calls.clear()
+    output = resume_workflow(run_id, store, targets=["a", "b"], methods=methods, fuse=False)
+
+    assert output["results"] == {"a": 1, "b": 10}
+    assert calls == ["value:1", "fragile"]
+    assert store.get(run_id).targets == ["a", "b"]
+    with pytest.raises(CheckpointNotFoundError):
+        resume_workflow("unknown", store, methods=methods)
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import (
+    CompiledWorkflow,
+    CycleDetectedError,
+    DanglingConnectionError,
+    DuplicateBlockError,
+    UnknownBlockError,
+    compile_workflow,
+    submit_workflow,
+)
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+calls: list[str] = []
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    calls.append("value")
+    return value
+
+
+@methods.register(name="add")
+def add(a: int, b: int) -> int:
+    calls.append("add")
+    return a + b
+
+
+def connect(source_block_id: str, input_name: str) -> list[BlockConnection]:
+    return [BlockConnection(source_block_id=source_block_id, self_input_name=input_name)]
+
+
+def diamond() -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="add", parameters={"b": 10}, connections=connect("a", "a")),
+        Block(id="c", method_id="add", parameters={"b": 100}, connections=connect("a", "a")),
+        Block(
+            id="d",
+            method_id="add",
+            connections=[*connect("b", "a"), *connect("c", "b")],
+        ),
+    ]
+
+
+def test_compile_workflow_sorts_blocks_given_in_any_order():
+    blocks = diamond()
+    random.Random(0).shuffle(blocks)  # noqa: S311 not used for security
+
+    workflow = compile_workflow(blocks)
+
+    assert workflow.order.index("a") < workflow.order.index("b") < workflow.order.index("d")
+    assert workflow.order.index("c") < workflow.order.index("d")
+    assert workflow.sources == ["a"]
+    assert workflow.sinks == ["d"]
+    assert sorted(workflow.parents["d"]) == ["b", "c"]
+    assert sorted(workflow.children["a"]) == ["b", "c"]
+    assert len(workflow) == 4 and "d" in workflow
+    assert [block.id for block in workflow.ordered_blocks()] == workflow.order
+
+
+def test_ancestors_and_descendants():
+    workflow = compile_workflow(diamond())
+
+    assert workflow.ancestors(["b"]) == ["a", "b"]
+    assert set(workflow.ancestors(["d"], boundaries={"b", "c"})) == {"b", "c", "d"}
+    assert workflow.descendants(["b"]) == ["b", "d"]
+    with pytest.raises(UnknownBlockError):
+        workflow.ancestors(["unknown"])
+
+
+def test_from_json_compiles_the_definition():
+    workflow = CompiledWorkflow.from_json([block.model_dump() for block in diamond()])
+
+    assert workflow.sinks == ["d"]
+
+
+def test_compile_workflow_rejects_invalid_workflows():
+    with pytest.raises(DuplicateBlockError):
+        compile_workflow([Block(id="a", method_id="value"), Block(id="a", method_id="value")])
+    with pytest.raises(DanglingConnectionError):
+        compile_workflow([Block(id="a", method_id="add", connections=connect("missing", "a"))])
+    with pytest.raises(CycleDetectedError) as error:
+        compile_workflow([
+            Block(id="a", method_id="add", connections=connect("b", "a")),
+            Block(id="b", method_id="add", connections=connect("a", "a")),
+        ])
+    assert set(error.value.cycle) == {"a", "b"}
+
+
+def test_submit_workflow_computes_the_sinks():
+    result = submit_workflow(diamond(), methods=methods)
+
+    assert result["result"] == 112
+    assert result["results"] == {"d": 112}
+
+
+def test_submit_workflow_only_computes_the_targets_and_their_ancestors():
+    calls.clear()
+
+    result = submit_workflow(diamond(), targets=["b", "a"], methods=methods)
+
+    assert result["results"] == {"b": 11, "a": 1}
+    assert sorted(calls) == ["add", "value"]
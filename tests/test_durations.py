@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import DurationHistory, compile_workflow, submit_workflow
+from curry.flow.durations import critical_path_priorities, method_key, remaining_critical_paths
+from curry.methods import MethodManager, MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+@methods.register(name="slow")
+def slow(data: int) -> int:
+    time.sleep(0.05)
+    return data
+
+
+def workflow_blocks() -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="slow", connections=[BlockConnection(source_block_id="a", self_input_name="data")]),
+        Block(id="c", method_id="value", parameters={"value": 2}),
+    ]
+
+
+def test_duration_history_keeps_moving_averages(tmp_path):
+    history = DurationHistory(tmp_path / "durations.json", smoothing=0.5)
+    method_info = methods.get("value")
+
+    assert history.expected(method_info) is None
+    history.observe(method_info, 2.0)
+    history.observe(method_info, 4.0)
+
+    assert history.expected(method_info) == 3.0
+    stats = next(iter(history.stats.values()))
+    assert (stats.last, stats.minimum, stats.maximum, stats.count) == (4.0, 2.0, 4.0, 2)
+
+    history.save()
+    assert DurationHistory(tmp_path / "durations.json").expected(method_info) == 3.0
+
+
+def test_unknown_blocks_last_the_average_duration():
+    history = DurationHistory()
+    workflow = compile_workflow(workflow_blocks())
+
+    with MethodManager.use(methods):
+        assert history.block_durations(workflow) == {}
+        history.observe(methods.get("slow"), 4.0)
+        history.observe(methods.get("value"), 2.0)
+        assert history.block_durations(workflow) == {"a": 2.0, "b": 4.0, "c": 2.0}
+        assert history.block_durations(workflow, ["b"]) == {"b": 4.0}
+
+
+def test_critical_paths():
+    workflow = compile_workflow(workflow_blocks())
+    durations = {"a": 1.0, "b": 3.0, "c": 2.0}
+
+    assert remaining_critical_paths(workflow, durations, workflow.order) == {"a": 4.0, "b": 3.0, "c": 2.0}
+    priorities = critical_path_priorities(workflow, durations, workflow.order)
+    assert priorities["a"] == pytest.approx(0.99)
+    assert priorities["a"] > priorities["b"] > priorities["c"]
+    assert critical_path_priorities(workflow, {}, workflow.order) == {}
+
+
+def test_submit_workflow_records_the_durations(tmp_path):
+    history = DurationHistory(tmp_path / "durations.json")
+
+    submit_workflow(workflow_blocks(), durations=history, methods=methods, fuse=False)
+
+    assert history.expected(methods.get("slow")) >= 0.05
+    assert history.expected(methods.get("value")) < 0.05
+    assert (tmp_path / "durations.json").exists()
+
+    submit_workflow(workflow_blocks(), durations=history, methods=methods, fuse=False)
+    assert history.stats[method_key(methods.get("slow"))].count == 2
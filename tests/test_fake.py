@@ -0,0 +1,91 @@
+import datetime
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.epices.databases.fake import (
+    FakeDataGenerator,
+    MissingPyArrowError,
+    fake_data,
+    generate_fake_data,
+    get_fake_data_generator,
+)
+from curry.flow.fingerprint import compute_block_key
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@pytest.fixture(scope="module")
+def generator() -> FakeDataGenerator:
+    return FakeDataGenerator(seed=42, vocabulary_size=50)
+
+
+def test_chunks_are_reproducible(generator):
+    chunk = generator.chunk(3, 100)
+
+    pd.testing.assert_frame_equal(chunk, FakeDataGenerator(seed=42, vocabulary_size=50).chunk(3, 100))
+    assert not chunk.equals(generator.chunk(4, 100))
+    assert list(chunk.columns) == ["date", "author", "tags", "sentence"]
+    assert chunk["date"].between(pd.Timestamp("1975-01-01"), pd.Timestamp("2024-12-31")).all()
+    assert isinstance(chunk["author"].dtype, pd.CategoricalDtype)
+
+
+def test_chunks_do_not_depend_on_the_previous_ones(generator):
+    chunks = list(generator.chunks(250, chunk_size=100))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    pd.testing.assert_frame_equal(chunks[2], generator.chunk(2, 50))
+
+
+def test_seeded_generators_are_shared():
+    assert get_fake_data_generator(7, 20) is get_fake_data_generator(7, 20)
+    assert get_fake_data_generator(None, 20) is not get_fake_data_generator(None, 20)
+
+
+def test_generate_fake_data_keeps_its_historical_types():
+    frame = generate_fake_data(20, seed=1)
+
+    assert len(frame) == 20
+    assert isinstance(frame["date"][0], datetime.date)
+    assert isinstance(frame["author"][0], str)
+    assert not isinstance(frame["tags"].dtype, pd.CategoricalDtype)
+
+
+def test_seeded_fake_data_is_deterministic():
+    seeded = Block(id="data", method_id="fake_data", parameters={"num_rows": 10, "seed": 3})
+    unseeded = Block(id="data", method_id="fake_data", parameters={"num_rows": 10})
+    connected = Block(
+        id="data",
+        method_id="fake_data",
+        connections=[BlockConnection(source_block_id="seed", self_input_name="seed")],
+    )
+
+    pd.testing.assert_frame_equal(fake_data(10, seed=3), fake_data(10, seed=3))
+    assert compute_block_key(seeded, {}, "first") == compute_block_key(seeded, {}, "second")
+    assert compute_block_key(unseeded, {}, "first") != compute_block_key(unseeded, {}, "second")
+    assert compute_block_key(connected, {"seed": "key"}, "first") == compute_block_key(
+        connected, {"seed": "key"}, "second"
+    )
+
+
+@pytest.mark.skipif(HAS_PYARROW, reason="pyarrow is installed")
+def test_writing_requires_pyarrow(generator, tmp_path):
+    with pytest.raises(MissingPyArrowError):
+        generator.write(tmp_path / "data.parquet", 10)
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow is not installed")
+@pytest.mark.parametrize("num_rows", [0, 250])
+def test_written_files_hold_all_the_rows(generator, tmp_path, num_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet = pq.read_table(generator.write(tmp_path / "data.parquet", num_rows, chunk_size=100))
+    with pa.memory_map(str(generator.write(tmp_path / "data.arrow", num_rows, "arrow", chunk_size=100))) as source:
+        arrow = pa.ipc.open_file(source).read_all()
+
+    for table in (parquet, arrow):
+        assert table.num_rows == num_rows
+        assert table.column_names == ["date", "author", "tags", "sentence"]
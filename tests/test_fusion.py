@@ -0,0 +1,85 @@
+from curry.block import Block, BlockConnection
+from curry.flow import WorkflowGraphBuilder, compile_workflow, submit_workflow
+from curry.flow.fusion import FusedChain, FusedStep, find_fusable_chains
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value", lightweight=True)
+def value(value: int) -> int:
+    return value
+
+
+@methods.register(name="increment", lightweight=True)
+def increment(data: int, step: int = 1) -> int:
+    return data + step
+
+
+@methods.register(name="heavy")
+def heavy(data: int) -> int:
+    return data * 10
+
+
+def chain(name: str, source_block_id: str, method_id: str = "increment") -> Block:
+    return Block(
+        id=name,
+        method_id=method_id,
+        connections=[BlockConnection(source_block_id=source_block_id, self_input_name="data")],
+    )
+
+
+def workflow_blocks() -> list[Block]:
+    # a -> b -> c -> heavy -> d -> e, and c -> f: c has two children, so a, b and c form the first chain
+    return [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        chain("b", "a"),
+        chain("c", "b"),
+        chain("heavy", "c", method_id="heavy"),
+        chain("d", "heavy"),
+        chain("e", "d"),
+        chain("f", "c"),
+    ]
+
+
+def test_find_fusable_chains():
+    workflow = compile_workflow(workflow_blocks())
+    lightweight = {"a", "b", "c", "d", "e", "f"}
+
+    chains = find_fusable_chains(workflow, workflow.order, lightweight.__contains__)
+
+    assert sorted(chains) == [["a", "b", "c"], ["d", "e"]]
+    assert find_fusable_chains(
+        workflow, workflow.order, lightweight.__contains__, lambda block_id, _: block_id != "d"
+    ) == [["a", "b", "c"]]
+
+
+def test_fused_chain_runs_its_blocks_in_one_call():
+    steps = [
+        FusedStep("a", value, {}, []),
+        FusedStep("b", increment, {"step": 2}, ["data"]),
+        FusedStep("c", increment, {}, ["data"]),
+    ]
+
+    assert FusedChain(steps)(value=1) == 4
+    assert FusedChain(steps, exposed=["b", "c"])(value=1) == {"b": 3, "c": 4}
+
+
+def test_lightweight_chains_are_fused_into_single_tasks():
+    workflow = compile_workflow(workflow_blocks())
+
+    fused = WorkflowGraphBuilder(workflow, available_resources=set(), methods=methods)
+    fused.build()
+    unfused = WorkflowGraphBuilder(workflow, available_resources=set(), methods=methods, fuse=False)
+    unfused.build()
+
+    assert sorted(fused.fused_chains) == [["a", "b", "c"], ["d", "e"]]
+    assert fused.graph_size < unfused.graph_size
+    assert submit_workflow(workflow, methods=methods)["results"] == {"e": 32, "f": 4}
+    assert submit_workflow(workflow, methods=methods, fuse=False)["results"] == {"e": 32, "f": 4}
+
+
+def test_inner_blocks_of_a_chain_can_be_targets():
+    results = submit_workflow(workflow_blocks(), targets=["b", "e"], methods=methods)["results"]
+
+    assert results == {"b": 2, "e": 32}
@@ -0,0 +1,131 @@
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import IncrementalWorkflow, compile_workflow, diff_workflows
+from curry.methods import MethodManager, MethodRegistry
+
+methods = MethodRegistry()
+calls: list[str] = []
+broken: set[str] = set()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    calls.append("value")
+    return value
+
+
+@methods.register(name="scale")
+def scale(data: int, factor: int = 1) -> int:
+    calls.append("scale")
+    return data * factor
+
+
+@methods.register(name="fragile")
+def fragile(data: int) -> int:
+    calls.append("fragile")
+    if "fragile" in broken:
+        raise RuntimeError("transient")
+    return data + 1
+
+
+@pytest.fixture(autouse=True)
+def use_methods():
+    calls.clear()
+    broken.clear()
+    with MethodManager.use(methods):
+        yield
+    IncrementalWorkflow.forget("tests")
+    IncrementalWorkflow.forget("other")
+
+
+def workflow_blocks(first: int = 1, factor: int = 2) -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": first}),
+        Block(id="b", method_id="value", parameters={"value": 10}),
+        Block(
+            id="c",
+            method_id="scale",
+            parameters={"factor": factor},
+            connections=[BlockConnection(source_block_id="a", self_input_name="data")],
+        ),
+        Block(
+            id="d",
+            method_id="scale",
+            connections=[BlockConnection(source_block_id="b", self_input_name="data")],
+        ),
+    ]
+
+
+def test_diff_workflows():
+    previous = compile_workflow(workflow_blocks())
+    current = compile_workflow([
+        *workflow_blocks(factor=3)[:3],
+        Block(id="e", method_id="value", parameters={"value": 0}),
+    ])
+
+    diff = diff_workflows(previous, current)
+
+    assert diff.added == ["e"]
+    assert diff.removed == ["d"]
+    assert diff.changed == ["c"]
+    assert sorted(diff.invalidated) == ["c", "e"]
+    assert sorted(diff.unchanged) == ["a", "b"]
+
+
+def test_incremental_workflow_only_computes_the_changed_blocks():
+    session = IncrementalWorkflow.get("tests")
+    assert IncrementalWorkflow.get("tests") is session
+
+    first = session.submit(workflow_blocks())
+    assert first["results"] == {"c": 2, "d": 10}
+    assert sorted(calls) == ["scale", "scale", "value", "value"]
+
+    calls.clear()
+    second = session.submit(workflow_blocks(factor=5))
+    assert second["results"] == {"c": 5, "d": 10}
+    assert second["diff"].changed == ["c"]
+    assert calls == ["scale"]
+    assert set(session.held_results) == {"a", "b", "c", "d"}
+
+    session.reset()
+    calls.clear()
+    session.submit(workflow_blocks(factor=5))
+    assert len(calls) == 4
+
+
+def fragile_blocks() -> list[Block]:
+    return [
+        *workflow_blocks(),
+        Block(id="e", method_id="fragile", connections=[BlockConnection(source_block_id="c", self_input_name="data")]),
+    ]
+
+
+def test_failed_runs_do_not_change_the_session():
+    session = IncrementalWorkflow.get("tests")
+    session.submit(workflow_blocks())
+    broken.add("fragile")
+
+    with pytest.raises(RuntimeError):
+        session.submit(fragile_blocks())
+    assert "e" not in session.held_results
+    assert session.workflow is not None and "e" not in session.workflow
+
+    broken.clear()
+    calls.clear()
+    assert session.submit(fragile_blocks())["results"] == {"d": 10, "e": 3}
+    assert calls == ["fragile"]
+
+
+def test_errored_futures_are_not_reused(client):
+    session = IncrementalWorkflow.get("tests", client=client)
+    broken.add("fragile")
+
+    with pytest.raises(RuntimeError, match="transient"):
+        session.submit(fragile_blocks())
+    assert session.held_results == []
+
+    broken.clear()
+    other = IncrementalWorkflow.get("other", client=client)
+    assert other.submit(fragile_blocks())["results"] == {"d": 10, "e": 3}
+    assert session.submit(fragile_blocks())["results"] == {"d": 10, "e": 3}
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from curry.block import Block, BlockConnection, BlockMapping
+from curry.flow import BlockEvent, GraphBuildEvent, RunReport, WorkflowInstrumentation, submit_workflow
+from curry.flow.instrumentation import WorkerEventRouter
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+@methods.register(name="fail")
+def fail(data: int) -> int:
+    raise ValueError(data)
+
+
+def block_event(block_id: str, duration: float) -> BlockEvent:
+    return BlockEvent(
+        run_id="run",
+        block_id=block_id,
+        method_id="value",
+        started_at=0.0,
+        ended_at=duration,
+        duration=duration,
+        worker="thread",
+    )
+
+
+def test_instrumentation_receives_the_events_of_the_run():
+    events = []
+    instrumentation = WorkflowInstrumentation(run_id="run", hooks=[events.append])
+    blocks = [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="value", parameters={"value": 2}),
+    ]
+
+    submit_workflow(blocks, instrumentation=instrumentation, methods=methods)
+    report = instrumentation.report()
+
+    assert report.run_id == "run"
+    assert isinstance(report.graph_build, GraphBuildEvent)
+    assert report.graph_build.block_count == 2
+    assert report.graph_build.task_count == 2
+    assert sorted(event.block_id for event in report.blocks) == ["a", "b"]
+    assert all(event.queue_time is not None and event.error is None for event in report.blocks)
+    assert len(events) == 3
+
+
+def test_instrumentation_records_the_errors():
+    instrumentation = WorkflowInstrumentation()
+    blocks = [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="fail", connections=[BlockConnection(source_block_id="a", self_input_name="data")]),
+    ]
+
+    with pytest.raises(ValueError):
+        submit_workflow(blocks, instrumentation=instrumentation, methods=methods, fuse=False)
+
+    errors = {event.block_id: event.error for event in instrumentation.report().blocks}
+    assert errors["a"] is None
+    assert errors["b"] == "ValueError(1)"
+
+
+def test_failed_runs_are_detached_from_the_client(client):
+    blocks = [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="fail", connections=[BlockConnection(source_block_id="a", self_input_name="data")]),
+    ]
+
+    with client.as_current():
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                submit_workflow(blocks, instrumentation=WorkflowInstrumentation(), methods=methods)
+
+    assert id(client) not in WorkerEventRouter._routes
+
+
+def test_every_chunk_of_a_mapped_block_emits_its_event(client):
+    instrumentation = WorkflowInstrumentation()
+    blocks = [
+        Block(
+            id="values",
+            method_id="value",
+            parameters={"value": [1, 2, 3, 4, 5]},
+            mapping=BlockMapping(input_name="value", chunk_size=2),
+        ),
+    ]
+
+    with client.as_current():
+        assert submit_workflow(blocks, instrumentation=instrumentation, methods=methods)["result"] == [1, 2, 3, 4, 5]
+
+    assert instrumentation.expected_block_events == 3
+    assert instrumentation.wait(timeout=0)
+    assert [event.block_id for event in instrumentation.report().blocks] == ["values"] * 3
+
+
+def test_events_of_other_runs_are_ignored():
+    instrumentation = WorkflowInstrumentation(run_id="other")
+
+    instrumentation.emit(block_event("a", 1.0))
+
+    assert instrumentation.report().blocks == []
+
+
+def test_run_report(tmp_path):
+    report = RunReport(run_id="run", blocks=[block_event("a", 1.0), block_event("b", 3.0), block_event("c", 2.0)])
+
+    assert [event.block_id for event in report.slowest(2)] == ["b", "c"]
+
+    report.write(tmp_path / "report.json")
+    assert json.loads((tmp_path / "report.json").read_text())["run_id"] == "run"
+    assert RunReport.model_validate_json((tmp_path / "report.json").read_text()) == report
@@ -0,0 +1,102 @@
+from curry.block import Block, BlockConnection, BlockMapping
+from curry.flow import submit_workflow
+from curry.flow.mapping import combine_chunks, map_chunk, split_into_chunks, split_into_partitions
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="numbers")
+def numbers(count: int) -> list[int]:
+    return list(range(count))
+
+
+@methods.register(name="square")
+def square(value: int, offset: int = 0) -> int:
+    return value * value + offset
+
+
+@methods.register(name="describe")
+def describe(value: int, method: str, chunk: list[int], reduce: bool = False) -> str:
+    return f"{method}:{chunk}:{value}:{reduce}"
+
+
+@methods.register(name="total")
+def total(values: list[int]) -> int:
+    return sum(values)
+
+
+def test_split_into_chunks():
+    assert split_into_chunks(range(5), chunk_size=2) == [[0, 1], [2, 3], [4]]
+    assert split_into_chunks([], chunk_size=2) == []
+
+
+def test_split_into_partitions():
+    assert split_into_partitions(range(5), 3) == [[0, 1], [2, 3], [4]]
+    assert split_into_partitions(range(2), 3) == [[0], [1], []]
+
+
+def test_map_chunk_and_combine_chunks():
+    chunk = map_chunk(square, "value", [1, 2, 3], {"offset": 1})
+
+    assert chunk == [2, 5, 10]
+    assert map_chunk(square, "value", [1, 2, 3], reduce=sum) == [14]
+    assert combine_chunks([1, 2], [3]) == [1, 2, 3]
+    assert combine_chunks([1, 2], [3], reduce=sum) == 6
+
+
+def test_mapped_blocks_apply_their_method_to_each_element():
+    blocks = [
+        Block(id="numbers", method_id="numbers", parameters={"count": 10}),
+        Block(
+            id="squares",
+            method_id="square",
+            parameters={"offset": 1},
+            connections=[BlockConnection(source_block_id="numbers", self_input_name="value")],
+            mapping=BlockMapping(input_name="value", partitions=3),
+        ),
+        Block(
+            id="sum_of_squares",
+            method_id="square",
+            connections=[BlockConnection(source_block_id="numbers", self_input_name="value")],
+            mapping=BlockMapping(input_name="value", partitions=4, reduce_method_id="total"),
+        ),
+        Block(
+            id="literal",
+            method_id="square",
+            parameters={"value": [1, 2, 3]},
+            mapping=BlockMapping(input_name="value", chunk_size=2),
+        ),
+        Block(
+            id="empty",
+            method_id="square",
+            parameters={"value": []},
+            mapping=BlockMapping(input_name="value", chunk_size=2, reduce_method_id="total"),
+        ),
+    ]
+
+    results = submit_workflow(blocks, methods=methods)["results"]
+
+    assert results["squares"] == [value * value + 1 for value in range(10)]
+    assert results["sum_of_squares"] == sum(value * value for value in range(10))
+    assert results["literal"] == [1, 4, 9]
+    assert results["empty"] == 0
+
+
+def test_parameters_of_mapped_blocks_may_be_named_like_the_arguments_of_map_chunk():
+    blocks = [
+        Block(id="numbers", method_id="numbers", parameters={"count": 2}),
+        Block(id="label", method_id="numbers", parameters={"count": 1}),
+        Block(
+            id="described",
+            method_id="describe",
+            parameters={"method": "sum", "reduce": True},
+            connections=[
+                BlockConnection(source_block_id="numbers", self_input_name="value"),
+                BlockConnection(source_block_id="label", self_input_name="chunk"),
+            ],
+            mapping=BlockMapping(input_name="value", partitions=2),
+        ),
+    ]
+
+    assert submit_workflow(blocks, methods=methods)["result"] == ["sum:[0]:0:True", "sum:[0]:1:True"]
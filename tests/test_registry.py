@@ -0,0 +1,145 @@
+import inspect
+import json
+import threading
+import typing
+
+import pytest
+
+from curry.block import Block
+from curry.flow import submit_workflow
+from curry.flow.outputs import select_output
+from curry.methods import MethodConflictError, MethodLoadError, MethodRegistry, MethodSpec, NotRegisteredError
+
+methods = MethodRegistry()
+
+
+@methods.register(name="scale", version="1.0.0", tags=["math"])
+def scale_v1(value: int) -> int:
+    return value * 2
+
+
+@methods.register(name="scale", version="1.10.0", tags=["math", "fast"])
+def scale_v2(value: int) -> int:
+    return value * 3
+
+
+def test_methods_are_versioned():
+    assert methods.versions("scale") == ["1.0.0", "1.10.0"]
+    assert methods.get("scale").method is scale_v2.__wrapped__
+    assert methods.get("scale@1.0.0").method is scale_v1.__wrapped__
+    assert methods.get(str(methods.get("scale@1.0.0").id)).version == "1.0.0"
+    with pytest.raises(NotRegisteredError):
+        methods.get("scale@2.0.0")
+
+    blocks = [
+        Block(id="latest", method_id="scale", parameters={"value": 1}),
+        Block(id="pinned", method_id="scale@1.0.0", parameters={"value": 1}),
+    ]
+    assert submit_workflow(blocks, methods=methods)["results"] == {"latest": 3, "pinned": 2}
+
+
+def test_methods_are_found_by_tags():
+    assert methods.find("math") == ["scale@1.0.0", "scale@1.10.0"]
+    assert methods.find("math", "fast") == ["scale@1.10.0"]
+    assert methods.find(name="other") == []
+
+
+def test_conflicting_registrations():
+    registry = methods.fork()
+
+    def other(value: int) -> int:
+        return value
+
+    with pytest.raises(MethodConflictError):
+        registry.register(name="scale", version="1.0.0")(other)
+    registry.register(name="scale", version="1.0.0", replace=True)(other)
+
+    assert registry.get("scale@1.0.0").method is other
+    assert methods.get("scale@1.0.0").method is scale_v1.__wrapped__
+
+
+def test_manifest_methods_are_imported_on_first_use(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps([
+            {"name": "select", "target": "curry.flow.outputs:select_output", "tags": ["outputs"]},
+            {"name": "missing", "target": "curry.flow.outputs:missing"},
+        ])
+    )
+    registry = MethodRegistry()
+
+    assert registry.load_manifest(manifest) == 2
+    assert "select" in registry
+    assert registry.find("outputs") == ["select@0.1.0"]
+    assert registry.get("select").method is select_output
+    assert registry.get("select").tags == ["outputs"]
+    with pytest.raises(MethodLoadError):
+        registry.get("missing")
+
+
+def test_declared_methods_do_not_override_the_registered_ones():
+    registry = methods.fork()
+
+    registry.add(MethodSpec(name="scale", version="1.10.0", target=f"{__name__}:scale_v2"))
+
+    assert registry.get("scale").method is scale_v2.__wrapped__
+
+
+def test_methods_without_readable_source_can_be_submitted():
+    registry = methods.fork()
+    # Functions defined from a string (e.g. in a REPL) have no source file
+    namespace: dict[str, typing.Any] = {}
+    exec("def increment(value: int) -> int:\n    return value + 1", namespace)  # noqa: S102 defined by the test
+    registry.register(name="increment")(namespace["increment"])
+
+    with pytest.raises(OSError):
+        inspect.getsource(registry.get("increment").method)
+    assert (
+        submit_workflow([Block(id="a", method_id="increment", parameters={"value": 1})], methods=registry)["result"]
+        == 2
+    )
+
+
+def test_the_code_hash_follows_the_code():
+    def scale(value: int) -> int:
+        return value * 2
+
+    def scaled(value: int) -> int:
+        return value * 3
+
+    registry = MethodRegistry()
+    registry.register(name="scale")(scale)
+    registry.register(name="scaled")(scaled)
+    registry.register(name="scale", version="2.0.0")(scale)
+
+    assert registry.get("scale").code_hash != registry.get("scaled").code_hash
+    assert registry.get("scale").code_hash == registry.get("scale@2.0.0").code_hash
+
+
+def test_forks_and_snapshots_are_isolated():
+    registry = methods.fork()
+    snapshot = registry.snapshot()
+
+    @registry.register(name="negate")
+    def negate(value: int) -> int:
+        return -value
+
+    assert "negate" in registry
+    assert "negate" not in snapshot
+    assert "negate" not in methods
+    assert len(registry) == len(methods) + 1
+
+
+def test_concurrent_registrations_are_all_kept():
+    registry = MethodRegistry()
+
+    def register(index: int) -> None:
+        registry.add(MethodSpec(name=f"method_{index}", target=f"module:method_{index}"))
+
+    threads = [threading.Thread(target=register, args=(index,)) for index in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry) == 20
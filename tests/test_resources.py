@@ -0,0 +1,77 @@
+import pytest
+from pydantic import ValidationError
+
+from curry.block import Block, BlockConnection
+from curry.flow import WorkflowGraphBuilder, compile_workflow
+from curry.methods import MethodRegistry, ResourceHints, WorkloadKind, worker_resources
+
+methods = MethodRegistry()
+
+
+@methods.register(name="load", resources=ResourceHints(kind=WorkloadKind.IO, memory="1GB", retries=2))
+def load(size: int) -> list[int]:
+    return list(range(size))
+
+
+@methods.register(name="total", resources=ResourceHints(kind=WorkloadKind.CPU, threads=4, priority=5))
+def total(data: list[int]) -> int:
+    return sum(data)
+
+
+def test_memory_is_parsed():
+    assert ResourceHints(memory="2GB").memory == 2_000_000_000
+    assert ResourceHints(memory=1024).memory == 1024
+    with pytest.raises(ValidationError):
+        ResourceHints(threads=0)
+
+
+def test_only_the_declared_resources_are_requested():
+    hints = ResourceHints(kind=WorkloadKind.CPU, threads=2, memory="1GB", priority=3, workers=["w1"])
+
+    assert hints.resources() == {"cpu": 2, "memory": 1_000_000_000}
+    assert hints.to_annotations({"cpu"}) == {
+        "resources": {"cpu": 2},
+        "priority": 3,
+        "workers": ["w1"],
+        "allow_other_workers": False,
+    }
+    assert ResourceHints().to_annotations({"cpu", "memory", "io"}) == {}
+    assert ResourceHints(kind=WorkloadKind.IO).resources() == {"io": 1}
+
+
+def test_combined_hints_add_up():
+    combined = ResourceHints.combine([
+        ResourceHints(kind=WorkloadKind.IO, memory=10, priority=1, workers=["w1", "w2"]),
+        ResourceHints(kind=WorkloadKind.CPU, threads=2, memory=5, retries=3, workers=["w2", "w3"]),
+    ])
+
+    assert combined.threads == 3
+    assert combined.memory == 15
+    assert combined.kind is WorkloadKind.CPU
+    assert (combined.priority, combined.retries) == (1, 3)
+    assert combined.workers == ["w2"]
+    assert ResourceHints.combine([]) == ResourceHints()
+
+
+def test_worker_resources():
+    assert worker_resources(cpu=4, memory="16GB", io=8) == {"cpu": 4, "memory": 16_000_000_000, "io": 8}
+    assert worker_resources() == {}
+
+
+def test_the_tasks_are_annotated_with_the_hints_of_their_method():
+    workflow = compile_workflow([
+        Block(id="load", method_id="load", parameters={"size": 3}),
+        Block(
+            id="total", method_id="total", connections=[BlockConnection(source_block_id="load", self_input_name="data")]
+        ),
+    ])
+
+    builder = WorkflowGraphBuilder(workflow, available_resources={"cpu", "io"}, methods=methods)
+    builder.build()
+
+    load_layer, total_layer = builder.layers
+    assert load_layer.annotations == {"resources": {"io": 1}, "retries": 2}
+    assert total_layer.annotations == {"resources": {"cpu": 4}}
+    # The priorities are set task by task
+    assert list(total_layer.priorities.values()) == [5]
+    assert total_layer.to_layer().annotations["priority"](builder.keys["total"]) == 5
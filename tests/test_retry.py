@@ -0,0 +1,69 @@
+import pytest
+from pydantic import ValidationError
+
+from curry.block import Block
+from curry.flow import submit_workflow
+from curry.methods import MethodRegistry, RetryPolicy
+
+methods = MethodRegistry()
+attempts: list[int] = []
+
+
+@methods.register(name="flaky", retry=RetryPolicy(max_attempts=3))
+def flaky(failures: int) -> int:
+    attempts.append(failures)
+    if len(attempts) <= failures:
+        raise ConnectionError(len(attempts))
+    return len(attempts)
+
+
+def test_delays_grow_up_to_the_maximum():
+    assert RetryPolicy(max_attempts=5, delay=1.0, backoff=2.0, max_delay=5.0).delays() == [1.0, 2.0, 4.0, 5.0]
+    assert RetryPolicy(max_attempts=1).delays() == []
+
+
+def test_failed_calls_are_retried():
+    def fail_twice() -> str:
+        attempts.append(0)
+        if len(attempts) < 3:
+            raise ConnectionError
+        return "done"
+
+    attempts.clear()
+    assert RetryPolicy(max_attempts=3).wrap(fail_twice, "fail_twice")() == "done"
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(ConnectionError):
+        RetryPolicy(max_attempts=2).wrap(fail_twice, "fail_twice")()
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize("error", [TypeError, ValueError])
+def test_other_errors_are_raised_at_once(error):
+    def fail() -> None:
+        attempts.append(0)
+        raise error
+
+    attempts.clear()
+    with pytest.raises(error):
+        RetryPolicy(max_attempts=3, retry_on=(ConnectionError, TypeError)).wrap(fail, "fail")()
+    # Invalid arguments fail the same way on every call
+    assert len(attempts) == 1
+
+
+def test_the_calls_of_the_blocks_are_retried():
+    attempts.clear()
+    assert (
+        submit_workflow([Block(id="a", method_id="flaky", parameters={"failures": 2})], methods=methods)["result"] == 3
+    )
+
+    attempts.clear()
+    with pytest.raises(ConnectionError):
+        submit_workflow([Block(id="a", method_id="flaky", parameters={"failures": 3})], methods=methods)
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(ValidationError):
+        submit_workflow([Block(id="a", method_id="flaky", parameters={"failures": "many"})], methods=methods)
+    assert attempts == []
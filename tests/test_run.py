@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import UnknownBlockError, WorkflowInstrumentation, WorkflowRun, submit_workflow_async
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+@methods.register(name="slow_double")
+def slow_double(data: int) -> int:
+    time.sleep(0.1)
+    return data * 2
+
+
+def workflow_blocks(first: int = 1) -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": first}),
+        Block(
+            id="b",
+            method_id="slow_double",
+            connections=[BlockConnection(source_block_id="a", self_input_name="data")],
+        ),
+    ]
+
+
+def test_submit_workflow_async_returns_a_handle_on_the_run(client):
+    async def run() -> None:
+        workflow_run = await submit_workflow_async(workflow_blocks(), client, methods=methods)
+
+        assert WorkflowRun.get(workflow_run.run_id) is workflow_run
+        assert set(workflow_run.status()) == {"a", "b"}
+        assert await workflow_run == {"b": 2}
+        assert workflow_run.done()
+        assert workflow_run.future("a").result() == 1
+        with pytest.raises(UnknownBlockError):
+            workflow_run.future("unknown")
+
+        workflow_run.release()
+        assert WorkflowRun.get(workflow_run.run_id) is None
+
+    asyncio.run(run())
+
+
+def test_concurrent_runs_receive_their_own_block_events(client):
+    async def run() -> tuple[WorkflowInstrumentation, WorkflowInstrumentation]:
+        first, second = WorkflowInstrumentation(), WorkflowInstrumentation()
+        first_run = await submit_workflow_async(workflow_blocks(1), client, instrumentation=first, methods=methods)
+        second_run = await submit_workflow_async(workflow_blocks(2), client, instrumentation=second, methods=methods)
+        assert await first_run == {"b": 2}
+        assert await second_run == {"b": 4}
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.wait() and second.wait()
+    assert {event.run_id for event in first.report().blocks} == {first.run_id}
+    assert {event.run_id for event in second.report().blocks} == {second.run_id}
+    first.detach()
+    second.detach()
+
+
+def test_dropped_runs_are_forgotten(client):
+    async def run() -> str:
+        workflow_run = await submit_workflow_async(workflow_blocks(), client, methods=methods)
+        assert await workflow_run == {"b": 2}
+        return workflow_run.run_id
+
+    run_id = asyncio.run(run())
+
+    assert WorkflowRun.get(run_id) is None
@@ -0,0 +1,133 @@
+import asyncio
+import typing
+from uuid import uuid4
+
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.epices.databases.sqlite import create_sqlite_engine
+from curry.flow import (
+    AsyncFlowStore,
+    BlockEvent,
+    FlowNotFoundError,
+    FlowStore,
+    GraphBuildEvent,
+    RunReport,
+    compile_workflow,
+)
+
+
+@pytest.fixture
+def store() -> FlowStore:
+    return FlowStore(create_sqlite_engine("sqlite://"))
+
+
+def workflow_blocks(factor: int = 2) -> list[Block]:
+    return [
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(
+            id="b",
+            method_id="scale",
+            parameters={"factor": factor},
+            connections=[BlockConnection(source_block_id="a", self_input_name="data")],
+        ),
+    ]
+
+
+def block_event(run_id: str, block_id: str, started_at: float, error: typing.Optional[str] = None) -> BlockEvent:
+    return BlockEvent(
+        run_id=run_id,
+        block_id=block_id,
+        method_id="value",
+        started_at=started_at,
+        ended_at=started_at + 1,
+        duration=1.0,
+        worker="thread",
+        error=error,
+    )
+
+
+def test_flows_are_saved_and_loaded(store):
+    flow_id = store.save_flow(workflow_blocks(), name="flow")
+
+    assert store.load_flow(flow_id) == workflow_blocks()
+
+    store.save_flow(workflow_blocks(factor=3), flow_id=flow_id)
+    assert store.load_flow(flow_id) == workflow_blocks(factor=3)
+    [summary] = store.list_flows()
+    assert (summary.id, summary.name, summary.block_count) == (flow_id, "flow", 2)
+
+    store.delete_flow(flow_id)
+    assert store.list_flows() == []
+    with pytest.raises(FlowNotFoundError):
+        store.load_flow(flow_id)
+
+
+def test_plans_are_stored_once_per_config(store):
+    flow_id = store.save_flow(workflow_blocks())
+    workflow = compile_workflow(workflow_blocks())
+
+    plan_id = store.save_plan(flow_id, workflow)
+    assert store.save_plan(flow_id, compile_workflow(workflow_blocks())) == plan_id
+
+    plan = store.load_plan(plan_id)
+    assert plan.order == workflow.order
+    assert plan.sinks == ["b"]
+    assert plan.blocks == workflow.blocks
+
+    # A plan whose flow changed since is compiled from the current config
+    store.save_flow(workflow_blocks(factor=3), flow_id=flow_id)
+    assert store.load_plan(plan_id).blocks["b"].parameters == {"factor": 3}
+    assert store.save_plan(flow_id, compile_workflow(workflow_blocks(factor=3))) != plan_id
+
+    with pytest.raises(FlowNotFoundError):
+        store.load_plan(uuid4())
+
+
+def test_runs_record_the_timing_of_their_blocks(store):
+    flow_id = store.save_flow(workflow_blocks())
+    store.start_run("first", flow_id, submitted_at=1.0)
+    store.start_run("second", flow_id, submitted_at=2.0)
+
+    assert store.record_block_events("first", [block_event("first", "b", 2.0)]) == 1
+    assert store.record_block_events("first", []) == 0
+    report = RunReport(
+        run_id="first",
+        graph_build=GraphBuildEvent(run_id="first", block_count=2, task_count=2, duration=0.5),
+        blocks=[block_event("first", "a", 1.0, error="ValueError()")],
+    )
+    store.finish_run("first", status="error", error="ValueError()", report=report)
+
+    run = store.get_run("first")
+    assert (run.status, run.error, run.block_count, run.graph_build_duration) == ("error", "ValueError()", 2, 0.5)
+    assert [event.block_id for event in store.get_block_events("first")] == ["a", "b"]
+    assert store.get_block_events("first")[0].error == "ValueError()"
+    assert [run.id for run in store.list_runs(flow_id)] == ["second", "first"]
+    assert store.get_run("second").status == "running"
+
+    with pytest.raises(FlowNotFoundError):
+        store.get_run("unknown")
+    with pytest.raises(FlowNotFoundError):
+        store.finish_run("unknown")
+
+
+def test_async_flow_store(store):
+    async_store = AsyncFlowStore(store)
+
+    async def run() -> None:
+        flow_id = await async_store.save_flow(workflow_blocks())
+        assert await async_store.load_flow(flow_id) == workflow_blocks()
+        await async_store.start_run("run", flow_id)
+        await async_store.finish_run("run")
+        assert (await async_store.get_run("run")).status == "finished"
+        assert [flow.id for flow in await async_store.list_flows()] == [flow_id]
+
+    asyncio.run(run())
+
+
+def test_sqlite_databases_use_the_wal_journal(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'curry.db'}")
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
@@ -0,0 +1,117 @@
+import typing
+
+import pytest
+
+from curry.block import Block, BlockConnection, BlockMapping
+from curry.flow import StreamingConnectionError, compile_workflow, submit_workflow
+from curry.flow.streaming import find_stream_pipelines
+from curry.methods import MethodManager, MethodRegistry
+
+methods = MethodRegistry()
+
+
+@methods.register(name="numbers")
+def numbers(count: int) -> typing.Iterator[int]:
+    yield from range(count)
+
+
+@methods.register(name="squares")
+def squares(values: typing.Iterator[int]) -> typing.Iterator[int]:
+    for value in values:
+        yield value * value
+
+
+@methods.register(name="total")
+def total(values: typing.Iterable[int]) -> int:
+    return sum(values)
+
+
+@methods.register(name="broken")
+def broken(count: int) -> typing.Iterator[int]:
+    yield from range(count)
+    raise ValueError(count)
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    return value
+
+
+def streaming_connection(source_block_id: str, input_name: str = "values") -> BlockConnection:
+    return BlockConnection(source_block_id=source_block_id, self_input_name=input_name, streaming=True)
+
+
+def test_streamed_chunks_are_consumed_while_they_are_produced():
+    blocks = [
+        Block(id="numbers", method_id="numbers", parameters={"count": 5}),
+        Block(id="squares", method_id="squares", connections=[streaming_connection("numbers")]),
+        Block(id="total", method_id="total", connections=[streaming_connection("squares")]),
+        Block(
+            id="list_total",
+            method_id="total",
+            connections=[BlockConnection(source_block_id="numbers", self_input_name="values")],
+        ),
+    ]
+
+    results = submit_workflow(blocks, targets=["total", "squares", "list_total"], methods=methods)["results"]
+
+    assert results["total"] == 30
+    # Streaming targets return the list of their chunks
+    assert results["squares"] == [0, 1, 4, 9, 16]
+    assert results["list_total"] == 10
+
+
+def test_the_error_of_the_producer_is_raised():
+    blocks = [
+        Block(id="broken", method_id="broken", parameters={"count": 3}),
+        Block(id="total", method_id="total", connections=[streaming_connection("broken")]),
+    ]
+
+    with pytest.raises(ValueError):
+        submit_workflow(blocks, methods=methods)
+
+
+def test_find_stream_pipelines_groups_the_streaming_blocks():
+    workflow = compile_workflow([
+        Block(id="numbers", method_id="numbers", parameters={"count": 5}),
+        Block(id="squares", method_id="squares", connections=[streaming_connection("numbers")]),
+        Block(id="total", method_id="total", connections=[streaming_connection("squares")]),
+        Block(id="other", method_id="numbers", parameters={"count": 2}),
+    ])
+
+    with MethodManager.use(methods):
+        assert find_stream_pipelines(workflow, workflow.order) == [["numbers", "squares", "total"], ["other"]]
+
+
+@pytest.mark.parametrize(
+    "consumer",
+    [
+        # The upstream method is not a generator
+        Block(id="consumer", method_id="total", connections=[streaming_connection("value")]),
+        # Mapped blocks cannot consume streams
+        Block(
+            id="consumer",
+            method_id="value",
+            connections=[streaming_connection("numbers", "value")],
+            mapping=BlockMapping(input_name="value"),
+        ),
+        # The blocks are also linked by a regular connection
+        Block(
+            id="consumer",
+            method_id="total",
+            connections=[
+                streaming_connection("numbers"),
+                BlockConnection(source_block_id="numbers", self_input_name="count"),
+            ],
+        ),
+    ],
+)
+def test_invalid_streaming_connections(consumer):
+    blocks = [
+        Block(id="numbers", method_id="numbers", parameters={"count": 5}),
+        Block(id="value", method_id="value", parameters={"value": 1}),
+        consumer,
+    ]
+
+    with pytest.raises(StreamingConnectionError):
+        submit_workflow(blocks, targets=["consumer"], methods=methods)
@@ -0,0 +1,87 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from curry.epices.partitions import split_periods_into_partitions
+from curry.methods import MethodManager
+from curry.utils.time.time import (
+    convert_month_to_str,
+    convert_period_to_wrapping_months,
+    format_periods,
+    period_partitions,
+    split_periods,
+)
+
+
+def test_format_periods():
+    dates = ["2024-03-17 12:00", "2024-12-30 00:00"]
+
+    assert list(format_periods(dates, "day")) == ["2024-03-17", "2024-12-30"]
+    # ISO weeks: the last days of 2024 belong to the first week of 2025
+    assert list(format_periods(dates, "week")) == ["2024-W11", "2025-W01"]
+    assert list(format_periods(dates, "month")) == ["2024-03", "2024-12"]
+    assert list(format_periods(dates, "year")) == ["2024", "2024"]
+    assert format_periods(datetime.datetime(2024, 3, 1), "month")[0] == convert_month_to_str(
+        datetime.datetime(2024, 3, 1)
+    )
+
+
+def test_split_periods_matches_the_wrapping_months():
+    periods = [
+        (datetime.datetime(2023, 11, 15, 8), datetime.datetime(2024, 2, 1)),
+        (datetime.datetime(2024, 1, 31), datetime.datetime(2024, 1, 31, 23)),
+    ]
+
+    partitions = split_periods([start for start, _ in periods], [end for _, end in periods])
+
+    assert list(partitions.columns) == ["period", "start", "end", "label"]
+    for position, (start, end) in enumerate(periods):
+        rows = partitions[partitions["period"] == position]
+        expected = convert_period_to_wrapping_months(start, end)
+        assert list(zip(rows["start"], rows["end"])) == [
+            (pd.Timestamp(low), pd.Timestamp(high)) for low, high in expected
+        ]
+    assert list(partitions["label"]) == ["2023-11", "2023-12", "2024-01", "2024-02", "2024-01"]
+
+
+def test_split_periods_granularities():
+    start, end = datetime.datetime(2024, 3, 6), datetime.datetime(2024, 3, 18)
+
+    assert len(split_periods([start], [end], "day")) == 13
+    weeks = split_periods([start], [end], "week")
+    assert list(weeks["start"].dt.day_name()) == ["Monday"] * 3
+    assert list(weeks["label"]) == ["2024-W10", "2024-W11", "2024-W12"]
+    assert list(split_periods([start], [end], "year")["label"]) == ["2024"]
+    # A period ending before it starts has no partition
+    assert split_periods([end], [start]).empty
+
+
+def test_split_periods_in_a_time_zone():
+    partitions = split_periods(["2024-03-15"], ["2024-04-02"], tz="Europe/Paris")
+
+    assert list(partitions["start"]) == [
+        pd.Timestamp("2024-03-01", tz="Europe/Paris"),
+        pd.Timestamp("2024-04-01", tz="Europe/Paris"),
+    ]
+    # The month of March is one hour short on the wall clock of Paris
+    assert partitions["end"][0] - partitions["start"][0] == pd.Timedelta(days=31) - pd.Timedelta(hours=1)
+
+
+def test_period_partitions_can_be_mapped_over():
+    partitions = period_partitions(["2024-01-15"], ["2024-02-15"])
+
+    assert [partition["label"] for partition in partitions] == ["2024-01", "2024-02"]
+    assert set(partitions[0]) == {"period", "start", "end", "label"}
+
+    method_info = MethodManager.get_method_info("split_periods")
+    assert method_info.method is split_periods_into_partitions.__wrapped__
+    assert method_info.lightweight
+    assert split_periods_into_partitions(
+        [datetime.datetime(2024, 1, 15)], [datetime.datetime(2024, 2, 15)], granularity="year"
+    ) == period_partitions(["2024-01-15"], ["2024-02-15"], "year")
+
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month", "year"])
+def test_split_periods_without_periods(granularity):
+    assert split_periods([], [], granularity).empty
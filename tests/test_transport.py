@@ -0,0 +1,107 @@
+import importlib.util
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.block import Block, BlockConnection
+from curry.flow import SpilledResult, SpillTransport, submit_workflow
+from curry.flow import transport as transport_module
+from curry.flow.transport import load_spilled, materialize, spill
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+received: list[type] = []
+
+
+@methods.register(name="ones")
+def ones(size: int) -> np.ndarray:
+    return np.ones(size)
+
+
+@methods.register(name="total")
+def total(data: np.ndarray) -> float:
+    received.append(type(data))
+    return float(data.sum())
+
+
+def test_large_arrays_are_spilled_to_memory_mapped_files(tmp_path):
+    value = np.arange(100, dtype=np.float64)
+
+    spilled = spill(value, tmp_path, threshold=100)
+
+    assert isinstance(spilled, SpilledResult)
+    assert spilled.kind == "ndarray" and spilled.nbytes == value.nbytes
+    loaded = load_spilled(spilled)
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    np.testing.assert_array_equal(loaded, value)
+    assert type(materialize(spilled)) is np.ndarray
+
+
+def test_small_and_other_values_are_not_spilled(tmp_path):
+    small = np.arange(3)
+
+    assert spill(small, tmp_path, threshold=100) is small
+    assert spill([1, 2, 3], tmp_path, threshold=0) == [1, 2, 3]
+    assert spill(np.array([object()]), tmp_path, threshold=0).dtype == object
+    assert load_spilled(small) is small and materialize(small) is small
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is None, reason="pyarrow is not installed")
+def test_large_data_frames_are_spilled_to_arrow_files(tmp_path):
+    frame = pd.DataFrame({"value": np.arange(100, dtype=np.float64), "name": ["a"] * 100})
+
+    spilled = spill(frame, tmp_path, threshold=100)
+
+    assert isinstance(spilled, SpilledResult) and spilled.kind == "arrow"
+    pd.testing.assert_frame_equal(load_spilled(spilled), frame)
+    pd.testing.assert_frame_equal(materialize(spilled), frame)
+
+
+def test_a_warning_is_logged_when_data_frames_cannot_be_spilled(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(transport_module, "_has_pyarrow", lambda: False)
+    frame = pd.DataFrame({"value": np.arange(100, dtype=np.float64)})
+
+    small = frame.head(1)
+
+    with caplog.at_level(logging.WARNING, logger="curry.flow.transport"):
+        assert spill(frame, tmp_path, threshold=500) is frame
+        # Data frames below the threshold are not spilled anyway
+        assert spill(small, tmp_path, threshold=500) is small
+
+    assert len(caplog.records) == 1
+    assert "pyarrow" in caplog.records[0].getMessage()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_wrapped_methods_spill_their_result(tmp_path):
+    transport = SpillTransport(tmp_path, threshold=100)
+
+    spilled = transport.wrap(ones, "run")(size=100)
+    assert isinstance(spilled, SpilledResult)
+    assert transport.wrap(total, "run")(spilled) == 100.0
+
+    results = transport.materialize({"ones": spilled})
+    transport.cleanup("run")
+    assert not transport.run_directory("run").exists()
+    np.testing.assert_array_equal(results["ones"], np.ones(100))
+
+
+def test_submit_workflow_passes_the_large_results_through_files(tmp_path):
+    transport = SpillTransport(tmp_path, threshold=100)
+    blocks = [
+        Block(id="ones", method_id="ones", parameters={"size": 100}),
+        Block(
+            id="total", method_id="total", connections=[BlockConnection(source_block_id="ones", self_input_name="data")]
+        ),
+    ]
+    received.clear()
+
+    output = submit_workflow(blocks, targets=["ones", "total"], transport=transport, methods=methods, fuse=False)
+
+    assert output["results"]["total"] == 100.0
+    assert type(output["results"]["ones"]) is np.ndarray
+    assert received == [np.memmap]
+    assert not transport.run_directory(output["run_id"]).exists()
@@ -0,0 +1,62 @@
+import pickle
+
+import pytest
+from pydantic import ValidationError
+
+from curry.methods import MethodRegistry, ValidatedMethod, ValidationMode
+
+methods = MethodRegistry()
+
+
+@methods.register(name="add")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@methods.register(name="to_text", validation=ValidationMode.FULL)
+def to_text(value: int) -> int:
+    return f"#{value}"  # type: ignore[return-value]
+
+
+@methods.register(name="raw", validation=ValidationMode.OFF)
+def raw(a: int, b: int) -> int:
+    return a + b
+
+
+def test_boundary_validation_coerces_the_arguments():
+    assert add(1, "2") == 3
+    with pytest.raises(ValidationError):
+        add(1, "two")
+
+
+def test_full_validation_also_checks_the_returned_value():
+    with pytest.raises(ValidationError):
+        to_text(1)
+    assert methods.get("to_text").get_callable(ValidationMode.BOUNDARY)(value="1") == "#1"
+
+
+def test_methods_without_validation_are_called_as_is():
+    method_info = methods.get("raw")
+
+    assert method_info.get_callable() is method_info.method
+    assert raw("1", "2") == "12"
+
+
+def multiply(a: int, b: int) -> int:
+    return a * b
+
+
+def test_validators_are_built_once_per_mode():
+    method_info = methods.get("add")
+
+    assert method_info.get_callable() is method_info.get_callable()
+    assert method_info.get_callable(ValidationMode.FULL) is not method_info.get_callable()
+
+
+def test_validated_methods_are_picklable():
+    validated = ValidatedMethod(multiply, ValidationMode.BOUNDARY)
+    validated(a=1, b=2)
+
+    copy = pickle.loads(pickle.dumps(validated))  # noqa: S301 trusted data
+
+    assert copy(a="2", b=3) == 6
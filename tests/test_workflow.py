@@ -0,0 +1,137 @@
+import asyncio
+import random
+import typing
+
+import dask
+import pytest
+from dask.core import literal
+
+from curry.block import Block, BlockConnection
+from curry.flow import (
+    ResultCache,
+    UnknownOutputError,
+    WorkflowGraphBuilder,
+    compile_workflow,
+    submit_workflow,
+    submit_workflow_async,
+)
+from curry.flow.outputs import select_output
+from curry.flow.tasks import GraphTask, TaskRef
+from curry.methods import MethodRegistry
+
+methods = MethodRegistry()
+calls: list[str] = []
+
+
+class Bounds(typing.NamedTuple):
+    low: int
+    high: int
+
+
+@methods.register(name="value")
+def value(value: int) -> int:
+    calls.append("value")
+    return value
+
+
+@methods.register(name="draw", deterministic=False)
+def draw() -> float:
+    return random.random()  # noqa: S311 not used for security
+
+
+@methods.register(name="bounds")
+def bounds(values: list[int]) -> Bounds:
+    return Bounds(min(values), max(values))
+
+
+@methods.register(name="label")
+def label(data: typing.Any, prefix: str = "") -> str:
+    return f"{prefix}{data}"
+
+
+def labelled(block_id: str, source_block_id: str, output_name: str = "output") -> Block:
+    return Block(
+        id=block_id,
+        method_id="label",
+        connections=[
+            BlockConnection(source_block_id=source_block_id, source_output_name=output_name, self_input_name="data")
+        ],
+    )
+
+
+def test_identical_blocks_are_computed_once():
+    calls.clear()
+    workflow = compile_workflow([
+        Block(id="a", method_id="value", parameters={"value": 1}),
+        Block(id="b", method_id="value", parameters={"value": 1}),
+        labelled("c", "a"),
+        labelled("d", "b"),
+    ])
+
+    builder = WorkflowGraphBuilder(workflow, available_resources=set(), methods=methods, fuse=False)
+    builder.build()
+
+    assert builder.duplicates == {"b": "a", "d": "c"}
+    assert builder.keys["b"] == builder.keys["a"]
+    assert submit_workflow(workflow, methods=methods, fuse=False)["results"] == {"c": "1", "d": "1"}
+    assert calls == ["value"]
+
+
+def test_connections_select_the_named_outputs():
+    blocks = [
+        Block(id="bounds", method_id="bounds", parameters={"values": [3, 1, 2]}),
+        labelled("low", "bounds", "low"),
+        labelled("high", "bounds", "high"),
+        labelled("whole", "bounds"),
+    ]
+
+    results = submit_workflow(blocks, methods=methods)["results"]
+
+    assert select_output({"low": 1}, "low") == 1
+    assert select_output(Bounds(1, 3), "high") == 3
+    assert results == {"low": "1", "high": "3", "whole": "Bounds(low=1, high=3)"}
+    with pytest.raises(UnknownOutputError):
+        submit_workflow([*blocks, labelled("middle", "bounds", "middle")], methods=methods)
+
+
+def test_task_keys_are_scoped_by_run_when_the_methods_are_wrapped(tmp_path):
+    workflow = compile_workflow([Block(id="a", method_id="value", parameters={"value": 1})])
+
+    def keys(**kwargs: typing.Any) -> str:
+        builder = WorkflowGraphBuilder(workflow, available_resources=set(), methods=methods, **kwargs)
+        builder.build()
+        return builder.keys["a"]
+
+    # Plain tasks of identical workflows are shared between runs
+    assert keys(run_id="first") == keys(run_id="second")
+    cache = ResultCache(tmp_path)
+    assert keys(run_id="first", cache=cache) != keys(run_id="second", cache=cache)
+
+
+def test_runs_of_methods_that_are_not_deterministic_do_not_share_their_tasks(client):
+    blocks = [Block(id="draw", method_id="draw"), labelled("label", "draw")]
+
+    async def run() -> list[dict[str, typing.Any]]:
+        runs = [await submit_workflow_async(blocks, client, methods=methods) for _ in range(2)]
+        return [await workflow_run for workflow_run in runs]
+
+    first, second = asyncio.run(run())
+    with client.as_current():
+        third = submit_workflow(blocks, methods=methods)["results"]
+
+    assert first["label"] != second["label"]
+    assert third["label"] not in {first["label"], second["label"]}
+
+
+def test_graph_tasks_are_written_as_tuples():
+    task = GraphTask("c", label, TaskRef("a"), prefix="#")
+    assert task.dependencies == {"a"}
+    assert repr(TaskRef("a")) == "TaskRef('a')"
+
+    # Strings, and containers which could hold keys or tasks, are quoted
+    quoted = GraphTask("b", len, "a")
+    assert isinstance(quoted.to_tuple()[1][0], literal)
+    assert GraphTask("d", sum, [1, 2]).dependencies == set()
+
+    graph = {"a": (value, 1), "b": quoted.to_tuple(), "c": task.to_tuple()}
+    assert dask.get(graph, ["b", "c"]) == (1, "#1")